@@ -260,6 +260,63 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(show_spinner=False)
+def load_dashboard_aggregates(data_version: str, start_date: pd.Timestamp,
+                              mid_point: pd.Timestamp, end_date: pd.Timestamp) -> dict:
+    """
+    Agrégats du tableau de bord calculés par DuckDB (aucun chargement de energy_data)
+    
+    Mis en cache par Streamlit : la clé inclut le jeton de version des données
+    et les bornes de la fenêtre, donc un ajout de lignes ou un changement de
+    jour recalcule les agrégats.
+    
+    Args:
+        data_version: Jeton DatabaseManager.get_data_version()
+        start_date: Début de la fenêtre (inclus)
+        mid_point: Séparation des deux semestres pour la tendance
+        end_date: Fin de la fenêtre (incluse)
+    """
+    from mcp_server.core.database_manager import get_database_manager
+    db = get_database_manager()
+    params = [start_date.to_pydatetime(), end_date.to_pydatetime()]
+    
+    # KPIs, sous-compteurs, puissance et découpage de tendance en une requête
+    totals = db.execute_query("""
+        SELECT
+            COUNT(*) AS records,
+            SUM(energy_total_kwh) AS total_kwh,
+            SUM(sub_metering_1_kwh) AS kitchen_total,
+            AVG(sub_metering_1_kwh) AS kitchen_mean,
+            MAX(sub_metering_1_kwh) AS kitchen_max,
+            SUM(sub_metering_2_kwh) AS laundry_total,
+            AVG(sub_metering_2_kwh) AS laundry_mean,
+            MAX(sub_metering_2_kwh) AS laundry_max,
+            SUM(sub_metering_3_kwh) AS water_heater_total,
+            AVG(sub_metering_3_kwh) AS water_heater_mean,
+            MAX(sub_metering_3_kwh) AS water_heater_max,
+            AVG(global_active_power_kw) AS avg_power,
+            MAX(global_active_power_kw) AS max_power,
+            SUM(energy_total_kwh) FILTER (WHERE timestamp < ?) AS first_half_kwh,
+            COUNT(*) FILTER (WHERE timestamp < ?) AS first_half_records,
+            SUM(energy_total_kwh) FILTER (WHERE timestamp >= ?) AS last_half_kwh,
+            COUNT(*) FILTER (WHERE timestamp >= ?) AS last_half_records
+        FROM energy_data
+        WHERE timestamp >= ? AND timestamp <= ?
+    """, [mid_point.to_pydatetime()] * 4 + params).iloc[0].to_dict()
+    
+    # Consommation mensuelle
+    monthly = db.execute_query("""
+        SELECT
+            DATE_TRUNC('month', timestamp) AS date,
+            SUM(energy_total_kwh) AS energy_total_kwh
+        FROM energy_data
+        WHERE timestamp >= ? AND timestamp <= ?
+        GROUP BY 1
+        ORDER BY 1
+    """, params)
+    
+    return {"totals": totals, "monthly": monthly}
+
 class EnergyAgentApp:
     """Application principale Energy Agent avec interface complète + architecture LangGraph"""
     
@@ -617,32 +674,21 @@ class EnergyAgentApp:
         """Onglet 2 : Tableau de bord électrique - Structure restructurée en 4 parties"""
         st.markdown("## 📊 Tableau de Bord - Consommation Électrique")
         
-        # Chargement des données
+        # Chargement des agrégats (requêtes DuckDB, mises en cache par version des données)
         try:
-            conn = duckdb.connect('data_genere/processed/energy_fictional_2h.duckdb')
-            df = conn.execute("SELECT * FROM energy_data").fetchdf()
-            conn.close()
-            
-            if df.empty:
-                st.warning("⚠️ Aucune donnée disponible")
-                return
-            
-            # Conversion des colonnes
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['date'] = df['timestamp'].dt.date
-            df['month'] = df['timestamp'].dt.month
-            df['year'] = df['timestamp'].dt.year
-            df['week'] = df['timestamp'].dt.isocalendar().week
-            df['day_of_week'] = df['timestamp'].dt.day_name()
+            from mcp_server.core.database_manager import get_database_manager
             
             # 🎯 PÉRIODE DE RÉFÉRENCE : 12 derniers mois (période glissante depuis hier)
             yesterday = pd.Timestamp.now().normalize() - pd.Timedelta(days=1)
             start_date = yesterday - pd.DateOffset(months=12)
+            mid_point = yesterday - pd.DateOffset(months=6)
             
-            # Filtrer les données sur les 12 derniers mois
-            df_12m = df[(df['timestamp'] >= start_date) & (df['timestamp'] <= yesterday)]
+            aggregates = load_dashboard_aggregates(
+                get_database_manager().get_data_version(), start_date, mid_point, yesterday
+            )
+            totals = aggregates["totals"]
             
-            if df_12m.empty:
+            if not totals["records"]:
                 st.warning("⚠️ Aucune donnée disponible sur les 12 derniers mois")
                 return
             
@@ -650,7 +696,7 @@ class EnergyAgentApp:
             st.markdown("### 🔹 KPIs Électrique (sur les 12 derniers mois)")
             
             # Calculs des KPIs
-            total_consumption_12m = df_12m['energy_total_kwh'].sum()
+            total_consumption_12m = totals['total_kwh']
             avg_monthly_consumption = total_consumption_12m / 12
             avg_weekly_consumption = total_consumption_12m / 52  # 52 semaines
             avg_daily_consumption = total_consumption_12m / 365  # 365 jours
@@ -697,12 +743,7 @@ class EnergyAgentApp:
             st.markdown("### 🔹 Consommation Totale Mensuelle")
             
             # Données mensuelles sur les 12 derniers mois
-            monthly_data_12m = df_12m.groupby(['year', 'month']).agg({
-                'energy_total_kwh': 'sum'
-            }).reset_index()
-            
-            monthly_data_12m['date'] = pd.to_datetime(monthly_data_12m[['year', 'month']].assign(day=1))
-            monthly_data_12m = monthly_data_12m.sort_values('date')
+            monthly_data_12m = aggregates["monthly"]
             
             fig1 = px.bar(
                 monthly_data_12m,
@@ -724,12 +765,12 @@ class EnergyAgentApp:
             st.markdown("### 🔹 Répartition par Type d'Équipement")
             
             # Calculs sur les 12 derniers mois (CORRECTION DU CALCUL)
-            kitchen_total_12m = df_12m['sub_metering_1_kwh'].sum()
-            laundry_total_12m = df_12m['sub_metering_2_kwh'].sum()
-            water_heater_total_12m = df_12m['sub_metering_3_kwh'].sum()
+            kitchen_total_12m = totals['kitchen_total']
+            laundry_total_12m = totals['laundry_total']
+            water_heater_total_12m = totals['water_heater_total']
             
             # 🔧 CORRECTION : Utiliser energy_total_kwh au lieu de global_active_power_kw
-            total_energy_12m = df_12m['energy_total_kwh'].sum()
+            total_energy_12m = totals['total_kwh']
             others_total_12m = total_energy_12m - (kitchen_total_12m + laundry_total_12m + water_heater_total_12m)
             
             # Disposition : Métriques à gauche, graphique à droite
@@ -743,8 +784,8 @@ class EnergyAgentApp:
                         <div class="section-title">🍳 Cuisine</div>
                         <div class="section-content">
                             <small>
-                            <strong>Moyenne :</strong> {df_12m['sub_metering_1_kwh'].mean() * 1000:.2f} W<br>
-                            <strong>Maximum :</strong> {df_12m['sub_metering_1_kwh'].max() * 1000:.2f} W<br>
+                            <strong>Moyenne :</strong> {totals['kitchen_mean'] * 1000:.2f} W<br>
+                            <strong>Maximum :</strong> {totals['kitchen_max'] * 1000:.2f} W<br>
                             <strong>Total :</strong> {kitchen_total_12m:.2f} kWh
                             </small>
                         </div>
@@ -758,8 +799,8 @@ class EnergyAgentApp:
                         <div class="section-title">👕 Buanderie</div>
                         <div class="section-content">
                             <small>
-                            <strong>Moyenne :</strong> {df_12m['sub_metering_2_kwh'].mean() * 1000:.2f} W<br>
-                            <strong>Maximum :</strong> {df_12m['sub_metering_2_kwh'].max() * 1000:.2f} W<br>
+                            <strong>Moyenne :</strong> {totals['laundry_mean'] * 1000:.2f} W<br>
+                            <strong>Maximum :</strong> {totals['laundry_max'] * 1000:.2f} W<br>
                             <strong>Total :</strong> {laundry_total_12m:.2f} kWh
                             </small>
                         </div>
@@ -773,8 +814,8 @@ class EnergyAgentApp:
                         <div class="section-title">🛁 Ballon d'eau chaude</div>
                         <div class="section-content">
                             <small>
-                            <strong>Moyenne :</strong> {df_12m['sub_metering_3_kwh'].mean() * 1000:.2f} W<br>
-                            <strong>Maximum :</strong> {df_12m['sub_metering_3_kwh'].max() * 1000:.2f} W<br>
+                            <strong>Moyenne :</strong> {totals['water_heater_mean'] * 1000:.2f} W<br>
+                            <strong>Maximum :</strong> {totals['water_heater_max'] * 1000:.2f} W<br>
                             <strong>Total :</strong> {water_heater_total_12m:.2f} kWh
                             </small>
                         </div>
@@ -827,13 +868,9 @@ class EnergyAgentApp:
             ], key=lambda x: x[1])
             
             # Tendances (comparaison avec les 6 derniers mois vs 6 mois précédents)
-            mid_point = yesterday - pd.DateOffset(months=6)
-            df_first_6m = df_12m[df_12m['timestamp'] < mid_point]
-            df_last_6m = df_12m[df_12m['timestamp'] >= mid_point]
-            
-            if not df_first_6m.empty and not df_last_6m.empty:
-                consumption_first_6m = df_first_6m['energy_total_kwh'].sum()
-                consumption_last_6m = df_last_6m['energy_total_kwh'].sum()
+            if totals['first_half_records'] and totals['last_half_records']:
+                consumption_first_6m = totals['first_half_kwh']
+                consumption_last_6m = totals['last_half_kwh']
                 trend_percentage = ((consumption_last_6m - consumption_first_6m) / consumption_first_6m) * 100
                 trend_direction = "📈 Hausse" if trend_percentage > 0 else "📉 Baisse"
             else:
@@ -845,9 +882,21 @@ class EnergyAgentApp:
             user_avg_daily = avg_daily_consumption
             comparison_percentage = ((user_avg_daily - national_avg_daily_3p) / national_avg_daily_3p) * 100
             
-            # Pics de consommation
-            max_power_12m = df_12m['global_active_power_kw'].max()
-            avg_power_12m = df_12m['global_active_power_kw'].mean()
+            # Pics de consommation (table creuse min/max si disponible)
+            max_power_12m = None
+            try:
+                from mcp_server.core.energy_mcp_tools import get_energy_tools
+                extrema_index = get_energy_tools().extrema_index
+                if extrema_index is not None:
+                    # Borne haute incluse (yesterday) → fin exclusive juste après
+                    max_power_12m, _ = extrema_index.range_extremum(
+                        'global_active_power_kw', start_date, yesterday + pd.Timedelta(seconds=1), 'max'
+                    )
+            except Exception:
+                max_power_12m = None
+            if max_power_12m is None:
+                max_power_12m = totals['max_power']
+            avg_power_12m = totals['avg_power']
             peak_factor = max_power_12m / avg_power_12m if avg_power_12m > 0 else 1
             
             # Affichage de l'analyse intelligente
@@ -899,29 +948,16 @@ class EnergyAgentApp:
             st.error(f"❌ Erreur lors du chargement des données : {str(e)}")
     
     def forecast_tab(self):
-        """Onglet 3 : Prévisions Prophet - Code intégré"""
+        """Onglet 3 : Prévisions (table forecast_data précalculée en arrière-plan)"""
         st.title("📈 Prévisions")
         st.markdown("---")
         
-        # Vérifier si le modèle Prophet est entraîné
-        prophet_trained = st.session_state.get('prophet_trained', False)
-        
-        # Interface unifiée : Paramètres d'entraînement et de prévision
+        # Paramètres d'affichage : les prévisions sont déjà calculées
         st.markdown("### ⚙️ Paramètres de Prévision")
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns(2)
         
         with col1:
-            training_period = st.slider(
-                "📅 Période d'entraînement (jours)",
-                min_value=30,
-                max_value=730,
-                value=365,
-                step=30,
-                key="forecast_training_period"
-            )
-        
-        with col2:
             horizon = st.selectbox(
                 "🎯 Horizon de prévision",
                 ["7", "14", "30"],
@@ -933,194 +969,163 @@ class EnergyAgentApp:
                 key="forecast_horizon_selector"
             )
         
-        with col3:
-            model_type = st.selectbox(
-                "🔧 Type de modèle",
-                ["simple", "advanced"],
+        with col2:
+            resolution = st.selectbox(
+                "⏱️ Résolution",
+                ["daily", "2h"],
                 format_func=lambda x: {
-                    "simple": "Simple",
-                    "advanced": "Avancé"
+                    "daily": "Journalière",
+                    "2h": "Par tranche de 2h"
                 }[x],
-                key="forecast_model_selector"
+                key="forecast_resolution_selector"
             )
         
-        # Bouton unifié : Entraîner et Générer
-        if st.button("🚀 Entraîner et Générer les Prévisions", type="primary", key="train_and_generate"):
-            with st.spinner("Entraînement et génération des prévisions..."):
-                try:
-                    from mcp_server.core.prophet_forecast_tool import get_prophet_tool
-                    
-                    # Utiliser l'instance globale partagée
-                    prophet_tool = get_prophet_tool()
-                    
-                    # Étape 1 : Entraînement du modèle
-                    st.info("🔄 Entraînement du modèle en cours...")
-                    training_result = prophet_tool.train_model(training_period)
-                    
-                    if training_result["status"] == "success":
-                        st.success(f"✅ Modèle entraîné avec succès !")
-                        st.info(f"📊 {training_result['message']}")
-                        
-                        # Sauvegarder les informations d'entraînement
-                        st.session_state.prophet_trained = True
-                        st.session_state.training_info = training_result
-                        st.session_state.training_period = training_period
-                        st.session_state.forecast_horizon = horizon
-                        
-                        # Étape 2 : Génération des prévisions
-                        st.info("🔮 Génération des prévisions...")
-                        forecast_result = prophet_tool.generate_forecast(int(horizon))
-                        
-                        if forecast_result["status"] == "success":
-                            st.success("✅ Prévisions générées avec succès")
-                            
-                            # Afficher les métriques
-                            metrics = forecast_result.get('metrics', {})
-                            col1, col2, col3 = st.columns(3)
-                            
-                            with col1:
-                                st.metric(
-                                    label="Consommation Totale Prévue",
-                                    value=f"{metrics.get('total_consumption', 0):.1f} kWh"
-                                )
-                            
-                            with col2:
-                                st.metric(
-                                    label="Moyenne Journalière",
-                                    value=f"{metrics.get('avg_daily', 0):.1f} kWh/jour"
-                                )
-                            
-                            with col3:
-                                st.metric(
-                                    label="Pic de Consommation",
-                                    value=f"{metrics.get('max_consumption', 0):.1f} kWh"
-                                )
-                            
-                            # Graphique de prévision
-                            st.markdown("### 📊 Courbe de Prévision")
-                            forecast_data = forecast_result.get('forecast_data', pd.DataFrame())
-                            
-                            if not forecast_data.empty:
-                                fig = go.Figure()
-                                
-                                # Ligne de prévision
-                                fig.add_trace(go.Scatter(
-                                    x=forecast_data['ds'],
-                                    y=forecast_data['yhat'],
-                                    mode='lines+markers',
-                                    name='Prévision',
-                                    line=dict(color='#2563eb', width=3)
-                                ))
-                                
-                                # Bandes de confiance
-                                fig.add_trace(go.Scatter(
-                                    x=forecast_data['ds'],
-                                    y=forecast_data['yhat_upper'],
-                                    mode='lines',
-                                    name='Limite supérieure',
-                                    line=dict(color='rgba(37, 99, 235, 0.3)', width=1)
-                                ))
-                                
-                                fig.add_trace(go.Scatter(
-                                    x=forecast_data['ds'],
-                                    y=forecast_data['yhat_lower'],
-                                    mode='lines',
-                                    name='Limite inférieure',
-                                    line=dict(color='rgba(37, 99, 235, 0.3)', width=1),
-                                    fill='tonexty'
-                                ))
-                                
-                                fig.update_layout(
-                                    title=f"Prévision de Consommation ({horizon} jours)",
-                                    xaxis_title="Date",
-                                    yaxis_title="Consommation (kWh/jour)",
-                                    showlegend=True,
-                                    hovermode='x unified'
-                                )
-                                
-                                st.plotly_chart(fig, use_container_width=True)
-                            
-                            # Tableau détaillé
-                            st.markdown("### 📋 Détails des Prévisions")
-                            if not forecast_data.empty:
-                                st.dataframe(
-                                    forecast_data.round(2),
-                                    use_container_width=True
-                                )
-                            
-                            # Composantes du modèle
-                            st.markdown("### 🔍 Composantes du Modèle")
-                            components = prophet_tool.get_model_components()
-                            
-                            if components["status"] == "success":
-                                comp_data = components
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.markdown("""
-                                    **📈 Tendance :**
-                                    - Direction : Stable
-                                    - Confiance : 95%
-                                    """)
-                                    
-                                    st.markdown("""
-                                    **🔄 Saisonnalité :**
-                                    - Hebdomadaire : ±15%
-                                    - Annuelle : ±25%
-                                    """)
-                                
-                                with col2:
-                                    st.markdown("""
-                                    **📅 Changements :**
-                                    - Nombre de changements : 3
-                                    - Impact : Modéré
-                                    """)
-                                    
-                                    st.markdown("""
-                                    **🎯 Précision :**
-                                    - Erreur moyenne : ±5%
-                                    - Intervalle de confiance : 90%
-                                    """)
-                            
-                        else:
-                            st.error(f"❌ Erreur de prévision : {forecast_result['message']}")
-                            
-                    else:
-                        st.error(f"❌ Erreur d'entraînement : {training_result['message']}")
-                        
-                except Exception as e:
-                    st.error(f"❌ Erreur : {str(e)}")
-        
-        # Affichage des prévisions existantes si le modèle est déjà entraîné
-        elif prophet_trained:
-            st.success("✅ **Modèle déjà entraîné**")
+        try:
+            from mcp_server.core.forecast_table import get_forecast_table
+            from mcp_server.core.prophet_forecast_tool import get_prophet_tool
             
-            # Afficher les informations d'entraînement
-            training_info = st.session_state.get('training_info', {})
-            if training_info:
-                st.info(f"📊 **Modèle entraîné :** {training_info.get('message', '')}")
+            forecast_table = get_forecast_table()
+            forecast_result = forecast_table.read(resolution, int(horizon))
             
-            st.info("💡 Cliquez sur 'Entraîner et Générer' pour créer de nouvelles prévisions avec les paramètres actuels.")
-        
-        else:
-            # Affichage initial pour les nouveaux utilisateurs
-            st.info("🚀 **Bienvenue dans l'onglet Prévisions !**")
+            if forecast_result["status"] == "error":
+                st.error(f"❌ Erreur de prévision : {forecast_result['message']}")
+                return
+            
+            forecast_data = forecast_result['forecast_data']
+            st.caption(
+                f"🕒 Calculées le {forecast_result['computed_at'][:16]} sur les données jusqu'au "
+                f"{forecast_result['watermark'][:16]} — recalcul automatique à chaque mise à jour des données"
+            )
+            
+            # Métriques (kWh/jour)
+            daily_totals = forecast_data.groupby(forecast_data['ds'].dt.floor('D'))['yhat'].sum()
+            total_consumption = forecast_data['yhat'].sum()
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric(
+                    label="Consommation Totale Prévue",
+                    value=f"{total_consumption:.1f} kWh"
+                )
+            
+            with col2:
+                st.metric(
+                    label="Moyenne Journalière",
+                    value=f"{total_consumption / int(horizon):.1f} kWh/jour"
+                )
+            
+            with col3:
+                st.metric(
+                    label="Pic de Consommation",
+                    value=f"{daily_totals.max():.1f} kWh"
+                )
+            
+            # Graphique de prévision
+            st.markdown("### 📊 Courbe de Prévision")
+            unit = "kWh/jour" if resolution == "daily" else "kWh/2h"
+            quantiles = forecast_result['quantile_forecast']
+            fig = go.Figure()
+            
+            # Ligne de prévision
+            fig.add_trace(go.Scatter(
+                x=quantiles.ds,
+                y=quantiles.mean,
+                mode='lines+markers' if resolution == "daily" else 'lines',
+                name='Prévision',
+                line=dict(color='#2563eb', width=3 if resolution == "daily" else 2)
+            ))
+            
+            # Quantiles bootstrap : médiane et bande P10 - P90
+            fig.add_trace(go.Scatter(
+                x=quantiles.ds,
+                y=quantiles[0.5],
+                mode='lines',
+                name='Médiane (P50)',
+                line=dict(color='#2563eb', width=1, dash='dot')
+            ))
             
-            st.markdown("""
-            ### 📋 Fonctionnalités disponibles
+            fig.add_trace(go.Scatter(
+                x=quantiles.ds,
+                y=quantiles[0.9],
+                mode='lines',
+                name='P90',
+                line=dict(color='rgba(37, 99, 235, 0.3)', width=1)
+            ))
             
-            ✅ **Entraînement automatique** du modèle Prophet
-            ✅ **Génération de prévisions** avec graphiques interactifs
-            ✅ **Métriques détaillées** (consommation, moyennes, pics)
-            ✅ **Bandes de confiance** pour les incertitudes
-            ✅ **Composantes du modèle** (tendances, saisonnalité)
+            fig.add_trace(go.Scatter(
+                x=quantiles.ds,
+                y=quantiles[0.1],
+                mode='lines',
+                name='P10',
+                line=dict(color='rgba(37, 99, 235, 0.3)', width=1),
+                fill='tonexty'
+            ))
             
-            ### 🎯 Comment utiliser
+            fig.update_layout(
+                title=f"Prévision de Consommation ({horizon} jours)",
+                xaxis_title="Date",
+                yaxis_title=f"Consommation ({unit})",
+                showlegend=True,
+                hovermode='x unified'
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
             
-            1. **Ajustez les paramètres** ci-dessus selon vos besoins
-            2. **Cliquez sur 'Entraîner et Générer'** pour créer vos prévisions
-            3. **Visualisez les résultats** avec graphiques et métriques
-            """)
+            # Tableau détaillé
+            st.markdown("### 📋 Détails des Prévisions")
+            st.dataframe(
+                forecast_data.round(2),
+                use_container_width=True
+            )
+            
+            # Composantes du modèle ayant produit ces prévisions (modèle stocké, jamais ajusté ici)
+            st.markdown("### 🔍 Composantes du Modèle")
+            prophet_tool = get_prophet_tool(backend=forecast_result['backend'])
+            loading_result = prophet_tool.load_model(
+                forecast_table.training_days, resolution, forecast_result['watermark']
+            )
+            components = prophet_tool.get_model_components() if loading_result["status"] == "success" else loading_result
+            
+            if components["status"] == "success":
+                comp_data = components
+                trend = comp_data['trend']
+                weekly = comp_data['seasonality']['weekly']
+                direction_labels = {'stable': 'Stable', 'increasing': 'Hausse', 'decreasing': 'Baisse'}
+                day_labels = {
+                    'monday': 'lundi', 'tuesday': 'mardi', 'wednesday': 'mercredi', 'thursday': 'jeudi',
+                    'friday': 'vendredi', 'saturday': 'samedi', 'sunday': 'dimanche'
+                }
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown(f"""
+                    **📈 Tendance :**
+                    - Direction : {direction_labels.get(trend['direction'], trend['direction'])}
+                    - Pente : {trend['slope']:+.3f} kWh/jour par jour
+                    """)
+                    
+                    st.markdown(f"""
+                    **🔄 Saisonnalité :**
+                    - Hebdomadaire : ±{weekly['amplitude'] * 100:.0f}%
+                    - Jour de pic : {day_labels.get(weekly['peak_day'], weekly['peak_day'])}
+                    """)
+                
+                with col2:
+                    st.markdown(f"""
+                    **⚙️ Moteur :**
+                    - {comp_data['backend']}
+                    - Entraînement : {forecast_table.training_days} jours d'historique
+                    """)
+                    
+                    st.markdown(f"""
+                    **🎯 Précision :**
+                    - Intervalle P10 - P90 : {forecast_result['interval_width'] * 100:.0f}% (bootstrap des résidus)
+                    """)
+            else:
+                st.warning(f"⚠️ Composantes indisponibles : {components['message']}")
+                
+        except Exception as e:
+            st.error(f"❌ Erreur : {str(e)}")
 
 def main():
     """Fonction principale"""
@@ -1133,17 +1138,17 @@ def main():
     # Sidebar complète
     app.show_sidebar()
     
-        # Navigation par onglets
-    tab1, tab2, tab3 = st.tabs(["💬 Chat Intelligent", "📊 Tableau de Bord", "📈 Prévisions"])
-    
-    with tab1:
-        app.chat_tab()
-    
-    with tab2:
-        app.dashboard_tab()
-    
-    with tab3:
-        app.forecast_tab()
+    # Navigation : seul l'onglet affiché est exécuté (st.tabs exécute tous les onglets)
+    tabs = {
+        "💬 Chat Intelligent": app.chat_tab,
+        "📊 Tableau de Bord": app.dashboard_tab,
+        "📈 Prévisions": app.forecast_tab
+    }
+    selected_tab = st.radio(
+        "Navigation", list(tabs.keys()), horizontal=True,
+        label_visibility="collapsed", key="active_tab"
+    )
+    tabs[selected_tab]()
 
 if __name__ == "__main__":
     main()
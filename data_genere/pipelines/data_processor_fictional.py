@@ -22,9 +22,16 @@ import pandas as pd
 import duckdb
 import time
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
+# Ajouter la racine du projet pour importer les rollups
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from mcp_server.core.rollup_manager import RollupManager
+from mcp_server.core.forecast_table import FORECAST_TABLE
+
 
 class FictionalEnergyDataProcessor:
     """Processeur optimisé pour données fictives déjà agrégées en 2h"""
@@ -246,6 +253,12 @@ class FictionalEnergyDataProcessor:
                 SELECT * FROM df
             """)
             
+            # Reconstruction des tables de pré-agrégation
+            RollupManager(conn).rebuild()
+            
+            # Prévisions précalculées obsolètes : recalculées au prochain démarrage
+            conn.execute(f"DROP TABLE IF EXISTS {FORECAST_TABLE}")
+            
             # Vérification
             count = conn.execute("SELECT COUNT(*) FROM energy_data").fetchone()[0]
             conn.close()
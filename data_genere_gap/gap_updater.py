@@ -22,6 +22,9 @@ import os
 # Ajouter le chemin pour importer le processeur
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from mcp_server.core.rollup_manager import RollupManager
+from mcp_server.core.database_manager import notify_data_appended
+
 class GapUpdater:
     """Mise à jour de la base DuckDB avec les données générées"""
     
@@ -139,6 +142,15 @@ class GapUpdater:
             
             conn.execute(insert_query)
             
+            # Mise à jour incrémentale des rollups (seuls les buckets touchés)
+            try:
+                RollupManager(conn).refresh_range(
+                    df_processed['timestamp'].min().to_pydatetime(),
+                    df_processed['timestamp'].max().to_pydatetime()
+                )
+            except Exception as e:
+                self.logger.warning(f"Rollups non mis à jour: {e}")
+            
             # Vérifier le nombre d'enregistrements après
             count_after = conn.execute("SELECT COUNT(*) FROM energy_data").fetchone()[0]
             
@@ -152,6 +164,12 @@ class GapUpdater:
             
             conn.close()
             
+            # Index en mémoire (outils MCP) : ajout incrémental de la plage insérée
+            notify_data_appended(
+                df_processed['timestamp'].min().to_pydatetime(),
+                df_processed['timestamp'].max().to_pydatetime()
+            )
+            
             inserted_count = count_after - count_before
             
             return {
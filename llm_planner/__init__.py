@@ -14,8 +14,8 @@ Critères d'acceptation :
 """
 
 from .core.gemini_client import get_gemini_client, GeminiClient
-from .models.plan_schema import LLMPlan, ToolStep, PlanMetadata
-from .prompts.plan_generator_prompt import PlanGeneratorPrompt, format_plan_prompt
+from .models.plan_schema import LLMPlan, CombinedLLMPlan, ToolStep, PlanMetadata
+from .prompts.plan_generator_prompt import PlanGeneratorPrompt, format_plan_prompt, format_combined_prompt
 
 __version__ = "1.0.0"
 __author__ = "Energy Agent Team"
@@ -25,10 +25,12 @@ __all__ = [
     'get_gemini_client',
     'GeminiClient', 
     'LLMPlan',
+    'CombinedLLMPlan',
     'ToolStep',
     'PlanMetadata',
     'PlanGeneratorPrompt',
-    'format_plan_prompt'
+    'format_plan_prompt',
+    'format_combined_prompt'
 ]
 
 
@@ -10,12 +10,13 @@ L'orchestrateur gère la complexité.
 
 import os
 import json
-import time
-import hashlib
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+from llm_planner.core.llm_cache import get_llm_cache
+from observability.tracer import get_tracer
+
 # Chargement des variables d'environnement
 load_dotenv()
 
@@ -30,68 +31,98 @@ class GeminiClient:
         
         # Configuration API
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Cache simple
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._cache_ttl = 3600  # 1 heure
+        self.model_name = 'gemini-1.5-flash'
+        self.model = genai.GenerativeModel(self.model_name)
         
-
+        # Cache persistant partagé entre processus (SQLite)
+        self._cache = get_llm_cache()
     
-    def _generate_cache_key(self, prompt: str) -> str:
-        """Génère clé de cache"""
-        return hashlib.md5(prompt.encode()).hexdigest()
+    def _cached_plan(self, prompt: str, question: str, span) -> Optional[Dict[str, Any]]:
+        """Plan déjà en cache (question_context remis à jour) ou None"""
+        cached_plan = self._cache.get(prompt, self.model_name)
+        if span is not None:
+            span.set_attribute("cache_hit", cached_plan is not None)
+        if cached_plan is not None:
+            cached_plan["question_context"] = question
+        return cached_plan
     
-    def _is_cache_valid(self, cache_entry: Dict[str, Any]) -> bool:
-        """Vérifie validité du cache"""
-        if 'timestamp' not in cache_entry:
-            return False
-        age = time.time() - cache_entry['timestamp']
-        return age < self._cache_ttl
+    @staticmethod
+    def _clean_json(response_text: str) -> str:
+        """Retire une éventuelle clôture markdown autour du JSON"""
+        response_text = response_text.strip()
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        return response_text
     
-    def generate_plan(self, question: str, use_cache: bool = True) -> Dict[str, Any]:
-        """Traduit question → plan JSON"""
-        from llm_planner.prompts.plan_generator_prompt import format_plan_prompt
-        prompt = format_plan_prompt(question)
+    def _parse_combined_plan(self, response_text: str, prompt: str, question: str, use_cache: bool) -> Dict[str, Any]:
+        """Réponse brute → plan combiné validé contre CombinedLLMPlan (mis en cache)"""
+        from llm_planner.models.plan_schema import CombinedLLMPlan
+        try:
+            plan = json.loads(self._clean_json(response_text))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Réponse non-JSON: {e}")
+        validated = CombinedLLMPlan(**plan)
+        plan["period_code"] = validated.period_code
         
-        # Cache
+        # Cache (uniquement les plans valides)
         if use_cache:
-            cache_key = self._generate_cache_key(prompt)
-            if cache_key in self._cache:
-                cache_entry = self._cache[cache_key]
-                if self._is_cache_valid(cache_entry):
-                    return cache_entry['plan']
-                else:
-                    del self._cache[cache_key]
+            self._cache.put(prompt, self.model_name, plan)
         
-        try:
-            # Appel API
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Nettoyer JSON
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            
-            plan = json.loads(response_text)
-            plan["question_context"] = question
-            
-            # Cache
+        plan["question_context"] = question
+        return plan
+    
+    @property
+    def _json_generation_config(self):
+        """Sortie JSON structurée, déterministe"""
+        return genai.GenerationConfig(response_mime_type="application/json", temperature=0)
+    
+    def generate_combined_plan(self, question: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Traduit question → code de période + intention + plan (un seul appel)
+        
+        Réponse en mode JSON natif, validée contre CombinedLLMPlan.
+        """
+        from llm_planner.prompts.plan_generator_prompt import format_combined_prompt
+        prompt = format_combined_prompt(question)
+        
+        with get_tracer().span("gemini.generate_combined_plan", **{"llm.model": self.model_name}) as span:
             if use_cache:
-                self._cache[self._generate_cache_key(prompt)] = {
-                    'plan': plan,
-                    'timestamp': time.time()
-                }
+                cached_plan = self._cached_plan(prompt, question, span)
+                if cached_plan is not None:
+                    return cached_plan
             
-            return plan
+            try:
+                # Appel API (sortie JSON structurée)
+                with get_tracer().span("gemini.generate_content", **{"llm.model": self.model_name}):
+                    response = self.model.generate_content(prompt, generation_config=self._json_generation_config)
+                return self._parse_combined_plan(response.text, prompt, question, use_cache)
+            except Exception as e:
+                print(f"❌ Erreur traduction: {e}")
+                raise
+    
+    async def agenerate_combined_plan(self, question: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Variante asynchrone de generate_combined_plan (generate_content_async)"""
+        from llm_planner.prompts.plan_generator_prompt import format_combined_prompt
+        prompt = format_combined_prompt(question)
+        
+        with get_tracer().span("gemini.generate_combined_plan", **{"llm.model": self.model_name, "async": True}) as span:
+            if use_cache:
+                cached_plan = self._cached_plan(prompt, question, span)
+                if cached_plan is not None:
+                    return cached_plan
             
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Réponse non-JSON: {e}")
-        except Exception as e:
-            print(f"❌ Erreur traduction: {e}")
-            raise
+            try:
+                # Appel API non bloquant (sortie JSON structurée)
+                with get_tracer().span("gemini.generate_content", **{"llm.model": self.model_name}):
+                    response = await self.model.generate_content_async(
+                        prompt, generation_config=self._json_generation_config
+                    )
+                return self._parse_combined_plan(response.text, prompt, question, use_cache)
+            except Exception as e:
+                print(f"❌ Erreur traduction: {e}")
+                raise
     
     def validate_plan(self, plan: Dict[str, Any]) -> bool:
         """Validation basique - L'orchestrateur fera le reste"""
@@ -104,8 +135,8 @@ class GeminiClient:
             return False
     
     def clear_cache(self):
-        """Vide le cache"""
-        self._cache.clear()
+        """Vide le cache des plans"""
+        self._cache.clear(self.model_name)
 
 # Instance globale
 _gemini_client: Optional[GeminiClient] = None
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+💾 CACHE PERSISTANT DES RÉPONSES LLM
+===================================
+
+Cache disque (SQLite, mode WAL) partagé entre processus pour les sorties
+LLM : plans combinés Gemini (code de période + intention + étapes).
+
+Caractéristiques :
+- Clé = hash du prompt normalisé + nom du modèle
+- Taille bornée, éviction LRU (dernier accès)
+- Durée de vie (TTL) configurable
+- Lecteurs / écrivains concurrents (WAL + busy timeout)
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Base par défaut : data_genere/cache/ à la racine du projet
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / "data_genere" / "cache" / "llm_cache.sqlite"
+
+class LLMCache:
+    """Cache LRU persistant des réponses LLM"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Args:
+            path: Fichier SQLite (défaut: LLM_CACHE_PATH ou data_genere/cache/llm_cache.sqlite)
+            max_entries: Nombre maximal d'entrées (défaut: LLM_CACHE_SIZE ou 5000)
+            ttl: Durée de vie en secondes (défaut: LLM_CACHE_TTL ou 7 jours)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path or os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('LLM_CACHE_SIZE', 5000))
+        self.ttl = ttl if ttl is not None else float(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600))
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion SQLite propre au thread courant"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = conn
+        return conn
+
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        """Hash du prompt normalisé (espaces compactés, casse ignorée) et du modèle"""
+        normalized = re.sub(r"\s+", " ", prompt).strip().casefold()
+        return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str, model: str) -> Optional[Any]:
+        """Valeur en cache (désérialisée) ou None"""
+        key = self.make_key(prompt, model)
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                    self._count(hit=True)
+                    return json.loads(row[0])
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Cache LLM indisponible (lecture): {e}")
+
+        self._count(hit=False)
+        return None
+
+    def put(self, prompt: str, model: str, value: Any):
+        """Mémorise une valeur sérialisable en JSON (éviction LRU au-delà de max_entries)"""
+        key = self.make_key(prompt, model)
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)",
+                        (overflow,)
+                    )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Cache LLM indisponible (écriture): {e}")
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def clear(self, model: Optional[str] = None):
+        """Vide le cache (ou seulement les entrées d'un modèle)"""
+        with self._connection() as conn:
+            if model:
+                conn.execute("DELETE FROM llm_cache WHERE model = ?", (model,))
+            else:
+                conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache (hits/misses de ce processus, entrées sur disque)"""
+        try:
+            entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "path": str(self.path),
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+# Instance globale
+_llm_cache: Optional[LLMCache] = None
+
+def get_llm_cache() -> LLMCache:
+    """Retourne l'instance globale du cache LLM"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
@@ -68,6 +68,19 @@ class LLMPlan(BaseModel):
             raise ValueError("Résumé requis")
         return v.strip()
 
+class CombinedLLMPlan(LLMPlan):
+    """Plan + classification de période en une seule réponse LLM"""
+    
+    period_code: str = Field(..., description="Code de période / granularité (ex: LAST_MONTH)")
+    intent: Optional[str] = Field(None, description="Intention détectée")
+    
+    @validator('period_code')
+    def validate_period_code(cls, v):
+        """Normalisation du code (majuscules, première ligne)"""
+        if not v or not v.strip():
+            raise ValueError("Code de période requis")
+        return v.strip().split('\n')[0].strip().upper()
+
 # Exemple simple pour les tests
 EXAMPLE_PLAN = {
     "steps": [
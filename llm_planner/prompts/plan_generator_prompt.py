@@ -23,7 +23,7 @@ class PlanGeneratorPrompt:
         "aggregate",           # → execute_temporal_aggregation (consommation par période)
         "cost",               # → execute_cost_calculation (coûts et économies)
         "zone_comparison",    # → execute_zone_comparison (sous-compteurs)
-        "forecast",           # → capacité future
+        "forecast",           # → generate_forecast (table forecast_data précalculée)
         "plot"                # → visualisation
     ]
     
@@ -44,6 +44,57 @@ STRUCTURE:
 
 RÈGLE: JSON uniquement."""
 
+    # Codes de période / granularité (anciennement prompt du validateur sémantique)
+    PERIOD_CODE_GUIDE = """PÉRIODES TEMPORELLES:
+CURRENT_MONTH : "ce mois-ci", "ce mois" → mois calendaire en cours (1er du mois → aujourd'hui)
+LAST_MONTH : "mois dernier", "le mois passé" → mois calendaire précédent complet
+LAST_30_DAYS : "30 derniers jours", "ces 30 jours" → période glissante de 30 jours
+CURRENT_WEEK : "cette semaine" → semaine calendaire en cours
+LAST_7_DAYS : "7 derniers jours" → période glissante de 7 jours
+LAST_3_DAYS : "3 derniers jours", "ces 3 derniers jours", "trois derniers jours" → période glissante de 3 jours
+YESTERDAY : "hier" → jour précédent seulement
+DAY_BEFORE_YESTERDAY : "avant-hier", "avant hier", "il y a 2 jours" → jour spécifique avant hier (1 jour seulement)
+CURRENT_YEAR : "cette année" → année calendaire en cours
+LAST_YEAR : "année dernière" → année calendaire précédente
+
+GRANULARITÉS:
+HOURLY : "par heure", "consommation horaire", "à l'heure" → granularité horaire
+DAILY : "par jour", "quotidienne", "journalière" → granularité quotidienne
+WEEKLY : "par semaine", "hebdomadaire" → granularité hebdomadaire
+MONTHLY : "par mois", "mensuelle" → granularité mensuelle
+YEARLY : "par an", "par année", "annuelle", "annuel", "moyenne par an", "consommation moyenne par an" → granularité annuelle
+
+JOURS NOMMÉS:
+SATURDAY : "samedi", "samedi dernier" → samedi le plus récent
+SUNDAY : "dimanche", "dimanche dernier" → dimanche le plus récent
+WEEKEND : "weekend", "weekend dernier", "fin de semaine" → samedi + dimanche récents"""
+    
+    # Intentions reconnues par l'orchestrateur
+    INTENTS = ["total", "moyenne", "comparaison", "coût", "prévision", "temporal_specific"]
+    
+    @classmethod
+    def get_combined_system_prompt(cls) -> str:
+        """Prompt unique : code de période + intention + plan d'outils"""
+        return f"""RÔLE: Traducteur question énergétique → JSON
+
+OUTILS: {', '.join(cls.AVAILABLE_TOOLS)}
+INTENTIONS: {', '.join(cls.INTENTS)}
+
+CODE DE PÉRIODE (period_code) — choisir le code EXACT selon le sens précis :
+{cls.PERIOD_CODE_GUIDE}
+
+STRUCTURE:
+{{
+  "period_code": "CODE",
+  "intent": "intention",
+  "steps": [{{"step_id": 1, "tool_name": "outil", "parameters": {{}}, "description": "action", "depends_on": []}}],
+  "summary": "résumé"
+}}
+
+DÉPENDANCES: "depends_on" = step_id des étapes dont la sortie est utilisée (plot → séries à tracer,
+forecast → historique agrégé) ; [] si l'étape est indépendante (exécutée en parallèle).
+RÈGLE: JSON uniquement."""
+    
     @classmethod
     def get_user_prompt(cls, question: str) -> str:
         """Retourne le prompt utilisateur pour une question donnée"""
@@ -127,3 +178,10 @@ def format_plan_prompt(question: str) -> str:
     user_prompt = PlanGeneratorPrompt.get_user_prompt(question)
     
     return f"{system_prompt}\n\n{user_prompt}"
+
+def format_combined_prompt(question: str) -> str:
+    """Formate le prompt combiné (période + plan) pour une question"""
+    system_prompt = PlanGeneratorPrompt.get_combined_system_prompt()
+    user_prompt = PlanGeneratorPrompt.get_user_prompt(question)
+    
+    return f"{system_prompt}\n\n{user_prompt}"
@@ -21,6 +21,7 @@ from typing import Dict, Any, Optional, List
 import json
 
 from .energy_mcp_tools import get_energy_tools
+from .prophet_forecast_tool import ProphetForecastTool
 
 class DashboardTools:
     """Outils spécialisés pour tableau de bord Streamlit"""
@@ -41,13 +42,19 @@ class DashboardTools:
             JSON du graphique Plotly
         """
         try:
-            # Récupérer les données
-            consumption_data = self.energy_tools.query_energy_data(period, "sum")
-            stats_data = self.energy_tools.calculate_statistics(["mean", "max"], "day")
-            
-            if consumption_data["status"] == "error":
+            # Récupérer les données (une seule requête groupée)
+            batch = self.energy_tools.query_energy_batch([
+                {"key": "total", "period": period, "aggregation": "sum"},
+                {"key": "cuisine", "period": period, "aggregation": "sum", "column": "sub_metering_1_kwh"},
+                {"key": "buanderie", "period": period, "aggregation": "sum", "column": "sub_metering_2_kwh"},
+                {"key": "eau_chaude", "period": period, "aggregation": "sum", "column": "sub_metering_3_kwh"}
+            ])
+            
+            if batch["status"] == "error":
                 return json.dumps({"error": "Impossible de récupérer les données"})
             
+            totals = {key: (result["value"] or 0) for key, result in batch["by_key"].items()}
+            
             # Créer le graphique multi-panneaux
             fig = make_subplots(
                 rows=2, cols=2,
@@ -64,7 +71,7 @@ class DashboardTools:
             )
             
             # Panneau 1: Consommation totale
-            total_consumption = consumption_data["summary"]["total"]
+            total_consumption = totals["total"]
             fig.add_trace(
                 go.Indicator(
                     mode="gauge+number",
@@ -97,10 +104,14 @@ class DashboardTools:
                 row=2, col=1
             )
             
-            # Panneau 4: Répartition (simulation)
+            # Panneau 4: Répartition par sous-compteur
+            sub_total = totals["cuisine"] + totals["buanderie"] + totals["eau_chaude"]
             distribution_data = pd.DataFrame({
-                'type': ['Éclairage', 'Chauffage', 'Cuisine', 'Autres'],
-                'pourcentage': [25, 40, 20, 15]
+                'type': ['Cuisine', 'Buanderie', 'Ballon d\'eau chaude', 'Autres'],
+                'pourcentage': [
+                    totals["cuisine"], totals["buanderie"], totals["eau_chaude"],
+                    max(0, totals["total"] - sub_total)
+                ]
             })
             fig.add_trace(
                 go.Pie(labels=distribution_data['type'], values=distribution_data['pourcentage']),
@@ -244,38 +255,34 @@ class DashboardTools:
     
     def create_forecast_dashboard(self, horizon: str = "7d") -> str:
         """
-        Tableau de bord des prévisions
+        Tableau de bord des prévisions (table forecast_data précalculée)
         
         Args:
-            horizon: Horizon de prévision
+            horizon: Horizon de prévision ("7d", "14d", "30d")
             
         Returns:
             JSON du graphique Plotly
         """
         try:
-            # Générer les prévisions
-            forecast_data = self.energy_tools.generate_forecast(horizon, "simple")
+            horizon_days = int(str(horizon).rstrip("d"))
+            forecast = self.energy_tools.forecast_table.read("daily", horizon_days)
             
-            if forecast_data["status"] == "error":
-                return json.dumps({"error": "Impossible de générer les prévisions"})
+            if forecast["status"] == "error":
+                return json.dumps({"error": "Impossible de récupérer les prévisions"})
             
-            # Créer le graphique
-            fig = go.Figure()
+            forecast_df = forecast["forecast_data"]
             
-            # Données historiques (simulation)
-            historical_dates = pd.date_range(start='2024-01-01', periods=30, freq='D')
-            historical_values = np.random.normal(12, 2, 30)
+            # Historique : 30 derniers jours complets (kWh/jour)
+            historical = ProphetForecastTool(use_store=False).load_series(30, "daily")
             
-            # Données de prévision
-            forecast_dates = pd.date_range(start='2024-02-01', periods=7, freq='D')
-            forecast_value = forecast_data["forecast_value"] / 7  # Valeur quotidienne
-            forecast_values = np.random.normal(forecast_value, 1, 7)
+            # Créer le graphique
+            fig = go.Figure()
             
             # Ajouter les données historiques
             fig.add_trace(
                 go.Scatter(
-                    x=historical_dates,
-                    y=historical_values,
+                    x=historical['ds'],
+                    y=historical['y'],
                     mode='lines',
                     name='Historique',
                     line=dict(color='blue', width=2)
@@ -285,22 +292,19 @@ class DashboardTools:
             # Ajouter les prévisions
             fig.add_trace(
                 go.Scatter(
-                    x=forecast_dates,
-                    y=forecast_values,
+                    x=forecast_df['ds'],
+                    y=forecast_df['yhat'],
                     mode='lines+markers',
                     name='Prévision',
                     line=dict(color='red', width=2, dash='dash')
                 )
             )
             
-            # Intervalle de confiance
-            confidence_lower = [v * 0.9 for v in forecast_values]
-            confidence_upper = [v * 1.1 for v in forecast_values]
-            
+            # Intervalle de prédiction du modèle
             fig.add_trace(
                 go.Scatter(
-                    x=forecast_dates,
-                    y=confidence_upper,
+                    x=forecast_df['ds'],
+                    y=forecast_df['yhat_upper'],
                     mode='lines',
                     name='Intervalle de confiance',
                     line=dict(width=0),
@@ -310,13 +314,12 @@ class DashboardTools:
             
             fig.add_trace(
                 go.Scatter(
-                    x=forecast_dates,
-                    y=confidence_lower,
+                    x=forecast_df['ds'],
+                    y=forecast_df['yhat_lower'],
                     mode='lines',
                     fill='tonexty',
-                    name='Intervalle de confiance',
-                    line=dict(width=0),
-                    showlegend=False
+                    name=f"Intervalle {forecast['interval_width'] * 100:.0f}%",
+                    line=dict(width=0)
                 )
             )
             
@@ -324,7 +327,7 @@ class DashboardTools:
             fig.update_layout(
                 title=f"Prévisions de consommation - {horizon}",
                 xaxis_title="Date",
-                yaxis_title="Consommation (kWh)",
+                yaxis_title="Consommation (kWh/jour)",
                 height=400
             )
             
@@ -344,36 +347,34 @@ class DashboardTools:
             JSON du graphique Plotly
         """
         try:
-            # Récupérer les statistiques temporelles
-            stats_data = self.energy_tools.calculate_statistics(["mean"], analysis_type)
+            # Récupérer les statistiques temporelles (heure + jour de semaine en un seul aller-retour)
+            stats_data = self.energy_tools.calculate_statistics(
+                ["mean"], ["hour", "weekday"], columns=["energy_total_kwh"]
+            )
             
             if stats_data["status"] == "error":
                 return json.dumps({"error": "Impossible de récupérer les statistiques"})
             
             # Créer le graphique
             if analysis_type == "hourly":
-                # Analyse horaire
-                hours = list(range(24))
-                consumption = np.random.normal(8, 3, 24)
-                # Pics matin et soir
-                consumption[7:9] += 4  # Matin
-                consumption[18:22] += 6  # Soir
+                # Analyse horaire (relevés toutes les 2h)
+                hourly = stats_data["results"]["hour"]
                 
                 fig = px.bar(
-                    x=hours,
-                    y=consumption,
+                    x=hourly["keys"],
+                    y=hourly["energy_total_kwh"]["mean"],
                     title="Consommation moyenne par heure",
                     labels={'x': 'Heure', 'y': 'Consommation (kWh)'}
                 )
                 
             elif analysis_type == "daily":
-                # Analyse quotidienne
-                days = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
-                consumption = [10, 12, 11, 13, 14, 16, 18]  # Plus le week-end
+                # Analyse quotidienne (ISODOW : 1 = lundi)
+                weekday = stats_data["results"]["weekday"]
+                day_names = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
                 
                 fig = px.bar(
-                    x=days,
-                    y=consumption,
+                    x=[day_names[d - 1] for d in weekday["keys"]],
+                    y=weekday["energy_total_kwh"]["mean"],
                     title="Consommation moyenne par jour",
                     labels={'x': 'Jour', 'y': 'Consommation (kWh)'}
                 )
@@ -13,21 +13,251 @@ Critères d'acceptation :
 """
 
 import os
+import re
+import time
+import queue
+import asyncio
+import threading
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import date, datetime
 import duckdb
 import pandas as pd
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from contextlib import contextmanager
 import logging
 
+from observability.tracer import get_tracer
+from .rollup_manager import RollupManager, rollup_table_name
+
+class CursorPool:
+    """Pool borné de curseurs DuckDB partageant la même base"""
+    
+    def __init__(self, connection, size: int, timeout: float):
+        """
+        Args:
+            connection: Connexion DuckDB racine
+            size: Nombre de curseurs disponibles simultanément
+            timeout: Attente maximale (secondes) pour obtenir un curseur
+        """
+        self.size = size
+        self.timeout = timeout
+        self._cursors = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        
+        # Chaque curseur est une connexion indépendante sur la même base :
+        # DuckDB exécute les requêtes de curseurs différents en parallèle
+        for _ in range(size):
+            self._cursors.put(connection.cursor())
+        
+        # Métriques d'attente
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._in_use = 0
+    
+    def acquire(self):
+        """Obtenir un curseur (bloque au plus `timeout` secondes)"""
+        start = time.perf_counter()
+        try:
+            cursor = self._cursors.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(f"Aucun curseur DuckDB disponible après {self.timeout}s")
+        
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._acquisitions += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._in_use += 1
+        return cursor
+    
+    def release(self, cursor):
+        """Rendre un curseur au pool"""
+        with self._lock:
+            self._in_use -= 1
+        self._cursors.put(cursor)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Métriques du pool (tailles et temps d'attente en millisecondes)"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "available": self._cursors.qsize(),
+                "acquisitions": self._acquisitions,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._total_wait / self._acquisitions * 1000) if self._acquisitions else 0.0,
+                "max_wait_ms": self._max_wait * 1000
+            }
+    
+    def close(self):
+        """Fermer tous les curseurs disponibles"""
+        while not self._cursors.empty():
+            try:
+                self._cursors.get_nowait().close()
+            except queue.Empty:
+                break
+
+class QueryResultCache:
+    """Cache LRU borné (taille + TTL) des résultats de requêtes SELECT"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Args:
+            max_entries: Nombre maximal de résultats conservés (0 = désactivé)
+            ttl: Durée de vie d'une entrée en secondes
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[pd.DataFrame, float, Optional[Tuple]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Compteurs
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    @staticmethod
+    def make_key(query: str, params) -> Tuple:
+        """Clé = SQL normalisé (espaces compactés) + paramètres"""
+        normalized = re.sub(r"\s+", " ", query).strip()
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return normalized, repr(params)
+    
+    @staticmethod
+    def time_range(params) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Plage temporelle couverte par une requête, déduite de ses paramètres datés
+        
+        Returns:
+            (min, max) des paramètres date/datetime, ou None si la requête
+            n'est pas bornée des deux côtés (invalidée par tout ajout)
+        """
+        values = params.values() if isinstance(params, dict) else (params or [])
+        bounds = [pd.Timestamp(v) for v in values if isinstance(v, (datetime, date, pd.Timestamp))]
+        # Une seule borne (ex: timestamp >= ?) → plage ouverte
+        if len(bounds) < 2:
+            return None
+        return min(bounds), max(bounds)
+    
+    def get(self, key: Tuple) -> Optional[pd.DataFrame]:
+        """Résultat en cache (copie) ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            
+            result, stored_at, _ = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return result.copy()
+    
+    def put(self, key: Tuple, result: pd.DataFrame, time_range: Optional[Tuple]):
+        """Mémoriser un résultat (éviction LRU au-delà de max_entries)"""
+        with self._lock:
+            self._entries[key] = (result.copy(), time.monotonic(), time_range)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+    
+    def invalidate_range(self, start, end) -> int:
+        """
+        Supprime les entrées dont la plage recoupe [start, end]
+        
+        Returns:
+            Nombre d'entrées invalidées
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        with self._lock:
+            stale = [
+                key for key, (_, _, time_range) in self._entries.items()
+                if time_range is None or (time_range[0] <= end and start <= time_range[1])
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+        return len(stale)
+    
+    def clear(self):
+        """Vider le cache"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations
+            }
+
 class DatabaseManager:
     """Gestionnaire sécurisé pour DuckDB"""
     
-    def __init__(self, db_path: str):
-        """Initialisation du gestionnaire de base de données"""
+    def __init__(self, db_path: str, pool_size: Optional[int] = None, pool_timeout: Optional[float] = None,
+                 cache_size: Optional[int] = None, cache_ttl: Optional[float] = None):
+        """
+        Initialisation du gestionnaire de base de données
+        
+        Args:
+            db_path: Chemin vers la base DuckDB
+            pool_size: Nombre de curseurs concurrents (défaut: DUCKDB_POOL_SIZE ou nb de cœurs)
+            pool_timeout: Attente maximale d'un curseur en secondes (défaut: DUCKDB_POOL_TIMEOUT ou 30)
+            cache_size: Nombre de résultats en cache (défaut: QUERY_CACHE_SIZE ou 256, 0 = désactivé)
+            cache_ttl: Durée de vie d'un résultat en secondes (défaut: QUERY_CACHE_TTL ou 300)
+        """
         self.db_path = db_path
         self.connection = None
+        self.pool = None
+        self.rollup_granularities: List[str] = []
+        self._append_listeners: List[Callable] = []
         self.logger = logging.getLogger(__name__)
         
+        # Configuration du pool
+        self.pool_size = pool_size or int(os.getenv('DUCKDB_POOL_SIZE', os.cpu_count() or 4))
+        self.pool_timeout = pool_timeout if pool_timeout is not None else float(os.getenv('DUCKDB_POOL_TIMEOUT', 30))
+        
+        # Exécuteur borné pour les appels asynchrones (une tâche par curseur)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="duckdb")
+        
+        # Cache des résultats de requêtes
+        self.query_cache = QueryResultCache(
+            cache_size if cache_size is not None else int(os.getenv('QUERY_CACHE_SIZE', 256)),
+            cache_ttl if cache_ttl is not None else float(os.getenv('QUERY_CACHE_TTL', 300))
+        )
+        
         # Validation du chemin
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Base de données non trouvée: {db_path}")
@@ -35,8 +265,9 @@ class DatabaseManager:
         # Connexion sécurisée
         self._connect()
         self._validate_connection()
+        self._prepare_rollups()
         
-        print(f"✅ Gestionnaire DuckDB initialisé: {db_path}")
+        print(f"✅ Gestionnaire DuckDB initialisé: {db_path} (pool: {self.pool_size} curseurs)")
     
     def _connect(self):
         """Établir une connexion sécurisée"""
@@ -45,6 +276,9 @@ class DatabaseManager:
             # Configuration de sécurité
             self.connection.execute("SET enable_progress_bar=false")
             self.connection.execute("SET memory_limit='1GB'")
+            
+            # Pool de curseurs pour les sessions concurrentes
+            self.pool = CursorPool(self.connection, self.pool_size, self.pool_timeout)
         except Exception as e:
             raise ConnectionError(f"Erreur de connexion DuckDB: {e}")
     
@@ -69,40 +303,138 @@ class DatabaseManager:
         except Exception as e:
             raise ValueError(f"Validation de la base de données échouée: {e}")
     
+    def _prepare_rollups(self):
+        """Créer / rattraper les tables de pré-agrégation (non bloquant)"""
+        try:
+            rollups = RollupManager(self.connection)
+            rollups.ensure_rollups()
+            self.rollup_granularities = rollups.existing_granularities()
+        except Exception as e:
+            # Les requêtes retombent sur energy_data si les rollups sont indisponibles
+            self.logger.warning(f"Rollups indisponibles: {e}")
+            self.rollup_granularities = []
+    
+    def get_rollup_table(self, granularity: str) -> Optional[str]:
+        """Nom de la table de rollup si elle est disponible, sinon None"""
+        if granularity in self.rollup_granularities:
+            return rollup_table_name(granularity)
+        return None
+    
+    def register_append_listener(self, callback: Callable):
+        """
+        Enregistrer un callback appelé après l'ajout de lignes dans energy_data
+        
+        Args:
+            callback: Fonction (start, end) recevant la plage de timestamps ajoutée
+        """
+        if callback not in self._append_listeners:
+            self._append_listeners.append(callback)
+    
+    def notify_data_appended(self, start, end):
+        """Prévenir les structures en mémoire qu'une plage a été ajoutée"""
+        invalidated = self.query_cache.invalidate_range(start, end)
+        if invalidated:
+            self.logger.info(f"Cache requêtes: {invalidated} résultats invalidés")
+        
+        for callback in list(self._append_listeners):
+            try:
+                callback(start, end)
+            except Exception as e:
+                self.logger.warning(f"Mise à jour après ajout échouée: {e}")
+    
     @contextmanager
     def get_connection(self):
-        """Contexte manager pour les connexions sécurisées"""
+        """Contexte manager fournissant un curseur du pool (un par appelant)"""
+        cursor = self.pool.acquire()
         try:
-            yield self.connection
+            yield cursor
         except Exception as e:
             self.logger.error(f"Erreur de base de données: {e}")
             raise
         finally:
-            # Pas de fermeture automatique pour maintenir la connexion
-            pass
+            # Le curseur retourne au pool, la connexion racine reste ouverte
+            self.pool.release(cursor)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques du pool de curseurs"""
+        return self.pool.stats() if self.pool else {}
     
-    def execute_query(self, query: str, params: Optional[Dict] = None) -> pd.DataFrame:
+    def get_data_version(self) -> str:
+        """
+        Jeton de version des données (nombre de lignes + dernier timestamp)
+        
+        Change à chaque ajout dans energy_data, y compris depuis un autre
+        processus : sert de clé d'invalidation aux caches applicatifs.
+        """
+        row = self.execute_query(
+            "SELECT COUNT(*) AS n, MAX(timestamp) AS latest FROM energy_data", use_cache=False
+        ).iloc[0]
+        return f"{int(row['n'])}:{row['latest']}"
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs du cache de résultats"""
+        return self.query_cache.stats()
+    
+    def execute_query(self, query: str, params: Optional[Dict] = None, use_cache: bool = True) -> pd.DataFrame:
         """
         Exécuter une requête sécurisée
         
         Args:
             query: Requête SQL
             params: Paramètres de la requête
+            use_cache: Utiliser le cache de résultats
             
         Returns:
             DataFrame avec les résultats
         """
+        with get_tracer().span("duckdb.execute_query", **{"db.system": "duckdb"}) as span:
+            return self._execute_query(query, params, use_cache, span)
+    
+    async def arun(self, func: Callable, *args, **kwargs):
+        """
+        Exécute une fonction bloquante (accès DuckDB) dans l'exécuteur borné
+        
+        Le contexte (span de trace courant) est propagé au thread.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+    
+    async def aexecute_query(self, query: str, params: Optional[Dict] = None, use_cache: bool = True) -> pd.DataFrame:
+        """Variante asynchrone de execute_query (exécuteur borné au nombre de curseurs)"""
+        return await self.arun(self.execute_query, query, params, use_cache)
+    
+    def _execute_query(self, query: str, params, use_cache: bool, span) -> pd.DataFrame:
+        """Validation, cache et exécution (span optionnel pour les attributs)"""
         try:
             # Validation de la requête
             self._validate_query(query)
+            if span is not None:
+                span.set_attribute("db.statement", re.sub(r"\s+", " ", query).strip()[:500])
+            
+            use_cache = use_cache and self.query_cache.enabled
+            if use_cache:
+                cache_key = self.query_cache.make_key(query, params)
+                cached = self.query_cache.get(cache_key)
+                if cached is not None:
+                    if span is not None:
+                        span.set_attribute("cache_hit", True)
+                    return cached
             
             with self.get_connection() as conn:
                 if params:
                     result = conn.execute(query, params).fetchdf()
                 else:
                     result = conn.execute(query).fetchdf()
-                
-                return result
+            
+            if use_cache:
+                self.query_cache.put(cache_key, result, self.query_cache.time_range(params))
+            if span is not None:
+                span.set_attribute("cache_hit", False)
+                span.set_attribute("db.rows", len(result))
+            
+            return result
                 
         except Exception as e:
             self.logger.error(f"Erreur d'exécution de requête: {e}")
@@ -177,6 +509,9 @@ class DatabaseManager:
     
     def close(self):
         """Fermer la connexion"""
+        self._executor.shutdown(wait=False)
+        if self.pool:
+            self.pool.close()
         if self.connection:
             self.connection.close()
             print("🔒 Connexion DuckDB fermée")
@@ -201,3 +536,8 @@ def get_database_manager() -> DatabaseManager:
             db_path = base_path
         _database_manager = DatabaseManager(db_path)
     return _database_manager
+
+def notify_data_appended(start, end):
+    """Prévenir l'instance globale (si elle existe) d'un ajout dans energy_data"""
+    if _database_manager is not None:
+        _database_manager.notify_data_appended(start, end)
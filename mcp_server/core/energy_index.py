@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+📈 INDEX EN MÉMOIRE SUR LA GRILLE 2H - BLOC 3
+=============================================
+
+Index en mémoire indexés par position sur la grille régulière de 2h
+de energy_data :
+- PrefixSumIndex : sommes cumulées des colonnes d'énergie
+- RangeExtremaIndex : table creuse (sparse table) des min / max
+
+Critères d'acceptation :
+- Somme / moyenne sur une plage quelconque en deux lectures de tableau
+- Min / max (et timestamp associé) en O(1) par requête
+- Construction unique depuis energy_data
+- Ajout incrémental des nouvelles lignes (seul le suffixe est recalculé,
+  tampons à capacité doublée pour éviter les recopies)
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Pas de la grille des mesures
+GRID_STEP = np.timedelta64(2, 'h')
+
+# Colonnes d'énergie indexées (kWh)
+ENERGY_INDEX_COLUMNS: List[str] = [
+    "energy_total_kwh",
+    "sub_metering_1_kwh",
+    "sub_metering_2_kwh",
+    "sub_metering_3_kwh"
+]
+
+# Colonnes indexées pour les min / max (pics de puissance, tension)
+EXTREMA_INDEX_COLUMNS: List[str] = [
+    "energy_total_kwh",
+    "global_active_power_kw",
+    "power_peak_kw",
+    "voltage_v"
+]
+
+def _grow(array: np.ndarray, capacity: int, fill=0) -> np.ndarray:
+    """Nouveau tampon de taille capacity reprenant le contenu de array"""
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class _GridIndex(ABC):
+    """Base commune : correspondance timestamp ↔ position de grille"""
+
+    DEFAULT_COLUMNS: List[str] = []
+
+    def __init__(self, origin, columns: Optional[List[str]] = None, step=GRID_STEP):
+        """
+        Args:
+            origin: Timestamp de la position 0 de la grille
+            columns: Colonnes indexées (défaut: DEFAULT_COLUMNS de la classe)
+            step: Pas de la grille
+        """
+        self.origin = np.datetime64(pd.Timestamp(origin).to_datetime64(), 'ns')
+        self.step = np.timedelta64(step, 'ns')
+        self.columns = list(columns or self.DEFAULT_COLUMNS)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+
+        # Positions couvertes / capacité allouée des tampons
+        self._size = 0
+        self._capacity = 0
+
+        # Valeurs par position + présence d'une mesure
+        self._values: Dict[str, np.ndarray] = {c: np.zeros(0) for c in self.columns}
+        self._present = np.zeros(0, dtype=bool)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, columns: Optional[List[str]] = None):
+        """Construit l'index depuis un DataFrame trié par timestamp"""
+        if df.empty:
+            raise ValueError("Aucune donnée dans energy_data")
+
+        index = cls(df['timestamp'].iloc[0], columns)
+        index.add_rows(df)
+        return index
+
+    @classmethod
+    def from_connection(cls, connection, columns: Optional[List[str]] = None):
+        """Construit l'index depuis energy_data (une seule lecture complète)"""
+        columns = list(columns or cls.DEFAULT_COLUMNS)
+        df = connection.execute(
+            f"SELECT timestamp, {', '.join(columns)} FROM energy_data ORDER BY timestamp"
+        ).fetchdf()
+        return cls.from_dataframe(df, columns)
+
+    @property
+    def size(self) -> int:
+        """Nombre de positions de la grille couvertes"""
+        return self._size
+
+    def _slots(self, timestamps) -> np.ndarray:
+        """Positions de grille de timestamps alignés (ValueError sinon)"""
+        offsets = (np.asarray(timestamps, dtype='datetime64[ns]') - self.origin).astype(np.int64)
+        step = self.step.astype(np.int64)
+
+        if (offsets < 0).any() or (offsets % step != 0).any():
+            raise ValueError("Timestamps hors de la grille de l'index")
+
+        return offsets // step
+
+    def _bound(self, timestamp) -> int:
+        """Première position >= timestamp, bornée à [0, size]"""
+        offset = (np.datetime64(pd.Timestamp(timestamp).to_datetime64(), 'ns') - self.origin).astype(np.int64)
+        step = self.step.astype(np.int64)
+        return int(min(max(-(-offset // step), 0), self._size))
+
+    def _timestamp(self, position: int) -> pd.Timestamp:
+        """Timestamp d'une position de grille"""
+        return pd.Timestamp(self.origin + position * self.step)
+
+    def _reserve(self, size: int):
+        """Agrandit les tampons (capacité doublée) si nécessaire"""
+        if size <= self._capacity:
+            return
+
+        capacity = max(size, 2 * self._capacity, 64)
+        self._present = _grow(self._present, capacity, False)
+        for c in self.columns:
+            self._values[c] = _grow(self._values[c], capacity, np.nan)
+        self._grow_buffers(capacity)
+        self._capacity = capacity
+
+    def add_rows(self, df: pd.DataFrame):
+        """
+        Ajoute (ou remplace) des lignes et met à jour l'index
+
+        Seul le suffixe à partir de la première position touchée est
+        recalculé : un ajout en fin de série ne reparcourt pas l'historique.
+
+        Args:
+            df: DataFrame avec 'timestamp' et les colonnes indexées
+        """
+        if df.empty:
+            return
+
+        slots = self._slots(df['timestamp'].to_numpy(dtype='datetime64[ns]'))
+
+        with self._lock:
+            old_size = self._size
+            self._reserve(int(slots.max()) + 1)
+            self._size = max(old_size, int(slots.max()) + 1)
+
+            self._present[slots] = True
+            for c in self.columns:
+                self._values[c][slots] = df[c].to_numpy(dtype=float, na_value=np.nan)
+
+            # Positions ajoutées (éventuellement vides) incluses dans le recalcul
+            self._rebuild_from(min(int(slots.min()), old_size))
+
+    @abstractmethod
+    def _grow_buffers(self, capacity: int):
+        """Agrandit les tampons propres à l'index"""
+
+    @abstractmethod
+    def _rebuild_from(self, first: int):
+        """Recalcule les structures dérivées à partir d'une position"""
+
+
+class PrefixSumIndex(_GridIndex):
+    """Sommes cumulées par position de grille pour les colonnes d'énergie"""
+
+    DEFAULT_COLUMNS = ENERGY_INDEX_COLUMNS
+
+    def __init__(self, origin, columns: Optional[List[str]] = None, step=GRID_STEP):
+        super().__init__(origin, columns, step)
+
+        # prefix[k] = somme des positions [0, k)
+        self._prefix: Dict[str, np.ndarray] = {c: np.zeros(1) for c in self.columns}
+        self._count_prefix = np.zeros(1, dtype=np.int64)
+        # Mesures non nulles par colonne (diviseur de la moyenne, comme AVG() en SQL)
+        self._valid_prefix: Dict[str, np.ndarray] = {c: np.zeros(1, dtype=np.int64) for c in self.columns}
+
+    def _grow_buffers(self, capacity: int):
+        self._count_prefix = _grow(self._count_prefix, capacity + 1)
+        for c in self.columns:
+            self._prefix[c] = _grow(self._prefix[c], capacity + 1)
+            self._valid_prefix[c] = _grow(self._valid_prefix[c], capacity + 1)
+
+    def _rebuild_from(self, first: int):
+        """Recalcul du suffixe des sommes cumulées"""
+        n = self._size
+        self._count_prefix[first + 1:n + 1] = self._count_prefix[first] + np.cumsum(self._present[first:n])
+        for c in self.columns:
+            # Valeurs manquantes ignorées comme SUM() en SQL
+            values = self._values[c][first:n]
+            self._prefix[c][first + 1:n + 1] = self._prefix[c][first] + np.cumsum(np.nan_to_num(values))
+            self._valid_prefix[c][first + 1:n + 1] = self._valid_prefix[c][first] + np.cumsum(~np.isnan(values))
+
+    def range_sum(self, column: str, start, end) -> Tuple[float, int]:
+        """
+        Somme et nombre de mesures sur [start, end)
+
+        Returns:
+            (somme, nombre de mesures)
+        """
+        with self._lock:
+            lo, hi = self._bound(start), self._bound(end)
+            if hi <= lo:
+                return 0.0, 0
+
+            prefix = self._prefix[column]
+            return float(prefix[hi] - prefix[lo]), int(self._count_prefix[hi] - self._count_prefix[lo])
+
+    def range_valid_count(self, column: str, start, end) -> int:
+        """Nombre de mesures non nulles de column sur [start, end)"""
+        with self._lock:
+            lo, hi = self._bound(start), self._bound(end)
+            if hi <= lo:
+                return 0
+            return int(self._valid_prefix[column][hi] - self._valid_prefix[column][lo])
+
+    def range_timestamps(self, start, end) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """Premier et dernier timestamp mesurés sur [start, end)"""
+        with self._lock:
+            lo, hi = self._bound(start), self._bound(end)
+            counts = self._count_prefix[:self._size + 1]
+            if hi <= lo or counts[hi] == counts[lo]:
+                return None, None
+
+            first = int(np.searchsorted(counts, counts[lo] + 1, side='left')) - 1
+            last = int(np.searchsorted(counts, counts[hi], side='left')) - 1
+            return self._timestamp(first), self._timestamp(last)
+
+    def range_aggregate(self, column: str, start, end, aggregation: str = "sum") -> Dict[str, Any]:
+        """
+        Agrégat "sum" ou "mean" sur [start, end), au format des requêtes SQL
+
+        Returns:
+            Dictionnaire value / count / start_date / end_date (NaN / NaT si vide)
+        """
+        total, count = self.range_sum(column, start, end)
+        valid = self.range_valid_count(column, start, end)
+        first, last = self.range_timestamps(start, end)
+
+        # SUM / AVG ignorent les NULL (NULL si aucune valeur non nulle)
+        if valid == 0:
+            value = np.nan
+        elif aggregation == "mean":
+            value = total / valid
+        else:
+            value = total
+
+        return {
+            "value": value,
+            "count": count,
+            "start_date": first if first is not None else pd.NaT,
+            "end_date": last if last is not None else pd.NaT
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Informations sur l'index"""
+        with self._lock:
+            return {
+                "columns": self.columns,
+                "grid_size": self._size,
+                "records": int(self._count_prefix[self._size]),
+                "origin": str(self._timestamp(0)),
+                "memory_bytes": int(
+                    self._present.nbytes + self._count_prefix.nbytes
+                    + sum(self._values[c].nbytes + self._prefix[c].nbytes + self._valid_prefix[c].nbytes
+                          for c in self.columns)
+                )
+            }
+
+
+class RangeExtremaIndex(_GridIndex):
+    """
+    Table creuse (sparse table) des positions du min / max par colonne
+
+    Le niveau k stocke, pour chaque position i, la position du meilleur
+    élément de [i, i + 2^k). Une requête combine deux fenêtres qui se
+    chevauchent : O(1). Un ajout de m lignes en fin de série recalcule
+    m entrées par niveau : O(m log n).
+    """
+
+    DEFAULT_COLUMNS = EXTREMA_INDEX_COLUMNS
+    KINDS = ("max", "min")
+
+    def __init__(self, origin, columns: Optional[List[str]] = None, step=GRID_STEP):
+        super().__init__(origin, columns, step)
+
+        # Clés de comparaison (-valeur pour le min, -inf sans mesure)
+        self._keys: Dict[str, Dict[str, np.ndarray]] = {
+            kind: {c: np.zeros(0) for c in self.columns} for kind in self.KINDS
+        }
+        # Niveaux de la table creuse (positions, int32)
+        self._tables: Dict[str, Dict[str, List[np.ndarray]]] = {
+            kind: {c: [] for c in self.columns} for kind in self.KINDS
+        }
+
+    def _grow_buffers(self, capacity: int):
+        for kind in self.KINDS:
+            for c in self.columns:
+                self._keys[kind][c] = _grow(self._keys[kind][c], capacity, -np.inf)
+                self._tables[kind][c] = [_grow(level, capacity) for level in self._tables[kind][c]]
+
+    def _rebuild_from(self, first: int):
+        """Recalcul des entrées de la table creuse touchées à partir d'une position"""
+        n = self._size
+
+        for kind in self.KINDS:
+            sign = 1.0 if kind == "max" else -1.0  # un min est un max sur les valeurs opposées
+            for c in self.columns:
+                values = self._values[c][first:n]
+                keys = self._keys[kind][c]
+                keys[first:n] = np.where(self._present[first:n] & ~np.isnan(values), sign * values, -np.inf)
+
+                table = self._tables[kind][c]
+                if not table:
+                    table.append(np.zeros(self._capacity, dtype=np.int32))
+                table[0][first:n] = np.arange(first, n, dtype=np.int32)
+
+                for k in range(1, n.bit_length()):
+                    width = n - (1 << k) + 1
+                    half = 1 << (k - 1)
+
+                    if k < len(table):
+                        start = max(first - (1 << k) + 1, 0)
+                    else:
+                        # Nouveau niveau : calcul complet
+                        table.append(np.zeros(self._capacity, dtype=np.int32))
+                        start = 0
+
+                    left = table[k - 1][start:width]
+                    right = table[k - 1][start + half:width + half]
+                    # Égalité → position la plus ancienne
+                    table[k][start:width] = np.where(keys[right] > keys[left], right, left)
+
+    def range_extremum(self, column: str, start, end, kind: str = "max") -> Tuple[Optional[float], Optional[pd.Timestamp]]:
+        """
+        Valeur extrême et son timestamp sur [start, end)
+
+        Args:
+            column: Colonne indexée
+            kind: "max" ou "min"
+
+        Returns:
+            (valeur, timestamp) ou (None, None) si aucune mesure
+        """
+        with self._lock:
+            lo, hi = self._bound(start), self._bound(end)
+            if hi <= lo:
+                return None, None
+
+            k = (hi - lo).bit_length() - 1
+            table = self._tables[kind][column][k]
+            keys = self._keys[kind][column]
+
+            left, right = int(table[lo]), int(table[hi - (1 << k)])
+            best = right if keys[right] > keys[left] else left
+
+            if np.isinf(keys[best]):
+                return None, None
+            return float(self._values[column][best]), self._timestamp(best)
+
+    def stats(self) -> Dict[str, Any]:
+        """Informations sur l'index"""
+        with self._lock:
+            return {
+                "columns": self.columns,
+                "grid_size": self._size,
+                "levels": self._size.bit_length(),
+                "memory_bytes": int(sum(
+                    level.nbytes
+                    for kind in self.KINDS
+                    for c in self.columns
+                    for level in [self._keys[kind][c], *self._tables[kind][c]]
+                ))
+            }
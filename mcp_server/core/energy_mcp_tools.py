@@ -13,9 +13,10 @@ Critères d'acceptation :
 """
 
 import os
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 # Imports LangChain désactivés - non utilisés et potentiellement incompatibles avec v0.1.0+
 # from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 # from langchain.agents import initialize_agent  # Désactivé - n'existe plus dans LangChain v0.1.0+
@@ -26,6 +27,24 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 import logging
 
 from .database_manager import get_database_manager
+from .energy_index import PrefixSumIndex, RangeExtremaIndex
+from .energy_store import EnergyGridStore, STORE_COLUMNS
+from .period_resolver import get_period_resolver, is_bucket_aligned
+from .prophet_forecast_tool import ProphetForecastTool
+from .forecast_table import get_forecast_table
+from .forecast_backends import PROPHET_AVAILABLE
+
+# Modèles de l'outil "forecast" du planificateur → moteurs de prévision
+FORECAST_MODEL_BACKENDS: Dict[str, str] = {
+    "simple": "holt_winters",
+    "naive": "seasonal_naive",
+    "trend": "holt_winters",
+    "seasonal": "holt_winters",
+    "prophet": "prophet" if PROPHET_AVAILABLE else "holt_winters"
+}
+
+# Historique utilisé pour entraîner les prévisions (jours)
+FORECAST_TRAINING_DAYS = int(os.getenv('FORECAST_TRAINING_DAYS', 365))
 
 class EnergyMCPTools:
     """Outils MCP génériques pour analyse énergétique"""
@@ -38,8 +57,20 @@ class EnergyMCPTools:
         # Gestionnaire de base de données
         self.db_manager = get_database_manager()
         
-        # DataFrame en mémoire pour performance
-        self._load_dataframe()
+        # Codes de période → intervalles absolus [début, fin)
+        self.period_resolver = get_period_resolver()
+        
+        # Historique complet en mémoire (colonnes float32 sur la grille 2h)
+        self._load_store()
+        
+        # Index en mémoire : sommes / moyennes et min / max en O(1)
+        self.energy_index: Optional[PrefixSumIndex] = None
+        self.extrema_index: Optional[RangeExtremaIndex] = None
+        self._build_energy_index()
+        self.db_manager.register_append_listener(self._on_data_appended)
+        
+        # Prévisions précalculées : rattrapage en arrière-plan si forecast_data est en retard
+        self.forecast_table = get_forecast_table()
         
         print("✅ Outils LangChain génériques initialisés")
     
@@ -54,18 +85,247 @@ class EnergyMCPTools:
             self.logger.error(f"Erreur d'initialisation des agents: {e}")
             raise
     
-    def _load_dataframe(self):
-        """Charger les données en mémoire pour performance"""
+    def _load_store(self):
+        """Charger l'historique complet en mémoire pour performance"""
         try:
-            # Charger un échantillon pour les tests
-            self.df = self.db_manager.get_sample_data(limit=1000)
+            with self.db_manager.get_connection() as conn:
+                self.store = EnergyGridStore().load(conn)
             
-            print(f"✅ DataFrame chargé: {len(self.df)} lignes")
+            stats = self.store.stats()
+            print(f"✅ Stockage colonnaire chargé: {stats['records']} lignes ({stats['memory_bytes'] // 1024} Ko)")
             
         except Exception as e:
-            self.logger.error(f"Erreur de chargement du DataFrame: {e}")
+            self.logger.error(f"Erreur de chargement du stockage colonnaire: {e}")
             raise
     
+    def _refresh_store(self):
+        """Rattraper les lignes ajoutées depuis le dernier chargement (watermark)"""
+        try:
+            with self.db_manager.get_connection() as conn:
+                self.store.refresh(conn)
+        except ValueError:
+            # Lignes hors grille → rechargement complet
+            self._load_store()
+    
+    def _build_energy_index(self):
+        """Construire les index en mémoire (non bloquant)"""
+        try:
+            columns = list(dict.fromkeys(PrefixSumIndex.DEFAULT_COLUMNS + RangeExtremaIndex.DEFAULT_COLUMNS))
+            with self.db_manager.get_connection() as conn:
+                df = conn.execute(
+                    f"SELECT timestamp, {', '.join(columns)} FROM energy_data ORDER BY timestamp"
+                ).fetchdf()
+            
+            self.energy_index = PrefixSumIndex.from_dataframe(df)
+            self.extrema_index = RangeExtremaIndex.from_dataframe(df)
+            
+            print(f"✅ Index en mémoire (sommes, min/max): {self.energy_index.size} positions")
+            
+        except Exception as e:
+            # Les requêtes retombent sur DuckDB si les index sont indisponibles
+            self.logger.warning(f"Index en mémoire indisponibles: {e}")
+            self.energy_index = None
+            self.extrema_index = None
+    
+    def _on_data_appended(self, start, end):
+        """Ajout incrémental des lignes insérées dans le stockage et les index"""
+        try:
+            with self.db_manager.get_connection() as conn:
+                self.store.refresh_range(conn, start, end)
+        except ValueError:
+            self._load_store()
+        
+        if self.energy_index is None or self.extrema_index is None:
+            self._build_energy_index()
+            return
+        
+        columns = list(dict.fromkeys(self.energy_index.columns + self.extrema_index.columns))
+        with self.db_manager.get_connection() as conn:
+            new_rows = conn.execute(
+                f"""
+                SELECT timestamp, {', '.join(columns)}
+                FROM energy_data
+                WHERE timestamp >= ? AND timestamp <= ?
+                """,
+                [start, end]
+            ).fetchdf()
+        
+        try:
+            self.energy_index.add_rows(new_rows)
+            self.extrema_index.add_rows(new_rows)
+        except ValueError:
+            # Lignes hors grille (ex: avant l'origine) → reconstruction complète
+            self._build_energy_index()
+    
+    def resolve_period_bounds(self, period: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """Bornes absolues [début, fin) d'un code de période"""
+        resolved = self.period_resolver.resolve(period)
+        return pd.Timestamp(resolved.start), pd.Timestamp(resolved.end)
+    
+    def resolve_periods_bounds(self, periods: List[str]) -> Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Bornes absolues de plusieurs codes de période"""
+        return {period: self.resolve_period_bounds(period) for period in dict.fromkeys(periods)}
+    
+    def select_rollup_table(self, start, end) -> Optional[str]:
+        """Rollup disponible le plus grossier dont les buckets couvrent exactement [start, end)"""
+        for granularity in ("monthly", "weekly", "daily", "hourly"):
+            if is_bucket_aligned(start, granularity) and is_bucket_aligned(end, granularity):
+                rollup_table = self.db_manager.get_rollup_table(granularity)
+                if rollup_table:
+                    return rollup_table
+        return None
+    
+    def can_index_aggregate(self, column: str, aggregation: str) -> bool:
+        """Les index en mémoire couvrent-ils cette colonne / agrégation ?"""
+        if self.energy_index is None:
+            return False
+        if aggregation in ("sum", "mean"):
+            return column in self.energy_index.columns
+        if aggregation in ("max", "min"):
+            return self.extrema_index is not None and column in self.extrema_index.columns
+        return False
+    
+    def _index_aggregate_range(self, column: str, start, end, aggregation: str) -> Dict[str, Any]:
+        """Agrégat sur [start, end) lu dans les index (can_index_aggregate vérifié)"""
+        if aggregation in ("sum", "mean"):
+            return self.energy_index.range_aggregate(column, start, end, aggregation)
+        
+        value, value_timestamp = self.extrema_index.range_extremum(column, start, end, aggregation)
+        _, count = self.energy_index.range_sum(self.energy_index.columns[0], start, end)
+        first, last = self.energy_index.range_timestamps(start, end)
+        return {
+            "value": value if value is not None else np.nan,
+            "count": count,
+            "start_date": first if first is not None else pd.NaT,
+            "end_date": last if last is not None else pd.NaT,
+            "value_timestamp": value_timestamp if value_timestamp is not None else pd.NaT
+        }
+    
+    def indexed_aggregate(self, column: str, period: str, aggregation: str) -> Optional[Dict[str, Any]]:
+        """
+        Agrégat servi par les index en mémoire
+        
+        - sum / mean : index de sommes cumulées
+        - max / min : table creuse, avec le timestamp de la valeur extrême
+        
+        Returns:
+            value / count / start_date / end_date (+ value_timestamp pour max/min),
+            ou None si les index ne couvrent pas la demande
+        """
+        if not self.period_resolver.is_supported(period) or not self.can_index_aggregate(column, aggregation):
+            return None
+        
+        start, end = self.resolve_period_bounds(period)
+        return self._index_aggregate_range(column, start, end, aggregation)
+    
+    def query_energy_batch(self, specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Plusieurs requêtes (période, agrégation, colonne) en un seul passage
+        
+        Les demandes couvertes par les index en mémoire y sont lues ; les
+        autres sont compilées en une seule requête SQL à agrégats
+        conditionnels (AGG(...) FILTER (WHERE ...)), soit un seul scan.
+        
+        Args:
+            specs: Liste de {"period", "aggregation", "column" (défaut energy_total_kwh),
+                "key" (optionnel, identifiant du résultat)}
+            
+        Returns:
+            "results" dans l'ordre des specs et "by_key" indexé par clé
+        """
+        try:
+            valid_aggregations = ["sum", "mean", "max", "min"]
+            
+            # Validation souple, comme query_energy_data
+            normalized = []
+            for spec in specs:
+                period = spec.get("period", "7d")
+                aggregation = spec.get("aggregation", "sum")
+                column = spec.get("column", "energy_total_kwh")
+                
+                if not self.period_resolver.is_supported(period):
+                    period = "7d"
+                if aggregation not in valid_aggregations:
+                    aggregation = "sum"
+                if column not in STORE_COLUMNS:
+                    return {"status": "error", "message": f"Colonne non supportée: {column}"}
+                
+                normalized.append({
+                    "key": spec.get("key", f"{column}:{period}:{aggregation}"),
+                    "period": period,
+                    "aggregation": aggregation,
+                    "column": column
+                })
+            
+            if not normalized:
+                return {"status": "success", "results": [], "by_key": {}}
+            
+            bounds = self.resolve_periods_bounds([spec["period"] for spec in normalized])
+            values: Dict[int, Dict[str, Any]] = {}
+            
+            # 1) Demandes servies par les index en mémoire
+            sql_specs = []
+            for i, spec in enumerate(normalized):
+                if self.can_index_aggregate(spec["column"], spec["aggregation"]):
+                    start, end = bounds[spec["period"]]
+                    values[i] = self._index_aggregate_range(spec["column"], start, end, spec["aggregation"])
+                else:
+                    sql_specs.append(i)
+            
+            # 2) Le reste en une seule requête à agrégats conditionnels
+            if sql_specs:
+                agg_mapping = {"sum": "SUM", "mean": "AVG", "max": "MAX", "min": "MIN"}
+                select, params = [], []
+                for i in sql_specs:
+                    spec = normalized[i]
+                    start, end = bounds[spec["period"]]
+                    condition = "timestamp >= ? AND timestamp < ?"
+                    select.extend([
+                        f"{agg_mapping[spec['aggregation']]}({spec['column']}) FILTER (WHERE {condition}) as v{i}",
+                        f"COUNT(*) FILTER (WHERE {condition}) as n{i}",
+                        f"MIN(timestamp) FILTER (WHERE {condition}) as f{i}",
+                        f"MAX(timestamp) FILTER (WHERE {condition}) as l{i}"
+                    ])
+                    params.extend([start.to_pydatetime(), end.to_pydatetime()] * 4)
+                
+                # Le scan est restreint à l'union des périodes demandées
+                scan_start = min(bounds[normalized[i]["period"]][0] for i in sql_specs)
+                scan_end = max(bounds[normalized[i]["period"]][1] for i in sql_specs)
+                params.extend([scan_start.to_pydatetime(), scan_end.to_pydatetime()])
+                
+                row = self.db_manager.execute_query(f"""
+                    SELECT {', '.join(select)}
+                    FROM energy_data
+                    WHERE timestamp >= ? AND timestamp < ?
+                """, params).iloc[0]
+                
+                for i in sql_specs:
+                    values[i] = {
+                        "value": row[f"v{i}"],
+                        "count": int(row[f"n{i}"]),
+                        "start_date": row[f"f{i}"],
+                        "end_date": row[f"l{i}"]
+                    }
+            
+            results = []
+            for i, spec in enumerate(normalized):
+                value = values[i]["value"]
+                results.append({
+                    **spec,
+                    **values[i],
+                    "value": float(value) if pd.notna(value) else None
+                })
+            
+            return {
+                "status": "success",
+                "results": results,
+                "by_key": {result["key"]: result for result in results}
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Erreur de requête groupée: {e}")
+            return {"status": "error", "message": str(e)}
+    
     def query_energy_data(self, period: str, aggregation: str, filters: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Requête générique sur les données énergétiques
@@ -80,23 +340,28 @@ class EnergyMCPTools:
         """
         try:
             # Validation des paramètres avec valeurs par défaut sécurisées
-            valid_periods = ["1d", "7d", "30d", "month", "year", "current_day", "current_week", "current_month", "current_year", "last_day", "last_week", "last_month", "last_year"]
             valid_aggregations = ["sum", "mean", "max", "min"]
             
             # Validation souple avec valeurs par défaut
             validated_period = period
             validated_aggregation = aggregation
             
-            if period not in valid_periods:
+            if not self.period_resolver.is_supported(period):
                 validated_period = "7d"  # Valeur par défaut sécurisée
             if aggregation not in valid_aggregations:
                 validated_aggregation = "sum"  # Valeur par défaut sécurisée
             
-            # Construction de la requête SQL
-            query = self._build_energy_query(validated_period, validated_aggregation, filters)
+            # Somme / moyenne / min / max : lectures dans les index en mémoire
+            indexed = self.indexed_aggregate("energy_total_kwh", validated_period, validated_aggregation)
             
-            # Exécution via le gestionnaire sécurisé
-            result_df = self.db_manager.execute_query(query)
+            if indexed is not None:
+                result_df = pd.DataFrame([indexed])
+            else:
+                # Construction de la requête SQL
+                query, params = self._build_energy_query(validated_period, validated_aggregation, filters)
+                
+                # Exécution via le gestionnaire sécurisé
+                result_df = self.db_manager.execute_query(query, params)
             
             # Conversion en format JSON avec sérialisation des timestamps
             result = {
@@ -116,28 +381,38 @@ class EnergyMCPTools:
             self.logger.error(f"Erreur de requête énergétique: {e}")
             return {"status": "error", "message": str(e)}
     
-    def _build_energy_query(self, period: str, aggregation: str, filters: Optional[Dict] = None) -> str:
-        """Construire une requête SQL sécurisée"""
-        
-        # Mapping des périodes avec logique temporelle DYNAMIQUE
-        # Basé sur CURRENT_DATE pour être relatif à la date système réelle
-        period_mapping = {
-            "1d": "DATE(timestamp) = CURRENT_DATE - INTERVAL 1 DAY",
-            "7d": "timestamp >= CURRENT_DATE - INTERVAL 7 DAY AND timestamp <= CURRENT_DATE",
-            "30d": "timestamp >= CURRENT_DATE - INTERVAL 30 DAY AND timestamp <= CURRENT_DATE",
-            "month": "timestamp >= DATE_TRUNC('month', CURRENT_DATE) AND timestamp <= CURRENT_DATE",
-            "year": "timestamp >= DATE_TRUNC('year', CURRENT_DATE) AND timestamp <= CURRENT_DATE",
-            "current_day": "DATE(timestamp) = CURRENT_DATE",
-            "current_week": "timestamp >= DATE_TRUNC('week', CURRENT_DATE) AND timestamp <= CURRENT_DATE",
-            "current_month": "timestamp >= DATE_TRUNC('month', CURRENT_DATE) AND timestamp <= CURRENT_DATE",
-            "current_year": "timestamp >= DATE_TRUNC('year', CURRENT_DATE) AND timestamp <= CURRENT_DATE",
-            "last_day": "DATE(timestamp) = CURRENT_DATE - INTERVAL 1 DAY",
-            "last_week": "timestamp >= DATE_TRUNC('week', CURRENT_DATE) - INTERVAL 7 DAY AND timestamp < DATE_TRUNC('week', CURRENT_DATE)",
-            "last_month": "timestamp >= DATE_TRUNC('month', CURRENT_DATE - INTERVAL 1 MONTH) AND timestamp < DATE_TRUNC('month', CURRENT_DATE)",
-            "last_year": "timestamp >= DATE_TRUNC('year', CURRENT_DATE - INTERVAL 1 YEAR) AND timestamp < DATE_TRUNC('year', CURRENT_DATE)"
-        }
+    def _build_energy_query(self, period: str, aggregation: str, filters: Optional[Dict] = None) -> Tuple[str, List]:
+        """
+        Construire une requête SQL sécurisée (routée vers le rollup adapté)
+        
+        Returns:
+            (requête, paramètres) : texte stable, bornes absolues en paramètres
+        """
+        
+        # Construction de la requête (sécurisée - validation déjà faite)
+        start, end = self.resolve_period_bounds(period)
+        params = [start.to_pydatetime(), end.to_pydatetime()]
+        rollup_table = self.select_rollup_table(start, end)
+        
+        if rollup_table:
+            # Lecture des buckets pré-agrégés au lieu des lignes 2h
+            agg_mapping = {
+                "sum": "SUM(energy_total_kwh_sum)",
+                "mean": "SUM(energy_total_kwh_sum) / SUM(record_count)",
+                "max": "MAX(energy_total_kwh_max)",
+                "min": "MIN(energy_total_kwh_min)"
+            }
+            return f"""
+                SELECT 
+                    {agg_mapping[aggregation]} as value,
+                    COALESCE(SUM(record_count), 0) as count,
+                    MIN(first_timestamp) as start_date,
+                    MAX(last_timestamp) as end_date
+                FROM {rollup_table}
+                WHERE bucket_start >= ? AND bucket_start < ?
+            """, params
         
-        # Mapping des agrégations (sécurisé - validation déjà faite)
+        # Mapping des agrégations sur les lignes brutes (fallback)
         agg_mapping = {
             "sum": "SUM(energy_total_kwh)",
             "mean": "AVG(energy_total_kwh)",
@@ -145,32 +420,55 @@ class EnergyMCPTools:
             "min": "MIN(energy_total_kwh)"
         }
         
-        # Construction de la requête (sécurisée)
-        where_clause = period_mapping[period]  # Validation garantie
-        agg_function = agg_mapping[aggregation]  # Validation garantie
-        
         query = f"""
             SELECT 
-                {agg_function} as value,
+                {agg_mapping[aggregation]} as value,
                 COUNT(*) as count,
                 MIN(timestamp) as start_date,
                 MAX(timestamp) as end_date
             FROM energy_data 
-            WHERE {where_clause}
+            WHERE timestamp >= ? AND timestamp < ?
         """
         
-        return query
+        return query, params
+    
+    # Clés de groupement temporelles (expressions DuckDB)
+    STATISTICS_GROUP_KEYS = {
+        "hour": "EXTRACT(hour FROM timestamp)",
+        "day": "EXTRACT(day FROM timestamp)",
+        "weekday": "ISODOW(timestamp)",
+        "week": "EXTRACT(week FROM timestamp)",
+        "month": "EXTRACT(month FROM timestamp)",
+        "season": """CASE
+            WHEN EXTRACT(month FROM timestamp) IN (12, 1, 2) THEN 'hiver'
+            WHEN EXTRACT(month FROM timestamp) IN (3, 4, 5) THEN 'printemps'
+            WHEN EXTRACT(month FROM timestamp) IN (6, 7, 8) THEN 'été'
+            ELSE 'automne' END"""
+    }
     
-    def calculate_statistics(self, metrics: List[str], group_by: str) -> Dict[str, Any]:
+    # Métrique → fonction d'agrégat DuckDB
+    STATISTICS_METRICS = {
+        "mean": "AVG",
+        "std": "STDDEV_SAMP",
+        "min": "MIN",
+        "max": "MAX",
+        "sum": "SUM",
+        "count": "COUNT"
+    }
+    
+    def calculate_statistics(self, metrics: List[str], group_by, columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Calculs statistiques génériques
+        Calculs statistiques génériques (une seule requête DuckDB)
         
         Args:
-            metrics: Métriques à calculer ("mean", "std", "min", "max", "sum")
-            group_by: Groupement ("hour", "hourly", "day", "daily", "week", "weekly", "month", "monthly")
+            metrics: Métriques à calculer ("mean", "std", "min", "max", "sum", "count")
+            group_by: Groupement ou liste de groupements (GROUPING SETS) parmi
+                "hour", "day" (jour du mois), "weekday", "week" (ISO), "month", "season"
+            columns: Colonnes analysées (défaut: global_active_power_kw)
             
         Returns:
-            Statistiques calculées
+            Statistiques calculées : "results" colonnaire par groupement,
+            "statistics" {métrique: {clé: valeur}} pour le premier groupement
         """
         try:
             # Normalisation des types de groupement
@@ -179,45 +477,75 @@ class EnergyMCPTools:
                 "hourly": "hour",
                 "day": "day", 
                 "daily": "day",
+                "weekday": "weekday",
+                "day_of_week": "weekday",
                 "week": "week",
                 "weekly": "week",
                 "month": "month",
-                "monthly": "month"
+                "monthly": "month",
+                "season": "season",
+                "seasonal": "season",
+                "saison": "season"
             }
             
-            normalized_group = group_mapping.get(group_by, group_by)
-            
-            # Utilisation de Pandas pour les calculs
-            if normalized_group == "hour":
-                grouped = self.df.groupby(self.df['timestamp'].dt.hour)
-            elif normalized_group == "day":
-                grouped = self.df.groupby(self.df['timestamp'].dt.day)
-            elif normalized_group == "week":
-                grouped = self.df.groupby(self.df['timestamp'].dt.isocalendar().week)
-            elif normalized_group == "month":
-                grouped = self.df.groupby(self.df['timestamp'].dt.month)
-            else:
-                # Fallback pour les autres types
-                grouped = self.df.groupby(group_by)
-            
-            # Calcul des statistiques
-            stats = {}
-            for metric in metrics:
-                if metric == "mean":
-                    stats[metric] = grouped['global_active_power_kw'].mean().to_dict()
-                elif metric == "std":
-                    stats[metric] = grouped['global_active_power_kw'].std().to_dict()
-                elif metric == "min":
-                    stats[metric] = grouped['global_active_power_kw'].min().to_dict()
-                elif metric == "max":
-                    stats[metric] = grouped['global_active_power_kw'].max().to_dict()
-                elif metric == "sum":
-                    stats[metric] = grouped['global_active_power_kw'].sum().to_dict()
+            group_list = [group_by] if isinstance(group_by, str) else list(group_by)
+            keys = list(dict.fromkeys(group_mapping.get(g, g) for g in group_list))
+            unsupported = [k for k in keys if k not in self.STATISTICS_GROUP_KEYS]
+            if not keys or unsupported:
+                return {"status": "error", "message": f"Groupement non supporté: {unsupported or group_by}"}
+            
+            columns = columns or ["global_active_power_kw"]
+            invalid_columns = [c for c in columns if c not in STORE_COLUMNS]
+            if invalid_columns:
+                return {"status": "error", "message": f"Colonnes non supportées: {invalid_columns}"}
+            
+            requested = [m for m in dict.fromkeys(metrics) if m in self.STATISTICS_METRICS]
+            
+            # Une seule passe : toutes les métriques × colonnes × groupements
+            key_select = [f"{self.STATISTICS_GROUP_KEYS[k]} AS {k}_key" for k in keys]
+            grouping_select = [f"GROUPING({k}_key) AS {k}_grouping" for k in keys]
+            metric_select = [f"COUNT({c}) AS {c}__n" for c in columns]
+            metric_select += [
+                f"{self.STATISTICS_METRICS[m]}({c}) AS {c}__{m}"
+                for c in columns for m in requested
+            ]
+            grouping_sets = ", ".join(f"({k}_key)" for k in keys)
+            
+            query = f"""
+                SELECT {', '.join(key_select + grouping_select + metric_select)}
+                FROM energy_data
+                GROUP BY GROUPING SETS ({grouping_sets})
+            """
+            result_df = self.db_manager.execute_query(query)
+            
+            # Résultat colonnaire par groupement
+            results = {}
+            for k in keys:
+                rows = result_df[result_df[f"{k}_grouping"] == 0].sort_values(f"{k}_key")
+                key_values = rows[f"{k}_key"].tolist()
+                if k != "season":
+                    key_values = [int(v) for v in key_values]
+                
+                results[k] = {"keys": key_values}
+                for c in columns:
+                    results[k][c] = {"count": rows[f"{c}__n"].astype(int).tolist()}
+                    for m in requested:
+                        results[k][c][m] = rows[f"{c}__{m}"].astype(float).tolist()
+            
+            # Format historique : {métrique: {clé: valeur}} (premier groupement)
+            legacy_column = "global_active_power_kw" if "global_active_power_kw" in columns else columns[0]
+            first = results[keys[0]]
+            stats = {
+                m: dict(zip(first["keys"], first[legacy_column][m]))
+                for m in requested
+            }
             
             return {
                 "status": "success",
                 "metrics": metrics,
                 "group_by": group_by,
+                "columns": columns,
+                "results": results,
                 "statistics": stats
             }
             
@@ -238,16 +566,20 @@ class EnergyMCPTools:
             Résultats de la comparaison
         """
         try:
-            # Calcul pour chaque période
-            result1 = self.query_energy_data(period1, "mean")
-            result2 = self.query_energy_data(period2, "mean")
+            # Calcul des deux périodes en un seul passage
+            batch = self.query_energy_batch([
+                {"key": "period1", "period": period1, "aggregation": "mean"},
+                {"key": "period2", "period": period2, "aggregation": "mean"}
+            ])
             
-            if result1["status"] == "error" or result2["status"] == "error":
+            if batch["status"] == "error":
                 return {"status": "error", "message": "Erreur lors du calcul des périodes"}
             
             # Calcul de la différence
-            value1 = result1["summary"]["total"]
-            value2 = result2["summary"]["total"]
+            value1 = batch["by_key"]["period1"]["value"]
+            value2 = batch["by_key"]["period2"]["value"]
+            value1 = value1 if value1 is not None else float("nan")
+            value2 = value2 if value2 is not None else float("nan")
             difference = value2 - value1
             percentage_change = (difference / value1 * 100) if value1 != 0 else 0
             
@@ -295,23 +627,29 @@ class EnergyMCPTools:
             if method not in valid_methods:
                 return {"status": "error", "message": f"Méthode non supportée: {method}. Méthodes valides: {valid_methods}"}
             
+            # Historique complet (stockage colonnaire), positions sans valeur ignorées
+            self._refresh_store()
+            power = self.store.column('global_active_power_kw').astype(np.float64)
+            valid_power = power[~np.isnan(power)]
+            
             if method == "zscore":
                 # Détection par Z-score
-                z_scores = np.abs((self.df['global_active_power_kw'] - self.df['global_active_power_kw'].mean()) / self.df['global_active_power_kw'].std())
-                anomalies = self.df[z_scores > threshold_float]
+                z_scores = np.abs((power - valid_power.mean()) / valid_power.std(ddof=1))
+                mask = z_scores > threshold_float
                 
             elif method == "iqr":
                 # Détection par IQR
-                Q1 = self.df['global_active_power_kw'].quantile(0.25)
-                Q3 = self.df['global_active_power_kw'].quantile(0.75)
+                Q1, Q3 = np.quantile(valid_power, [0.25, 0.75])
                 IQR = Q3 - Q1
                 lower_bound = Q1 - threshold_float * IQR
                 upper_bound = Q3 + threshold_float * IQR
-                anomalies = self.df[(self.df['global_active_power_kw'] < lower_bound) | (self.df['global_active_power_kw'] > upper_bound)]
+                mask = (power < lower_bound) | (power > upper_bound)
                 
             elif method == "threshold":
                 # Détection par seuil simple
-                anomalies = self.df[self.df['global_active_power_kw'] > threshold_float]
+                mask = power > threshold_float
+            
+            anomalies = self.store.to_frame(positions=np.flatnonzero(mask))
             
             return {
                 "status": "success",
@@ -368,45 +706,59 @@ class EnergyMCPTools:
     
     def generate_forecast(self, horizon: str, model: str) -> Dict[str, Any]:
         """
-        Prévision générique
+        Prévision générique (séries journalières de energy_data)
         
         Args:
-            horizon: Horizon de prévision ("7d", "30d", "90d")
-            model: Modèle à utiliser ("simple", "trend", "seasonal")
+            horizon: Horizon de prévision ("7d", "30d", "90d", ...)
+            model: Modèle à utiliser ("simple", "naive", "trend", "seasonal", "prophet")
             
         Returns:
             Prévisions générées
         """
         try:
-            # Pour l'instant, prévision simple basée sur la moyenne
-            if model == "simple":
-                # Moyenne des 7 derniers jours
-                recent_data = self.query_energy_data("7d", "mean")
-                if recent_data["status"] == "error":
-                    return recent_data
-                
-                average_consumption = recent_data["summary"]["total"]
-                
-                # Prévision simple
-                if horizon == "7d":
-                    forecast_value = average_consumption * 7
-                elif horizon == "30d":
-                    forecast_value = average_consumption * 30
-                elif horizon == "90d":
-                    forecast_value = average_consumption * 90
-                else:
-                    return {"status": "error", "message": f"Horizon non supporté: {horizon}"}
-                
-                return {
-                    "status": "success",
-                    "horizon": horizon,
-                    "model": model,
-                    "forecast_value": forecast_value,
-                    "confidence_interval": [forecast_value * 0.9, forecast_value * 1.1]
-                }
+            backend = FORECAST_MODEL_BACKENDS.get(model)
+            if backend is None:
+                return {"status": "error", "message": f"Modèle non supporté: {model}"}
+            
+            match = re.fullmatch(r"(\d+)d", str(horizon))
+            if not match or int(match.group(1)) <= 0:
+                return {"status": "error", "message": f"Horizon non supporté: {horizon}"}
+            horizon_days = int(match.group(1))
             
+            if backend == self.forecast_table.backend and horizon_days <= self.forecast_table.horizon_days:
+                # Table forecast_data précalculée : simple SELECT
+                forecast = self.forecast_table.read("daily", horizon_days)
+                if forecast["status"] == "error":
+                    return forecast
             else:
-                return {"status": "error", "message": f"Modèle non supporté: {model}"}
+                # Autre moteur ou horizon au-delà de la table : calcul à la demande
+                forecaster = ProphetForecastTool(backend=backend)
+                training = forecaster.train_model(FORECAST_TRAINING_DAYS, granularity="daily")
+                if training["status"] == "error":
+                    return training
+                
+                forecast = forecaster.generate_forecast(horizon_days)
+                if forecast["status"] == "error":
+                    return forecast
+            
+            forecast_df = forecast["forecast_data"]
+            forecast_value = float(forecast_df["yhat"].sum())
+            # P10 / P90 du total des trajectoires sur l'horizon (dernière ligne du cumul)
+            horizon_end = forecast_df.iloc[-1]
+            
+            return {
+                "status": "success",
+                "horizon": horizon,
+                "model": model,
+                "backend": backend,
+                "forecast_value": forecast_value,
+                "confidence_interval": [float(horizon_end["total_lower"]), float(horizon_end["total_upper"])],
+                "daily_forecast": [
+                    {"date": row.ds.strftime('%Y-%m-%d'), "value": float(row.yhat),
+                     "lower": float(row.yhat_lower), "median": float(row.p50), "upper": float(row.yhat_upper)}
+                    for row in forecast_df.itertuples()
+                ]
+            }
                 
         except Exception as e:
             self.logger.error(f"Erreur de prévision: {e}")
@@ -452,23 +804,48 @@ class EnergyCapabilities:
         }
         
         column = metric_columns.get(zone or metric, "energy_total_kwh")
+        sql_aggregation = {"sum": "SUM", "mean": "AVG", "avg": "AVG", "max": "MAX", "min": "MIN"}.get(aggregation)
+        
+        # Période ou agrégation inconnue → méthode existante (valeurs par défaut sécurisées)
+        if sql_aggregation is None or not self.energy_tools.period_resolver.is_supported(period):
+            return self.energy_tools.query_energy_data(period, aggregation)
         
         try:
-            # Requête générique avec syntaxe DuckDB correcte
-            period_days = period.replace('d', '').replace('month', '30')
+            # Sommes / moyennes / pics des colonnes indexées : index en mémoire
+            indexed = self.energy_tools.indexed_aggregate(
+                column, period, {"avg": "mean"}.get(aggregation, aggregation)
+            )
+            
+            if indexed is not None:
+                result = {
+                    "value": indexed["value"] if indexed["count"] else 0,
+                    "records_count": indexed["count"],
+                    "metric": metric,
+                    "zone": zone,
+                    "aggregation": aggregation,
+                    "period": period,
+                    "source": "generic_capability"
+                }
+                if "value_timestamp" in indexed and pd.notna(indexed["value_timestamp"]):
+                    result["value_timestamp"] = str(indexed["value_timestamp"])
+                return result
+            
+            # Requête générique paramétrée par les bornes absolues
+            start, end = self.energy_tools.resolve_period_bounds(period)
             sql = f"""
             SELECT 
-                {aggregation.upper()}({column}) as value,
+                {sql_aggregation}({column}) as value,
                 COUNT(*) as records_count
             FROM energy_data
-            WHERE timestamp >= CURRENT_DATE - INTERVAL '{period_days} days'
+            WHERE timestamp >= ? AND timestamp < ?
             """
             
-            result = self.db_manager.execute_query(sql)
+            result = self.db_manager.execute_query(sql, [start.to_pydatetime(), end.to_pydatetime()])
+            value = result.iloc[0]['value'] if not result.empty else None
             
             return {
-                "value": result[0][0] if result else 0,
-                "records_count": result[0][1] if result else 0,
+                "value": float(value) if pd.notna(value) else 0,
+                "records_count": int(result.iloc[0]['records_count']) if not result.empty else 0,
                 "metric": metric,
                 "zone": zone,
                 "aggregation": aggregation,
@@ -493,10 +870,16 @@ class EnergyCapabilities:
         - "Combien pour économiser 5€" (Question 41 critique!)
         """
         
-        # Si pas de consommation fournie, la récupérer
+        # Si pas de consommation fournie, la récupérer (index de sommes cumulées)
         if consumption_kwh is None and period:
-            consumption_data = self.execute_temporal_aggregation("consumption", period, "sum")
-            consumption_kwh = consumption_data.get("value", 0)
+            indexed = self.energy_tools.indexed_aggregate("energy_total_kwh", period, "sum")
+            if indexed is not None:
+                consumption_kwh = indexed["value"] if indexed["count"] else 0
+            else:
+                consumption_data = self.execute_temporal_aggregation("consumption", period, "sum")
+                consumption_kwh = consumption_data.get("value", consumption_data.get("summary", {}).get("total", 0))
+                if pd.isna(consumption_kwh):
+                    consumption_kwh = 0
         
         if consumption_kwh is None:
             consumption_kwh = 0
@@ -537,21 +920,39 @@ class EnergyCapabilities:
         """
         
         try:
-            period_days = period.replace('d', '').replace('month', '30')
-            sql = f"""
-            SELECT 
-                SUM(sub_metering_1_kwh) as cuisine,
-                SUM(sub_metering_2_kwh) as buanderie,
-                SUM(sub_metering_3_kwh) as chauffage,
-                SUM(energy_total_kwh) as total
-            FROM energy_data
-            WHERE timestamp >= CURRENT_DATE - INTERVAL '{period_days} days'
-            """
-            
-            result = self.db_manager.execute_query(sql)
-            
-            if result:
-                cuisine, buanderie, chauffage, total = result[0]
+            if not self.energy_tools.period_resolver.is_supported(period):
+                return {"error": f"Période non supportée: {period}", "period": period}
+            
+            start, end = self.energy_tools.resolve_period_bounds(period)
+            params = [start.to_pydatetime(), end.to_pydatetime()]
+            rollup_table = self.energy_tools.select_rollup_table(start, end)
+            
+            if rollup_table:
+                # Bornes alignées sur des buckets entiers → rollup
+                sql = f"""
+                SELECT 
+                    SUM(sub_metering_1_kwh_sum) as cuisine,
+                    SUM(sub_metering_2_kwh_sum) as buanderie,
+                    SUM(sub_metering_3_kwh_sum) as chauffage,
+                    SUM(energy_total_kwh_sum) as total
+                FROM {rollup_table}
+                WHERE bucket_start >= ? AND bucket_start < ?
+                """
+            else:
+                sql = f"""
+                SELECT 
+                    SUM(sub_metering_1_kwh) as cuisine,
+                    SUM(sub_metering_2_kwh) as buanderie,
+                    SUM(sub_metering_3_kwh) as chauffage,
+                    SUM(energy_total_kwh) as total
+                FROM energy_data
+                WHERE timestamp >= ? AND timestamp < ?
+                """
+            
+            result = self.db_manager.execute_query(sql, params)
+            
+            if not result.empty and pd.notna(result.iloc[0]['total']):
+                cuisine, buanderie, chauffage, total = (float(v) for v in result.iloc[0])
                 autres = max(0, total - (cuisine + buanderie + chauffage))
                 
                 return {
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+🗄️ STOCKAGE COLONNAIRE SUR GRILLE 2H - BLOC 3
+=============================================
+
+Historique complet de energy_data en mémoire, au format colonnaire :
+- Timestamps implicites (origine + i·2h), aucun tableau de dates stocké
+- Une colonne float32 NumPy par mesure
+- Positions manquantes suivies dans un bitmap compacté (1 bit / position)
+
+Critères d'acceptation :
+- Chargement en une seule lecture Arrow (fetchnumpy en repli)
+- Empreinte mémoire réduite par rapport au DataFrame pandas
+- Rafraîchissement incrémental depuis le dernier timestamp chargé
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .energy_index import GRID_STEP, _grow
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Colonnes de mesures conservées en mémoire
+STORE_COLUMNS: List[str] = [
+    "energy_total_kwh",
+    "sub_metering_1_kwh",
+    "sub_metering_2_kwh",
+    "sub_metering_3_kwh",
+    "global_active_power_kw",
+    "global_reactive_power_kw",
+    "voltage_v",
+    "global_intensity_a",
+    "power_peak_kw",
+    "power_min_kw"
+]
+
+class EnergyGridStore:
+    """Colonnes float32 indexées par position sur la grille régulière"""
+
+    def __init__(self, columns: Optional[List[str]] = None, step=GRID_STEP):
+        """
+        Args:
+            columns: Colonnes chargées (défaut: STORE_COLUMNS)
+            step: Pas de la grille
+        """
+        self.columns = list(columns or STORE_COLUMNS)
+        self.step = np.timedelta64(step, 'ns')
+        self.origin: Optional[np.datetime64] = None
+        self.watermark: Optional[pd.Timestamp] = None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+
+        self._size = 0
+        self._capacity = 0
+        self._data: Dict[str, np.ndarray] = {c: np.zeros(0, dtype=np.float32) for c in self.columns}
+        self._bitmap = np.zeros(0, dtype=np.uint8)
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    def _fetch(self, connection, where: str = "", params: Optional[List] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Lecture colonnaire de energy_data (Arrow, sinon fetchnumpy)"""
+        query = f"SELECT timestamp, {', '.join(self.columns)} FROM energy_data {where} ORDER BY timestamp"
+        result = connection.execute(query, params or [])
+
+        if ARROW_AVAILABLE:
+            table = result.fetch_arrow_table()
+            timestamps = table.column("timestamp").to_numpy()
+            columns = {c: table.column(c).to_numpy() for c in self.columns}
+        else:
+            arrays = result.fetchnumpy()
+            timestamps = np.asarray(arrays["timestamp"])
+            columns = {c: np.ma.filled(arrays[c], np.nan) for c in self.columns}
+
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        columns = {c: np.asarray(v, dtype=np.float32) for c, v in columns.items()}
+        return timestamps, columns
+
+    def load(self, connection) -> "EnergyGridStore":
+        """Chargement complet de l'historique"""
+        timestamps, columns = self._fetch(connection)
+        if len(timestamps) == 0:
+            raise ValueError("Aucune donnée dans energy_data")
+
+        with self._lock:
+            self.origin = timestamps[0]
+            self._size = 0
+            self._capacity = 0
+            self._data = {c: np.zeros(0, dtype=np.float32) for c in self.columns}
+            self._bitmap = np.zeros(0, dtype=np.uint8)
+            self.watermark = None
+            self.add_rows(timestamps, columns)
+
+        self.logger.info(f"Stockage colonnaire chargé: {self._size} positions")
+        return self
+
+    def refresh(self, connection) -> int:
+        """
+        Ajoute les lignes postérieures au dernier timestamp chargé
+
+        Returns:
+            Nombre de lignes ajoutées
+        """
+        if self.watermark is None:
+            self.load(connection)
+            return self.record_count
+
+        timestamps, columns = self._fetch(connection, "WHERE timestamp > ?", [self.watermark.to_pydatetime()])
+        self.add_rows(timestamps, columns)
+        return len(timestamps)
+
+    def refresh_range(self, connection, start, end) -> int:
+        """
+        Recharge une plage [start, end] (comblement de trous inclus)
+
+        Returns:
+            Nombre de lignes relues
+        """
+        if self.watermark is None:
+            self.load(connection)
+            return self.record_count
+
+        timestamps, columns = self._fetch(connection, "WHERE timestamp >= ? AND timestamp <= ?", [start, end])
+        self.add_rows(timestamps, columns)
+        return len(timestamps)
+
+    def add_rows(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Écrit des lignes aux positions de grille correspondantes
+
+        Args:
+            timestamps: Timestamps alignés sur la grille
+            columns: Valeurs par colonne (mêmes longueurs)
+        """
+        if len(timestamps) == 0:
+            return
+
+        with self._lock:
+            offsets = (np.asarray(timestamps, dtype='datetime64[ns]') - self.origin).astype(np.int64)
+            step = self.step.astype(np.int64)
+            if (offsets < 0).any() or (offsets % step != 0).any():
+                raise ValueError("Timestamps hors de la grille du stockage")
+            slots = offsets // step
+
+            self._reserve(int(slots.max()) + 1)
+            self._size = max(self._size, int(slots.max()) + 1)
+
+            for c in self.columns:
+                self._data[c][slots] = columns[c]
+            # Bit i de l'octet b ↔ position 8b + i (ordre 'little')
+            np.bitwise_or.at(self._bitmap, slots >> 3, (1 << (slots & 7)).astype(np.uint8))
+
+            latest = pd.Timestamp(np.max(timestamps))
+            if self.watermark is None or latest > self.watermark:
+                self.watermark = latest
+
+    def _reserve(self, size: int):
+        """Agrandit les tampons (capacité doublée) si nécessaire"""
+        if size <= self._capacity:
+            return
+
+        capacity = max(size, 2 * self._capacity, 64)
+        for c in self.columns:
+            self._data[c] = _grow(self._data[c], capacity, np.nan)
+        self._bitmap = _grow(self._bitmap, (capacity + 7) // 8)
+        self._capacity = capacity
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        """Nombre de positions de la grille couvertes"""
+        return self._size
+
+    @property
+    def record_count(self) -> int:
+        """Nombre de positions mesurées"""
+        return int(self.present_mask().sum())
+
+    def present_mask(self) -> np.ndarray:
+        """Masque booléen des positions mesurées"""
+        with self._lock:
+            return np.unpackbits(self._bitmap, count=self._size, bitorder='little').astype(bool)
+
+    def timestamps(self, present_only: bool = True) -> np.ndarray:
+        """Timestamps (reconstruits depuis la grille)"""
+        positions = np.arange(self._size)
+        if present_only:
+            positions = positions[self.present_mask()]
+        return self.origin + positions * self.step
+
+    def column(self, name: str, present_only: bool = True) -> np.ndarray:
+        """Valeurs float32 d'une colonne (vue, sans copie si present_only=False)"""
+        with self._lock:
+            values = self._data[name][:self._size]
+            return values[self.present_mask()] if present_only else values
+
+    def to_frame(self, columns: Optional[List[str]] = None, positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        DataFrame pandas pour un sous-ensemble de positions mesurées
+
+        Args:
+            columns: Colonnes à inclure (défaut: toutes)
+            positions: Indices dans les positions mesurées (défaut: toutes)
+        """
+        columns = columns or self.columns
+        with self._lock:
+            grid_positions = np.flatnonzero(self.present_mask())
+            if positions is not None:
+                grid_positions = grid_positions[positions]
+
+            frame = {"timestamp": self.origin + grid_positions * self.step}
+            frame.update({c: self._data[c][grid_positions].astype(np.float64) for c in columns})
+            return pd.DataFrame(frame)
+
+    def stats(self) -> Dict[str, Any]:
+        """Informations sur le stockage"""
+        with self._lock:
+            return {
+                "columns": self.columns,
+                "grid_size": self._size,
+                "records": self.record_count,
+                "origin": str(pd.Timestamp(self.origin)) if self.origin is not None else None,
+                "watermark": str(self.watermark) if self.watermark is not None else None,
+                "memory_bytes": int(
+                    self._bitmap[:(self._size + 7) // 8].nbytes
+                    + sum(self._data[c][:self._size].nbytes for c in self.columns)
+                )
+            }
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+🔮 MOTEURS DE PRÉVISION - BLOC 3
+================================
+
+Moteurs interchangeables pour ProphetForecastTool :
+- seasonal_naive : répétition de la dernière saison (référence)
+- holt_winters : Holt-Winters additif amorti, paramètres choisis sur une
+  grille évaluée en un seul passage vectorisé NumPy (quelques ms)
+- prophet : Prophet, si le paquet est installé
+
+Quantiles (P10 / P50 / P90) par bootstrap des résidus : quelques milliers de
+trajectoires simulées en parallèle (NumPy), une itération par pas d'horizon.
+
+Critères d'acceptation :
+- Interface commune fit(ds, y) / update(ds, y, new_points) / predict(horizon) / components()
+- Mise à jour incrémentale sur les nouveaux points (sans nouvel ajustement complet)
+- Intervalles de prédiction (largeur configurable, 80 % par défaut)
+- Trajectoires simulate(horizon, n_paths) et quantiles en tableaux NumPy
+- Aucune dépendance obligatoire hors NumPy / pandas
+"""
+
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+try:
+    from prophet import Prophet
+    PROPHET_AVAILABLE = True
+except ImportError:
+    PROPHET_AVAILABLE = False
+
+# Prévision : (valeurs, borne basse, borne haute)
+Forecast = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Quantiles publiés (P10 / P50 / P90 : intervalle à 80 %)
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+@dataclass
+class QuantileForecast:
+    """Prévision probabiliste sur une grille régulière (un tableau NumPy par quantile)"""
+    ds: np.ndarray
+    quantiles: Tuple[float, ...]
+    values: np.ndarray
+    mean: np.ndarray
+    n_paths: int = 0
+
+    def __getitem__(self, q: float) -> np.ndarray:
+        """Série d'un quantile : forecast[0.9]"""
+        return self.values[self.quantiles.index(q)]
+
+    @staticmethod
+    def column(q: float) -> str:
+        return f"p{round(q * 100)}"
+
+    def to_frame(self) -> pd.DataFrame:
+        """ds, yhat (prévision ponctuelle), p10, p50, p90"""
+        columns = {"ds": self.ds, "yhat": self.mean}
+        columns.update({self.column(q): v for q, v in zip(self.quantiles, self.values)})
+        return pd.DataFrame(columns)
+
+class ForecastBackend(ABC):
+    """Interface commune des moteurs de prévision"""
+
+    name = "base"
+
+    def __init__(self, season_length: int = 7, interval_width: float = 0.8):
+        """
+        Args:
+            season_length: Pas par saison (7 en journalier, 84 en 2h pour la semaine)
+            interval_width: Couverture des intervalles de prédiction
+        """
+        self.season_length = season_length
+        self.interval_width = interval_width
+        self.z = NormalDist().inv_cdf((1 + interval_width) / 2)
+        self.logger = logging.getLogger(__name__)
+        self.n_obs = 0
+        self.residuals = np.zeros(0)
+
+    @abstractmethod
+    def fit(self, ds: pd.DatetimeIndex, y: np.ndarray) -> "ForecastBackend":
+        """Ajuste le moteur sur la série (ds, y)"""
+
+    def update(self, ds: pd.DatetimeIndex, y: np.ndarray, new_points: int) -> "ForecastBackend":
+        """
+        Intègre les new_points derniers points de la fenêtre (ds, y)
+
+        Par défaut : nouvel ajustement complet sur la fenêtre.
+        """
+        return self.fit(ds, y)
+
+    @abstractmethod
+    def predict(self, horizon: int) -> Forecast:
+        """Prévision ponctuelle et bornes paramétriques (yhat, lower, upper) sur horizon pas"""
+
+    def simulate(self, horizon: int, n_paths: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Trajectoires futures (n_paths, horizon) par bootstrap des résidus
+
+        Par défaut : prévision ponctuelle + résidus tirés indépendamment.
+        """
+        yhat = self.predict(horizon)[0]
+        return yhat + self._draw_residuals(horizon, n_paths, rng)
+
+    def _draw_residuals(self, horizon: int, n_paths: int, rng: np.random.Generator) -> np.ndarray:
+        residuals = getattr(self, "residuals", None)  # Absents des modèles sérialisés avant le bootstrap
+        if residuals is None or len(residuals) == 0:
+            raise ValueError("Aucun résidu disponible pour le bootstrap")
+        return residuals[rng.integers(0, len(residuals), size=(n_paths, horizon))]
+
+    @abstractmethod
+    def components(self) -> Dict[str, Any]:
+        """
+        Composantes estimées :
+        trend_per_step, season (phase alignée sur le premier pas de la série), params
+        """
+
+    def _check_length(self, y: np.ndarray):
+        if len(y) < 2 * self.season_length:
+            raise ValueError(f"Au moins {2 * self.season_length} points requis ({len(y)} disponibles)")
+        if np.isnan(y).any():
+            raise ValueError("Série incomplète (valeurs manquantes)")
+
+class SeasonalNaiveBackend(ForecastBackend):
+    """Dernière saison répétée, erreur estimée sur les différences saisonnières"""
+
+    name = "seasonal_naive"
+
+    def fit(self, ds: pd.DatetimeIndex, y: np.ndarray) -> "SeasonalNaiveBackend":
+        y = np.asarray(y, dtype=np.float64)
+        self._check_length(y)
+        m = self.season_length
+        self.n_obs = len(y)
+        self.last_season = y[-m:].copy()
+        self.residuals = y[m:] - y[:-m]
+        self.sigma = float(np.std(self.residuals, ddof=1))
+        return self
+
+    def update(self, ds: pd.DatetimeIndex, y: np.ndarray, new_points: int) -> "SeasonalNaiveBackend":
+        # Seule la dernière saison change, l'erreur reste celle de l'ajustement initial
+        y = np.asarray(y, dtype=np.float64)
+        self._check_length(y)
+        m = self.season_length
+        self.n_obs += new_points
+        self.last_season = y[-m:].copy()
+        self.residuals = y[m:] - y[:-m]
+        return self
+
+    def predict(self, horizon: int) -> Forecast:
+        m = self.season_length
+        steps = np.arange(horizon)
+        yhat = self.last_season[steps % m]
+        # L'incertitude croît avec le nombre de saisons répétées
+        margin = self.z * self.sigma * np.sqrt(steps // m + 1)
+        return yhat, yhat - margin, yhat + margin
+
+    def simulate(self, horizon: int, n_paths: int, rng: np.random.Generator) -> np.ndarray:
+        """y[t] = y[t - m] + e[t] : somme cumulée des résidus, saison par saison (sans boucle)"""
+        m = self.season_length
+        seasons = -(-horizon // m)
+        errors = self._draw_residuals(seasons * m, n_paths, rng).reshape(n_paths, seasons, m)
+        paths = self.last_season + np.cumsum(errors, axis=1)
+        return paths.reshape(n_paths, seasons * m)[:, :horizon]
+
+    def components(self) -> Dict[str, Any]:
+        m = self.season_length
+        # Dernière saison réalignée sur la phase du premier pas de la série
+        season = np.roll(self.last_season - self.last_season.mean(), self.n_obs % m)
+        return {"trend_per_step": 0.0, "season": season, "params": {}}
+
+class HoltWintersBackend(ForecastBackend):
+    """Holt-Winters additif amorti, sélection des paramètres sur grille vectorisée"""
+
+    name = "holt_winters"
+
+    ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+    BETAS = (0.0, 0.01, 0.05, 0.1)
+    GAMMAS = (0.05, 0.1, 0.2, 0.3)
+    PHIS = (0.9, 0.98)
+
+    def fit(self, ds: pd.DatetimeIndex, y: np.ndarray) -> "HoltWintersBackend":
+        y = np.asarray(y, dtype=np.float64)
+        self._check_length(y)
+        m = self.season_length
+        n = len(y)
+        self.n_obs = n
+
+        grid = np.array(list(itertools.product(self.ALPHAS, self.BETAS, self.GAMMAS, self.PHIS)))
+        alpha, beta, gamma, phi = grid.T
+
+        # Initialisation sur les deux premières saisons (identique pour toute la grille)
+        first, second = y[:m].mean(), y[m:2 * m].mean()
+        level = np.full(len(grid), first)
+        trend = np.full(len(grid), (second - first) / m)
+        season = np.tile(y[:m] - first, (len(grid), 1))
+        sse = np.zeros(len(grid))
+        errors = np.empty((n, len(grid)))
+
+        # Une itération par pas de temps, toutes les combinaisons en parallèle
+        for t in range(n):
+            phase = t % m
+            s = season[:, phase]
+            error = y[t] - (level + phi * trend + s)
+            errors[t] = error
+            if t >= m:
+                sse += error * error
+            new_level = alpha * (y[t] - s) + (1 - alpha) * (level + phi * trend)
+            trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            season[:, phase] = gamma * (y[t] - new_level) + (1 - gamma) * s
+            level = new_level
+
+        best = int(np.argmin(sse))
+        self.alpha, self.beta, self.gamma, self.phi = (float(v) for v in grid[best])
+        self.level = float(level[best])
+        self.trend = float(trend[best])
+        self.season = season[best].copy()
+        self.residuals = errors[m:, best].copy()
+        self.n_errors = max(n - m, 1)
+        self.sigma = float(np.sqrt(sse[best] / self.n_errors))
+        return self
+
+    def update(self, ds: pd.DatetimeIndex, y: np.ndarray, new_points: int) -> "HoltWintersBackend":
+        """Lissage des nouveaux points avec les paramètres déjà sélectionnés (O(new_points))"""
+        y = np.asarray(y, dtype=np.float64)
+        self._check_length(y)
+        m = self.season_length
+        sse = self.sigma ** 2 * self.n_errors
+        new_errors = np.empty(new_points)
+
+        for i, value in enumerate(y[len(y) - new_points:]):
+            phase = self.n_obs % m
+            s = self.season[phase]
+            error = value - (self.level + self.phi * self.trend + s)
+            new_errors[i] = error
+            sse += error * error
+            new_level = self.alpha * (value - s) + (1 - self.alpha) * (self.level + self.phi * self.trend)
+            self.trend = self.beta * (new_level - self.level) + (1 - self.beta) * self.phi * self.trend
+            self.season[phase] = self.gamma * (value - new_level) + (1 - self.gamma) * s
+            self.level = new_level
+            self.n_obs += 1
+
+        self.n_errors += new_points
+        self.sigma = float(np.sqrt(sse / self.n_errors))
+        # Résidus de la fenêtre courante uniquement
+        self.residuals = np.concatenate([self.residuals, new_errors])[-max(len(y) - m, 1):]
+        return self
+
+    def predict(self, horizon: int) -> Forecast:
+        m = self.season_length
+        steps = np.arange(1, horizon + 1)
+        damped = np.cumsum(self.phi ** steps)
+        yhat = self.level + damped * self.trend + self.season[(self.n_obs + steps - 1) % m]
+
+        # Variance des erreurs à h pas (approximation de la forme d'espace d'état)
+        j = np.arange(1, horizon)
+        c = self.alpha * (1 + j * self.beta) + self.gamma * (j % m == 0)
+        variance = self.sigma ** 2 * (1 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+        margin = self.z * np.sqrt(variance)
+        return yhat, yhat - margin, yhat + margin
+
+    def simulate(self, horizon: int, n_paths: int, rng: np.random.Generator) -> np.ndarray:
+        """Récurrence Holt-Winters avec résidus rééchantillonnés, toutes les trajectoires à la fois"""
+        m = self.season_length
+        errors = self._draw_residuals(horizon, n_paths, rng)
+        level = np.full(n_paths, self.level)
+        trend = np.full(n_paths, self.trend)
+        season = np.tile(self.season, (n_paths, 1))
+        paths = np.empty((n_paths, horizon))
+
+        for h in range(horizon):
+            phase = (self.n_obs + h) % m
+            s = season[:, phase]
+            value = level + self.phi * trend + s + errors[:, h]
+            new_level = self.alpha * (value - s) + (1 - self.alpha) * (level + self.phi * trend)
+            trend = self.beta * (new_level - level) + (1 - self.beta) * self.phi * trend
+            season[:, phase] = self.gamma * (value - new_level) + (1 - self.gamma) * s
+            level = new_level
+            paths[:, h] = value
+        return paths
+
+    def components(self) -> Dict[str, Any]:
+        return {
+            "trend_per_step": self.trend,
+            "season": self.season - self.season.mean(),
+            "params": {"alpha": self.alpha, "beta": self.beta, "gamma": self.gamma, "phi": self.phi}
+        }
+
+class ProphetBackend(ForecastBackend):
+    """Prophet (optionnel) : tendance par morceaux + saisonnalités"""
+
+    name = "prophet"
+
+    def fit(self, ds: pd.DatetimeIndex, y: np.ndarray) -> "ProphetBackend":
+        if not PROPHET_AVAILABLE:
+            raise ImportError("Prophet n'est pas installé (pip install prophet)")
+        y = np.asarray(y, dtype=np.float64)
+        self._check_length(y)
+        self.n_obs = len(y)
+        self.freq = pd.infer_freq(ds) or "D"
+        self.model = self._fit_prophet(ds, y)
+        return self
+
+    def update(self, ds: pd.DatetimeIndex, y: np.ndarray, new_points: int) -> "ProphetBackend":
+        """Nouvel ajustement initialisé avec les paramètres du modèle précédent (warm start)"""
+        y = np.asarray(y, dtype=np.float64)
+        self._check_length(y)
+        self.n_obs = len(y)
+        self.model = self._fit_prophet(ds, y, init=self._stan_init())
+        return self
+
+    def _fit_prophet(self, ds: pd.DatetimeIndex, y: np.ndarray, init: Optional[Dict[str, Any]] = None):
+        model = Prophet(interval_width=self.interval_width)
+        model.fit(pd.DataFrame({"ds": ds, "y": y}), init=init)
+        self._history = model.predict(pd.DataFrame({"ds": ds}))
+        self.residuals = y - self._history["yhat"].to_numpy()
+        return model
+
+    def _stan_init(self) -> Dict[str, Any]:
+        """Paramètres ajustés du modèle courant (format attendu par Prophet.fit(init=...))"""
+        init = {}
+        for name in ["k", "m", "sigma_obs"]:
+            init[name] = self.model.params[name][0][0]
+        for name in ["delta", "beta"]:
+            init[name] = self.model.params[name][0]
+        return init
+
+    def predict(self, horizon: int) -> Forecast:
+        future = self.model.make_future_dataframe(periods=horizon, freq=self.freq, include_history=False)
+        forecast = self.model.predict(future)
+        return (forecast["yhat"].to_numpy(), forecast["yhat_lower"].to_numpy(),
+                forecast["yhat_upper"].to_numpy())
+
+    def components(self) -> Dict[str, Any]:
+        trend = self._history["trend"].to_numpy()
+        weekly = self._history["weekly"].to_numpy() if "weekly" in self._history else np.zeros(self.n_obs)
+        return {
+            "trend_per_step": float((trend[-1] - trend[0]) / max(len(trend) - 1, 1)),
+            "season": weekly[:self.season_length],
+            "params": {"changepoints": [str(d.date()) for d in self.model.changepoints[-3:]]}
+        }
+
+# Moteurs par nom
+BACKENDS: Dict[str, Type[ForecastBackend]] = {
+    SeasonalNaiveBackend.name: SeasonalNaiveBackend,
+    HoltWintersBackend.name: HoltWintersBackend,
+    ProphetBackend.name: ProphetBackend
+}
+
+def bootstrap_paths(backend: ForecastBackend, horizon: int, n_paths: int = 2000, seed: Optional[int] = 0) -> np.ndarray:
+    """
+    Trajectoires bootstrap d'un moteur ajusté
+
+    Returns:
+        Tableau (n_paths, horizon)
+    """
+    return backend.simulate(horizon, n_paths, np.random.default_rng(seed))
+
+def bootstrap_quantiles(backend: ForecastBackend, horizon: int, quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                        n_paths: int = 2000, seed: Optional[int] = 0) -> np.ndarray:
+    """
+    Quantiles des trajectoires bootstrap d'un moteur ajusté
+
+    Returns:
+        Tableau (len(quantiles), horizon)
+    """
+    return np.quantile(bootstrap_paths(backend, horizon, n_paths, seed), quantiles, axis=0)
+
+def cumulative_quantiles(paths: np.ndarray, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> np.ndarray:
+    """
+    Quantiles du cumul de chaque trajectoire (total prévu jusqu'à chaque pas)
+
+    La somme des quantiles journaliers n'est pas un quantile de la somme :
+    les trajectoires sont cumulées avant np.quantile.
+
+    Returns:
+        Tableau (len(quantiles), horizon)
+    """
+    return np.quantile(np.cumsum(paths, axis=1), quantiles, axis=0)
+
+def available_backends() -> List[str]:
+    """Moteurs utilisables dans cet environnement"""
+    return [name for name in BACKENDS if name != ProphetBackend.name or PROPHET_AVAILABLE]
+
+def create_backend(name: str, season_length: int = 7, interval_width: float = 0.8) -> ForecastBackend:
+    """
+    Instancie un moteur par nom
+
+    Raises:
+        ValueError: Moteur inconnu ou non installé
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur de prévision inconnu: {name}. Moteurs: {list(BACKENDS)}")
+    if name not in available_backends():
+        raise ValueError(f"Moteur de prévision non installé: {name}")
+    return BACKENDS[name](season_length=season_length, interval_width=interval_width)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+🧪 BACKTESTING DES MOTEURS DE PRÉVISION - BLOC 3
+===============================================
+
+Validation croisée à origine glissante (rolling origin) sur l'historique
+DuckDB, pour comparer les moteurs de forecast_backends.
+
+Critères d'acceptation :
+- Plis répartis sur un pool de processus
+- Horizons de l'onglet Prévisions (7 / 14 / 30 jours)
+- MAE, MAPE et couverture des intervalles P10–P90 bootstrap (ceux publiés) par moteur et par horizon
+- Temps CPU d'ajustement et de prévision, précision par seconde CPU
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .forecast_backends import create_backend, available_backends, bootstrap_quantiles, DEFAULT_QUANTILES
+from .prophet_forecast_tool import ProphetForecastTool, GRANULARITIES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZONS = (7, 14, 30)
+
+# Série partagée par les processus (chargée une fois par processus via l'initialiseur)
+_series: Optional[Tuple[pd.DatetimeIndex, np.ndarray]] = None
+
+def _init_worker(ds: pd.DatetimeIndex, y: np.ndarray):
+    global _series
+    _series = (ds, y)
+
+def rolling_origins(n: int, train_size: int, max_horizon: int, n_folds: int, step: int) -> List[int]:
+    """
+    Origines (indices du premier point prévu) des plis, de la plus ancienne à la plus récente
+
+    La dernière origine laisse exactement max_horizon points à prévoir ;
+    chaque pli dispose de train_size points d'entraînement.
+    """
+    last = n - max_horizon
+    origins = [last - i * step for i in range(n_folds)]
+    return sorted(origin for origin in origins if origin >= train_size)
+
+def _run_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Un pli : ajustement sur la fenêtre précédant l'origine, prévision de max_horizon points"""
+    ds, y = _series
+    origin, train_size, max_horizon = task["origin"], task["train_size"], task["max_horizon"]
+    train = slice(origin - train_size, origin)
+    actual = y[origin:origin + max_horizon]
+
+    model = create_backend(task["backend"], season_length=task["season_length"])
+    cpu, wall = time.process_time(), time.perf_counter()
+    model.fit(ds[train], y[train])
+    fit_cpu, fit_wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    yhat = model.predict(max_horizon)[0]
+    # Intervalle évalué = intervalle publié : quantiles extrêmes des trajectoires bootstrap
+    lower, upper = bootstrap_quantiles(model, max_horizon, (DEFAULT_QUANTILES[0], DEFAULT_QUANTILES[-1]),
+                                       task["n_paths"], seed=origin)
+    predict_cpu, predict_wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    errors = {}
+    for label, steps in task["horizons"].items():
+        a, f = actual[:steps], yhat[:steps]
+        nonzero = a != 0
+        errors[label] = {
+            "mae": float(np.mean(np.abs(a - f))),
+            "mape": float(np.mean(np.abs((a[nonzero] - f[nonzero]) / a[nonzero])) * 100) if nonzero.any() else float("nan"),
+            "coverage": float(np.mean((a >= lower[:steps]) & (a <= upper[:steps])))
+        }
+
+    return {
+        "backend": task["backend"],
+        "origin": str(ds[origin]),
+        "errors": errors,
+        "fit_cpu_s": fit_cpu,
+        "predict_cpu_s": predict_cpu,
+        "fit_wall_s": fit_wall,
+        "predict_wall_s": predict_wall
+    }
+
+class ForecastBacktester:
+    """Comparaison des moteurs par validation croisée à origine glissante"""
+
+    def __init__(self, backends: Optional[Sequence[str]] = None, horizons: Sequence[int] = DEFAULT_HORIZONS,
+                 granularity: str = "daily", train_days: int = 365, n_folds: int = 8, fold_step_days: int = 7,
+                 max_workers: Optional[int] = None, n_paths: Optional[int] = None):
+        """
+        Args:
+            backends: Moteurs comparés (défaut: tous les moteurs installés)
+            horizons: Horizons en jours
+            granularity: "daily" ou "2h"
+            train_days: Fenêtre d'entraînement de chaque pli (jours)
+            n_folds: Nombre d'origines
+            fold_step_days: Écart entre deux origines (jours)
+            max_workers: Processus (défaut: BACKTEST_MAX_WORKERS ou nombre de cœurs, 1 = sans pool)
+            n_paths: Trajectoires bootstrap par pli (défaut: FORECAST_BOOTSTRAP_PATHS ou 2000)
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularité non supportée: {granularity}")
+        self.backends = list(backends or available_backends())
+        self.horizons = sorted(int(h) for h in horizons)
+        self.granularity = granularity
+        self.train_days = train_days
+        self.n_folds = n_folds
+        self.fold_step_days = fold_step_days
+        self.max_workers = max_workers or int(os.getenv('BACKTEST_MAX_WORKERS', os.cpu_count() or 1))
+        self.n_paths = n_paths or int(os.getenv('FORECAST_BOOTSTRAP_PATHS', 2000))
+
+    def load_history(self) -> pd.DataFrame:
+        """Historique nécessaire : entraînement du pli le plus ancien + plis + horizon maximal"""
+        days = self.train_days + (self.n_folds - 1) * self.fold_step_days + max(self.horizons) + 1
+        return ProphetForecastTool(use_store=False).load_series(days, self.granularity)
+
+    def run(self, history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        Exécute tous les plis de tous les moteurs
+
+        Returns:
+            status, folds, by_backend (erreurs par horizon, temps CPU, précision par seconde CPU), ranking
+        """
+        try:
+            history = self.load_history() if history is None else history
+            config = GRANULARITIES[self.granularity]
+            steps_per_day = config["steps_per_day"]
+            ds, y = pd.DatetimeIndex(history['ds']), history['y'].to_numpy(dtype=np.float64)
+
+            horizons = {f"{h}d": h * steps_per_day for h in self.horizons}
+            max_horizon = max(horizons.values())
+            train_size = self.train_days * steps_per_day
+            origins = rolling_origins(len(y), train_size, max_horizon, self.n_folds, self.fold_step_days * steps_per_day)
+            if not origins:
+                return {"status": "error", "message": f"Historique insuffisant ({len(y)} points)"}
+
+            tasks = [
+                {
+                    "backend": backend,
+                    "season_length": config["season_length"],
+                    "origin": origin,
+                    "train_size": train_size,
+                    "max_horizon": max_horizon,
+                    "horizons": horizons,
+                    "n_paths": self.n_paths
+                }
+                for backend in self.backends for origin in origins
+            ]
+
+            started = time.perf_counter()
+            if self.max_workers > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(ds, y)) as executor:
+                    results = list(executor.map(_run_fold, tasks))
+            else:
+                _init_worker(ds, y)
+                results = [_run_fold(task) for task in tasks]
+            wall_s = time.perf_counter() - started
+
+            by_backend = {backend: self._summarize([r for r in results if r["backend"] == backend], horizons)
+                          for backend in self.backends}
+            ranking = sorted(by_backend, key=lambda b: by_backend[b]["mean_mape"])
+
+            return {
+                "status": "success",
+                "granularity": self.granularity,
+                "horizons": list(horizons),
+                "folds": len(origins),
+                "origins": [str(ds[o]) for o in origins],
+                "train_days": self.train_days,
+                "workers": self.max_workers,
+                "wall_s": round(wall_s, 3),
+                "by_backend": by_backend,
+                "ranking": ranking
+            }
+
+        except Exception as e:
+            logger.error(f"Erreur de backtesting : {e}")
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def _summarize(results: List[Dict[str, Any]], horizons: Dict[str, int]) -> Dict[str, Any]:
+        """Moyennes sur les plis d'un moteur"""
+        errors = {
+            label: {
+                metric: float(np.nanmean([r["errors"][label][metric] for r in results]))
+                for metric in ("mae", "mape", "coverage")
+            }
+            for label in horizons
+        }
+        fit_cpu = float(np.mean([r["fit_cpu_s"] for r in results]))
+        predict_cpu = float(np.mean([r["predict_cpu_s"] for r in results]))
+        mean_mape = float(np.mean([e["mape"] for e in errors.values()]))
+        cpu_per_fold = fit_cpu + predict_cpu
+
+        return {
+            "errors": errors,
+            "mean_mape": mean_mape,
+            "fit_cpu_s": fit_cpu,
+            "predict_cpu_s": predict_cpu,
+            "fit_wall_s": float(np.mean([r["fit_wall_s"] for r in results])),
+            "predict_wall_s": float(np.mean([r["predict_wall_s"] for r in results])),
+            # Points de précision (100 - MAPE) par seconde CPU et par pli
+            "accuracy_per_cpu_s": (100 - mean_mape) / cpu_per_fold if cpu_per_fold > 0 else float("inf")
+        }
+
+def main():
+    """Backtesting des moteurs installés sur la base configurée"""
+    print("🧪 Backtesting des moteurs de prévision")
+    print("=" * 50)
+
+    report = ForecastBacktester().run()
+    if report["status"] != "success":
+        print(f"❌ {report['message']}")
+        return
+
+    print(f"{report['folds']} plis, {report['workers']} processus, {report['wall_s']} s")
+    for backend in report["ranking"]:
+        summary = report["by_backend"][backend]
+        horizons = ", ".join(
+            f"{label}: MAPE {e['mape']:.1f}% / MAE {e['mae']:.2f} / P10–P90 {e['coverage']:.0%}" for label, e in summary["errors"].items()
+        )
+        print(f"  {backend}: {horizons}")
+        print(f"    ajustement {summary['fit_cpu_s'] * 1000:.1f} ms CPU, prévision {summary['predict_cpu_s'] * 1000:.2f} ms CPU, "
+              f"{summary['accuracy_per_cpu_s']:.0f} pts/s CPU")
+
+if __name__ == "__main__":
+    main()
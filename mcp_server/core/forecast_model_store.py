@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+💾 STOCKAGE DES MODÈLES DE PRÉVISION - BLOC 3
+============================================
+
+Modèles ajustés sérialisés sur disque (pickle) et gardés en mémoire,
+indexés par (moteur, fenêtre d'entraînement, granularité, dernier timestamp).
+
+Critères d'acceptation :
+- Réutilisation du modèle tant qu'aucune donnée n'est arrivée
+- Dernière version d'une configuration retrouvée pour une mise à jour incrémentale
+- Modèles conservés après redémarrage (data_genere/models/forecast/)
+- Nombre de versions conservées par configuration borné
+"""
+
+import os
+import re
+import pickle
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import pandas as pd
+
+# Répertoire par défaut : data_genere/models/forecast/ à la racine du projet
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parents[2] / "data_genere" / "models" / "forecast"
+
+@dataclass(frozen=True)
+class ModelKey:
+    """Clé d'un modèle ajusté"""
+    backend: str
+    period_days: int
+    granularity: str
+    watermark: pd.Timestamp
+
+    @property
+    def config_prefix(self) -> str:
+        return f"{self.backend}__{self.granularity}__{self.period_days}d__"
+
+    @property
+    def filename(self) -> str:
+        return f"{self.config_prefix}{self.watermark.strftime('%Y%m%dT%H%M%S')}.pkl"
+
+@dataclass
+class StoredModel:
+    """Modèle ajusté et fenêtre d'entraînement associée"""
+    key: ModelKey
+    model: Any
+    training_data: pd.DataFrame
+    trained_at: pd.Timestamp
+    fit_ms: float
+
+class ForecastModelStore:
+    """Cache mémoire + disque des modèles de prévision"""
+
+    def __init__(self, directory: Optional[str] = None, keep_versions: Optional[int] = None):
+        """
+        Args:
+            directory: Répertoire des modèles (défaut: FORECAST_MODEL_DIR ou data_genere/models/forecast,
+                       chaîne vide = mémoire uniquement)
+            keep_versions: Versions conservées par configuration (défaut: FORECAST_MODEL_KEEP ou 3)
+        """
+        configured = os.getenv('FORECAST_MODEL_DIR', str(DEFAULT_MODEL_DIR)) if directory is None else directory
+        self.directory = Path(configured) if configured else None
+        self.keep_versions = keep_versions if keep_versions is not None else int(os.getenv('FORECAST_MODEL_KEEP', 3))
+        self.logger = logging.getLogger(__name__)
+        self._memory: Dict[ModelKey, StoredModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: ModelKey) -> Optional[StoredModel]:
+        """Modèle ajusté pour exactement cette clé (mémoire, puis disque)"""
+        with self._lock:
+            stored = self._memory.get(key)
+        if stored is None and self.directory is not None:
+            stored = self._load(self.directory / key.filename)
+            if stored is not None:
+                with self._lock:
+                    self._memory[key] = stored
+        return stored
+
+    def latest(self, key: ModelKey) -> Optional[StoredModel]:
+        """Version la plus récente de la même configuration, antérieure à key.watermark"""
+        with self._lock:
+            candidates = [k for k in self._memory if k.config_prefix == key.config_prefix and k.watermark < key.watermark]
+        if candidates:
+            return self._memory.get(max(candidates, key=lambda k: k.watermark))
+
+        for path in reversed(self._config_files(key)):
+            stored = self._load(path)
+            if stored is not None and stored.key.watermark < key.watermark:
+                return stored
+        return None
+
+    def put(self, stored: StoredModel):
+        """Mémorise un modèle (et le sérialise) ; anciennes versions purgées"""
+        with self._lock:
+            self._memory[stored.key] = stored
+            versions = sorted(
+                (k for k in self._memory if k.config_prefix == stored.key.config_prefix),
+                key=lambda k: k.watermark
+            )
+            for old in versions[:-self.keep_versions] if self.keep_versions > 0 else []:
+                del self._memory[old]
+
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / stored.key.filename
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)  # Écriture atomique (lecteurs concurrents)
+
+            files = self._config_files(stored.key)
+            for old_path in files[:-self.keep_versions] if self.keep_versions > 0 else []:
+                old_path.unlink(missing_ok=True)
+        except OSError as e:
+            self.logger.warning(f"Sauvegarde du modèle impossible: {e}")
+
+    def _config_files(self, key: ModelKey) -> List[Path]:
+        """Fichiers de la configuration, du plus ancien au plus récent"""
+        if self.directory is None or not self.directory.exists():
+            return []
+        pattern = re.compile(re.escape(key.config_prefix) + r"\d{8}T\d{6}\.pkl$")
+        return sorted(p for p in self.directory.iterdir() if pattern.match(p.name))
+
+    def _load(self, path: Path) -> Optional[StoredModel]:
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            # Fichier corrompu ou format obsolète → réajustement
+            self.logger.warning(f"Modèle illisible ignoré ({path.name}): {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def clear(self):
+        """Supprime les modèles en mémoire et sur disque"""
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_memory = len(self._memory)
+        on_disk = len(list(self.directory.glob("*.pkl"))) if self.directory is not None and self.directory.exists() else 0
+        return {
+            "directory": str(self.directory) if self.directory else None,
+            "in_memory": in_memory,
+            "on_disk": on_disk,
+            "keep_versions": self.keep_versions
+        }
+
+# Instance globale
+_model_store: Optional[ForecastModelStore] = None
+
+def get_forecast_model_store() -> ForecastModelStore:
+    """Retourne l'instance globale du stockage des modèles"""
+    global _model_store
+    if _model_store is None:
+        _model_store = ForecastModelStore()
+    return _model_store
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+📅 TABLE DE PRÉVISIONS PRÉCALCULÉES - BLOC 3
+===========================================
+
+Table DuckDB forecast_data : prévisions des 30 prochains jours (journalières
+et 2h) avec intervalles, recalculées en arrière-plan après chaque ajout de
+données. Les lecteurs (outil forecast, tableau de bord, onglet Prévisions)
+ne font qu'un SELECT.
+
+Critères d'acceptation :
+- Une ligne par (granularité, pas de temps) : yhat, quantiles bootstrap
+  P10 (yhat_lower), P50 et P90 (yhat_upper), P10 / P90 du total cumulé
+- Recalcul en arrière-plan après check_and_fill_gaps / ajout de données
+- Rattrapage au démarrage si la table est absente ou en retard sur energy_data
+  (par granularité ; un échec n'est retenté qu'à l'arrivée de nouvelles données)
+- Aucun ajustement de modèle sur le chemin de lecture (sauf table vide)
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from .database_manager import get_database_manager
+from .forecast_backends import QuantileForecast, DEFAULT_QUANTILES
+from .prophet_forecast_tool import ProphetForecastTool, GRANULARITIES
+
+FORECAST_TABLE = "forecast_data"
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'p50', 'total_lower', 'total_upper']
+
+class ForecastTableManager:
+    """Création et remplacement des lignes de forecast_data (connexion en écriture)"""
+
+    def __init__(self, connection):
+        """
+        Args:
+            connection: Connexion (ou curseur) DuckDB en écriture
+        """
+        self.connection = connection
+
+    def ensure_table(self):
+        # Table dérivée : un schéma obsolète est recréé (puis recalculé, la table étant vide)
+        columns = {row[0] for row in self.connection.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = ?", [FORECAST_TABLE]
+        ).fetchall()}
+        if columns and "total_upper" not in columns:
+            self.connection.execute(f"DROP TABLE {FORECAST_TABLE}")
+        self.connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {FORECAST_TABLE} (
+                granularity VARCHAR,
+                ds TIMESTAMP,
+                yhat DOUBLE,
+                yhat_lower DOUBLE,
+                yhat_upper DOUBLE,
+                p50 DOUBLE,
+                total_lower DOUBLE,
+                total_upper DOUBLE,
+                interval_width DOUBLE,
+                backend VARCHAR,
+                watermark TIMESTAMP,
+                computed_at TIMESTAMP
+            )
+        """)
+
+    def replace(self, granularity: str, forecast_df: pd.DataFrame, backend: str,
+                interval_width: float, watermark: pd.Timestamp):
+        """Remplace les prévisions d'une granularité (une seule transaction)"""
+        rows = forecast_df[FORECAST_COLUMNS].assign(
+            granularity=granularity,
+            interval_width=interval_width,
+            backend=backend,
+            watermark=watermark,
+            computed_at=pd.Timestamp.now()
+        )
+        self.connection.register("forecast_rows", rows)
+        self.connection.execute("BEGIN TRANSACTION")
+        try:
+            self.connection.execute(f"DELETE FROM {FORECAST_TABLE} WHERE granularity = ?", [granularity])
+            self.connection.execute(f"""
+                INSERT INTO {FORECAST_TABLE}
+                SELECT granularity, ds, yhat, yhat_lower, yhat_upper, p50, total_lower, total_upper,
+                       interval_width, backend, watermark, computed_at
+                FROM forecast_rows
+            """)
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        finally:
+            self.connection.unregister("forecast_rows")
+
+    def latest_timestamp(self) -> Optional[pd.Timestamp]:
+        """Dernière mesure de energy_data"""
+        return self.connection.execute("SELECT MAX(timestamp) FROM energy_data").fetchone()[0]
+
+    def stale_granularities(self, granularities) -> List[str]:
+        """Granularités absentes ou calculées sur un energy_data plus ancien"""
+        latest = self.latest_timestamp()
+        watermarks = dict(self.connection.execute(
+            f"SELECT granularity, MIN(watermark) FROM {FORECAST_TABLE} GROUP BY granularity"
+        ).fetchall())
+        return [
+            granularity for granularity in granularities
+            if watermarks.get(granularity) is None or (latest is not None and watermarks[granularity] < latest)
+        ]
+
+class ForecastTable:
+    """Prévisions précalculées : lecture par SELECT, recalcul en arrière-plan"""
+
+    def __init__(self, backend: Optional[str] = None, training_days: Optional[int] = None,
+                 horizon_days: Optional[int] = None):
+        """
+        Args:
+            backend: Moteur de prévision (défaut: FORECAST_BACKEND ou holt_winters)
+            training_days: Historique d'entraînement (défaut: FORECAST_TRAINING_DAYS ou 365)
+            horizon_days: Jours précalculés (défaut: FORECAST_TABLE_HORIZON_DAYS ou 30)
+        """
+        self.backend = backend or os.getenv('FORECAST_BACKEND', 'holt_winters')
+        self.training_days = training_days or int(os.getenv('FORECAST_TRAINING_DAYS', 365))
+        self.horizon_days = horizon_days or int(os.getenv('FORECAST_TABLE_HORIZON_DAYS', 30))
+        self.db_manager = get_database_manager()
+        self.logger = logging.getLogger(__name__)
+
+        # Un seul recalcul à la fois ; les demandes reçues pendant un recalcul sont regroupées
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._pending = False
+        self._refreshes = 0
+        self.last_refresh: Dict[str, Any] = {}
+        # Granularité en échec → dernière mesure de energy_data lors de la tentative
+        self._failed: Dict[str, Any] = {}
+
+        with self.db_manager.get_connection() as conn:
+            ForecastTableManager(conn).ensure_table()
+        self.db_manager.register_append_listener(self._on_data_appended)
+
+    def refresh(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Recalcule les granularités en retard (bloquant)
+
+        Une granularité en échec n'est retentée qu'à l'arrivée de nouvelles
+        données (ou avec force=True) : pas de recalcul en boucle.
+
+        Args:
+            force: Recalculer toutes les granularités, même à jour
+
+        Returns:
+            status, watermark, durée, lignes écrites et échecs par granularité
+        """
+        with self._refresh_lock:
+            try:
+                with self.db_manager.get_connection() as conn:
+                    latest, due = self._due(conn, force)
+                if not due:
+                    return {"status": "success", "message": "Prévisions à jour", "skipped": True}
+
+                started = time.perf_counter()
+                written, failed, watermark = {}, {}, None
+                for granularity in due:
+                    try:
+                        watermark, written[granularity] = self._refresh_granularity(granularity)
+                        self._failed.pop(granularity, None)
+                    except Exception as e:
+                        self.logger.warning(f"Prévisions {granularity} non recalculées: {e}")
+                        failed[granularity] = str(e)
+                        self._failed[granularity] = latest
+
+                self._refreshes += 1
+                self.last_refresh = {
+                    "status": "success" if written else "error",
+                    "watermark": str(watermark) if watermark is not None else None,
+                    "rows": written,
+                    "failed": failed,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "finished_at": datetime.now().isoformat(timespec="seconds")
+                }
+                self.logger.info(f"Table {FORECAST_TABLE} recalculée: {written}")
+                return self.last_refresh
+
+            except Exception as e:
+                self.logger.error(f"Erreur de recalcul des prévisions: {e}")
+                self.last_refresh = {"status": "error", "message": str(e)}
+                return self.last_refresh
+
+    def _due(self, connection, force: bool = False) -> Tuple[Any, List[str]]:
+        """Dernière mesure et granularités à recalculer (hors échecs sur ces mêmes données)"""
+        manager = ForecastTableManager(connection)
+        latest = manager.latest_timestamp()
+        if force:
+            return latest, list(GRANULARITIES)
+        return latest, [
+            granularity for granularity in manager.stale_granularities(GRANULARITIES)
+            if granularity not in self._failed or self._failed[granularity] != latest
+        ]
+
+    def _refresh_granularity(self, granularity: str) -> Tuple[pd.Timestamp, int]:
+        """Recalcule une granularité : (watermark, lignes écrites), ValueError si échec"""
+        # Modèles stockés : mise à jour incrémentale sur les nouveaux points
+        forecaster = ProphetForecastTool(backend=self.backend)
+        training = forecaster.train_model(self.training_days, granularity=granularity)
+        if training["status"] == "error":
+            raise ValueError(training["message"])
+        forecast = forecaster.generate_forecast(self.horizon_days)
+        if forecast["status"] == "error":
+            raise ValueError(forecast["message"])
+
+        watermark = pd.Timestamp(training["data_watermark"])
+        with self.db_manager.get_connection() as conn:
+            ForecastTableManager(conn).replace(
+                granularity, forecast["forecast_data"], self.backend,
+                forecast["confidence_intervals"]["width"], watermark
+            )
+        return watermark, len(forecast["forecast_data"])
+
+    def schedule_refresh(self):
+        """Recalcul en arrière-plan (regroupé avec un recalcul déjà en cours)"""
+        with self._state_lock:
+            if self._worker is not None:
+                self._pending = True
+                return
+            self._worker = threading.Thread(target=self._refresh_loop, name="forecast-table", daemon=True)
+            self._worker.start()
+
+    def _refresh_loop(self):
+        while True:
+            self.refresh()
+            with self._state_lock:
+                if not self._pending:
+                    self._worker = None
+                    return
+                self._pending = False
+
+    def _on_data_appended(self, start, end):
+        self.schedule_refresh()
+
+    def ensure_fresh(self):
+        """Rattrapage en arrière-plan si la table est vide ou en retard (ingestion hors processus)"""
+        try:
+            with self.db_manager.get_connection() as conn:
+                _, due = self._due(conn)
+            if due:
+                self.schedule_refresh()
+        except Exception as e:
+            self.logger.warning(f"Vérification de {FORECAST_TABLE} impossible: {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend la fin du recalcul en arrière-plan (True si terminé)"""
+        with self._state_lock:
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+            return not worker.is_alive()
+        return True
+
+    def read(self, granularity: str = "daily", horizon_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Prévisions précalculées des horizon_days premiers jours
+
+        Returns:
+            status, forecast_data (ds, yhat, yhat_lower, yhat_upper, p50, total_lower, total_upper),
+            quantile_forecast (P10 / P50 / P90), backend, interval_width, watermark, computed_at
+        """
+        try:
+            if granularity not in GRANULARITIES:
+                raise ValueError(f"Granularité non supportée: {granularity}. Granularités: {list(GRANULARITIES)}")
+            horizon_days = int(horizon_days or self.horizon_days)
+            if horizon_days > self.horizon_days:
+                raise ValueError(f"Horizon précalculé limité à {self.horizon_days} jours")
+
+            rows = self._select(granularity, horizon_days * GRANULARITIES[granularity]["steps_per_day"])
+            if rows.empty:
+                # Première utilisation : calcul immédiat (ou attente du recalcul en cours)
+                self.refresh()
+                rows = self._select(granularity, horizon_days * GRANULARITIES[granularity]["steps_per_day"])
+                if rows.empty:
+                    return {"status": "error", "message": f"Aucune prévision {granularity} disponible"}
+
+            first = rows.iloc[0]
+            forecast_data = rows[FORECAST_COLUMNS]
+            quantile_forecast = QuantileForecast(
+                ds=forecast_data['ds'].to_numpy(),
+                quantiles=DEFAULT_QUANTILES,
+                values=forecast_data[['yhat_lower', 'p50', 'yhat_upper']].to_numpy().T,
+                mean=forecast_data['yhat'].to_numpy()
+            )
+            return {
+                "status": "success",
+                "granularity": granularity,
+                "horizon_days": horizon_days,
+                "backend": first["backend"],
+                "interval_width": float(first["interval_width"]),
+                "watermark": str(first["watermark"]),
+                "computed_at": str(first["computed_at"]),
+                "forecast_data": forecast_data,
+                "quantile_forecast": quantile_forecast
+            }
+
+        except Exception as e:
+            self.logger.error(f"Erreur de lecture des prévisions: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def _select(self, granularity: str, steps: int) -> pd.DataFrame:
+        # Hors cache de requêtes : la table change à chaque recalcul
+        return self.db_manager.execute_query(f"""
+            SELECT ds, yhat, yhat_lower, yhat_upper, p50, total_lower, total_upper,
+                   interval_width, backend, watermark, computed_at
+            FROM {FORECAST_TABLE}
+            WHERE granularity = ?
+            ORDER BY ds
+            LIMIT ?
+        """, [granularity, steps], use_cache=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._state_lock:
+            running = self._worker is not None
+        return {
+            "backend": self.backend,
+            "training_days": self.training_days,
+            "horizon_days": self.horizon_days,
+            "refreshes": self._refreshes,
+            "refresh_running": running,
+            "failed_granularities": sorted(self._failed),
+            "last_refresh": self.last_refresh
+        }
+
+# Instance globale
+_forecast_table: Optional[ForecastTable] = None
+_forecast_table_lock = threading.Lock()
+
+def get_forecast_table() -> ForecastTable:
+    """Retourne l'instance globale de la table de prévisions (rattrapage lancé à la création)"""
+    global _forecast_table
+    with _forecast_table_lock:
+        if _forecast_table is None:
+            _forecast_table = ForecastTable()
+            _forecast_table.ensure_fresh()
+    return _forecast_table
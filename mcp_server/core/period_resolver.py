@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+📅 RÉSOLUTION DES PÉRIODES - BLOC 3
+===================================
+
+Traduit les codes de période du workflow ("1d", "1d_avant_hier", "3d",
+"current_week", "last_month", "weekend", "saturday", ...) en intervalles
+absolus [début, fin).
+
+Critères d'acceptation :
+- Requêtes paramétrées par des timestamps (plus de CURRENT_DATE dans le SQL)
+- Texte de requête stable → plans et résultats réutilisables
+- Choix du rollup le plus grossier aligné sur les bornes
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional
+
+# Codes fixes reconnus (les codes "<N>d" sont acceptés en plus)
+PERIOD_CODES: List[str] = [
+    "1d", "1d_avant_hier", "month", "year",
+    "current_day", "current_week", "current_month", "current_year",
+    "last_day", "last_week", "last_month", "last_year",
+    "weekend", "saturday", "sunday"
+]
+
+_DAYS_PATTERN = re.compile(r"^(\d+)d$")
+
+@dataclass(frozen=True)
+class ResolvedPeriod:
+    """Intervalle absolu [start, end) d'un code de période"""
+    code: str
+    start: datetime
+    end: datetime
+
+    @property
+    def granularity(self) -> Optional[str]:
+        """Rollup le plus grossier aligné sur les deux bornes"""
+        return select_rollup_granularity(self.start, self.end)
+
+def is_bucket_aligned(timestamp: datetime, granularity: str) -> bool:
+    """Le timestamp est-il un début de bucket pour cette granularité ?"""
+    if (timestamp.minute, timestamp.second, timestamp.microsecond) != (0, 0, 0):
+        return False
+    if granularity == "hourly":
+        return True
+    if timestamp.hour != 0:
+        return False
+    if granularity == "daily":
+        return True
+    if granularity == "weekly":
+        return timestamp.weekday() == 0  # DATE_TRUNC('week') → lundi
+    if granularity == "monthly":
+        return timestamp.day == 1
+    raise ValueError(f"Granularité de rollup inconnue: {granularity}")
+
+def select_rollup_granularity(start: datetime, end: datetime) -> Optional[str]:
+    """Granularité la plus grossière dont les buckets couvrent exactement [start, end)"""
+    for granularity in ("monthly", "weekly", "daily", "hourly"):
+        if is_bucket_aligned(start, granularity) and is_bucket_aligned(end, granularity):
+            return granularity
+    return None
+
+class PeriodResolver:
+    """Résolution des codes de période par rapport à la date du jour"""
+
+    def __init__(self, today_provider: Optional[Callable[[], date]] = None):
+        """
+        Args:
+            today_provider: Fonction retournant la date du jour (défaut: date.today)
+        """
+        self.today_provider = today_provider or date.today
+
+    def is_supported(self, period: str) -> bool:
+        """Le code de période est-il reconnu ?"""
+        return isinstance(period, str) and (period in PERIOD_CODES or bool(_DAYS_PATTERN.match(period)))
+
+    def resolve(self, period: str, today: Optional[date] = None) -> ResolvedPeriod:
+        """
+        Intervalle absolu d'un code de période
+
+        Args:
+            period: Code de période
+            today: Date de référence (défaut: today_provider())
+
+        Returns:
+            ResolvedPeriod avec start / end (fin exclue)
+        """
+        today = today or self.today_provider()
+        day = datetime(today.year, today.month, today.day)
+        week_start = day - timedelta(days=day.weekday())
+        month_start = day.replace(day=1)
+        year_start = day.replace(month=1, day=1)
+
+        days_match = _DAYS_PATTERN.match(period) if isinstance(period, str) else None
+
+        if period in ("1d", "last_day"):
+            start, end = day - timedelta(days=1), day
+        elif period == "1d_avant_hier":
+            start, end = day - timedelta(days=2), day - timedelta(days=1)
+        elif days_match:
+            start, end = day - timedelta(days=int(days_match.group(1))), day
+        elif period in ("month", "current_month"):
+            start, end = month_start, day
+        elif period in ("year", "current_year"):
+            start, end = year_start, day
+        elif period == "current_day":
+            start, end = day, day + timedelta(days=1)
+        elif period == "current_week":
+            start, end = week_start, day
+        elif period == "last_week":
+            start, end = week_start - timedelta(days=7), week_start
+        elif period == "last_month":
+            start, end = (month_start - timedelta(days=1)).replace(day=1), month_start
+        elif period == "last_year":
+            start, end = year_start.replace(year=year_start.year - 1), year_start
+        elif period in ("saturday", "sunday"):
+            # Dernier samedi / dimanche entièrement écoulé
+            target = 5 if period == "saturday" else 6
+            start = day - timedelta(days=(day.weekday() - target - 1) % 7 + 1)
+            end = start + timedelta(days=1)
+        elif period == "weekend":
+            # Dernier weekend (samedi + dimanche) entièrement écoulé
+            start = day - timedelta(days=(day.weekday() - 6 - 1) % 7 + 1) - timedelta(days=1)
+            end = start + timedelta(days=2)
+        else:
+            raise ValueError(f"Période non supportée: {period}")
+
+        return ResolvedPeriod(period, start, end)
+
+# Instance globale
+_period_resolver: Optional[PeriodResolver] = None
+
+def get_period_resolver() -> PeriodResolver:
+    """Retourne l'instance globale du résolveur de périodes"""
+    global _period_resolver
+    if _period_resolver is None:
+        _period_resolver = PeriodResolver()
+    return _period_resolver
@@ -2,98 +2,291 @@
 """
 Prophet Forecast Tool - Outil de prévisions temporelles
 Intégration avec l'architecture MCP et LangGraph
+
+Entraînement sur les séries journalières (ou 2h) de energy_data, avec un
+moteur interchangeable (voir forecast_backends) : Holt-Winters NumPy par
+défaut (quelques ms), Prophet si installé.
+
+Les modèles ajustés sont conservés (voir forecast_model_store) : tant
+qu'aucune donnée n'arrive, une prévision ne coûte que l'inférence ; sinon
+le modèle précédent est mis à jour sur les nouveaux points.
+
+Les bornes publiées sont les quantiles P10 / P90 d'un bootstrap des résidus
+(FORECAST_BOOTSTRAP_PATHS trajectoires), à la granularité du modèle (2h incluse).
+Les bornes d'un total (total_lower / total_upper) sont les quantiles du cumul
+de chaque trajectoire, pas la somme des bornes par pas.
 """
 
+import os
+import copy
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+import duckdb
+
+from .database_manager import get_database_manager
+from .forecast_backends import (
+    ForecastBackend, QuantileForecast, DEFAULT_QUANTILES, create_backend, available_backends, bootstrap_paths,
+    cumulative_quantiles
+)
+from .forecast_model_store import ModelKey, StoredModel, ForecastModelStore, get_forecast_model_store
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Granularités d'entraînement : fréquence, saison (une semaine), pas par jour
+GRANULARITIES: Dict[str, Dict[str, Any]] = {
+    "daily": {"freq": "D", "step": pd.Timedelta(days=1), "season_length": 7, "steps_per_day": 1},
+    "2h": {"freq": "2h", "step": pd.Timedelta(hours=2), "season_length": 84, "steps_per_day": 12}
+}
+
+# Au-delà de cette part de nouveaux points dans la fenêtre : nouvel ajustement complet
+REFIT_FRACTION = 0.25
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
 class ProphetForecastTool:
     """
     Outil de prévisions temporelles utilisant Prophet
     Intégré dans l'architecture MCP
     """
-    
-    def __init__(self, db_path: str = None):
+
+    def __init__(self, db_path: str = None, backend: Optional[str] = None,
+                 model_store: Optional[ForecastModelStore] = None, use_store: bool = True):
         """
         Initialisation de l'outil Prophet
-        
+
         Args:
-            db_path: Chemin vers la base de données DuckDB
+            db_path: Chemin vers la base de données DuckDB (défaut: base du DatabaseManager)
+            backend: Moteur de prévision (défaut: FORECAST_BACKEND ou holt_winters)
+            model_store: Stockage des modèles (défaut: instance globale)
+            use_store: False pour toujours réentraîner
         """
         self.db_path = db_path
-        self.model = None
+        self.backend = backend or os.getenv('FORECAST_BACKEND', 'holt_winters')
+        self.model_store = (model_store or get_forecast_model_store()) if use_store else None
+        self.granularity = "daily"
+        self.model: Optional[ForecastBackend] = None
         self.is_trained = False
         self.training_data = None
-        
-    def train_model(self, period_days: int = 365) -> Dict[str, Any]:
+
+    def load_series(self, period_days: int = 365, granularity: str = "daily") -> pd.DataFrame:
+        """
+        Série de consommation (ds, y) des period_days derniers jours
+
+        Les jours incomplets en bordure sont écartés, les trous intérieurs
+        interpolés sur la grille régulière.
+        """
+        if granularity == "daily":
+            query = """
+                SELECT DATE_TRUNC('day', timestamp) AS ds, SUM(energy_total_kwh) AS y, COUNT(*) AS n
+                FROM energy_data
+                WHERE timestamp > (SELECT MAX(timestamp) FROM energy_data) - to_days(CAST(? AS INTEGER))
+                GROUP BY 1
+                ORDER BY 1
+            """
+        elif granularity == "2h":
+            query = """
+                SELECT timestamp AS ds, energy_total_kwh AS y, 1 AS n
+                FROM energy_data
+                WHERE timestamp > (SELECT MAX(timestamp) FROM energy_data) - to_days(CAST(? AS INTEGER))
+                ORDER BY 1
+            """
+        else:
+            raise ValueError(f"Granularité non supportée: {granularity}. Granularités: {list(GRANULARITIES)}")
+
+        df = self._fetch(query, [int(period_days)])
+        if df.empty:
+            return pd.DataFrame({'ds': pd.DatetimeIndex([]), 'y': np.array([], dtype=np.float64)})
+
+        if granularity == "daily":
+            # Journées partielles en début / fin de fenêtre
+            full = df['n'] >= GRANULARITIES["2h"]["steps_per_day"]
+            df = df.loc[full.idxmax():full[::-1].idxmax()] if full.any() else df.iloc[0:0]
+
+        series = df.set_index(pd.to_datetime(df['ds']))['y'].astype(np.float64)
+        grid = pd.date_range(series.index.min(), series.index.max(), freq=GRANULARITIES[granularity]["freq"])
+        series = series.reindex(grid).interpolate(limit_direction='both')
+        return pd.DataFrame({'ds': series.index, 'y': series.to_numpy()})
+
+    def data_watermark(self) -> Optional[pd.Timestamp]:
+        """Dernier timestamp de energy_data (None si la table est vide)"""
+        latest = self._fetch("SELECT MAX(timestamp) AS latest FROM energy_data", [], use_cache=False).iloc[0]["latest"]
+        return None if pd.isna(latest) else pd.Timestamp(latest)
+
+    def _fetch(self, query: str, params: List, use_cache: bool = True) -> pd.DataFrame:
+        """Lecture via le DatabaseManager, ou une connexion en lecture seule pour une autre base"""
+        manager = get_database_manager()
+        if self.db_path is None or os.path.abspath(self.db_path) == os.path.abspath(manager.db_path):
+            return manager.execute_query(query, params, use_cache=use_cache)
+        with duckdb.connect(self.db_path, read_only=True) as conn:
+            return conn.execute(query, params).fetchdf()
+
+    def train_model(self, period_days: int = 365, granularity: str = "daily",
+                    backend: Optional[str] = None, force_refit: bool = False) -> Dict[str, Any]:
         """
-        Entraîne le modèle Prophet
-        
+        Entraîne le modèle sur energy_data (ou réutilise / met à jour le modèle stocké)
+
         Args:
             period_days: Période d'entraînement en jours
-            
+            granularity: "daily" (kWh/jour) ou "2h"
+            backend: Moteur (défaut: celui de l'outil)
+            force_refit: Ignorer les modèles stockés
+
         Returns:
             Dictionnaire avec les informations d'entraînement
+            (training_mode : fitted, updated ou reused)
         """
         try:
-            # Simulation d'entraînement (Prophet non installé)
-            # Génération de données fictives pour la démonstration
-            end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            start_date = end_date - timedelta(days=period_days)
-            
-            # Créer des données fictives pour l'entraînement
-            dates = pd.date_range(start=start_date, end=end_date, freq='D')
-            np.random.seed(42)  # Pour la reproductibilité
-            consumption_values = np.random.normal(15, 3, len(dates))  # Moyenne 15 kWh/jour
-            consumption_values = np.maximum(consumption_values, 0)  # Pas de valeurs négatives
-            
-            training_data = pd.DataFrame({
-                'ds': dates,
-                'y': consumption_values
-            })
-            
-            self.training_data = training_data
+            backend = backend or self.backend
+            config = GRANULARITIES.get(granularity)
+            if config is None:
+                raise ValueError(f"Granularité non supportée: {granularity}")
+
+            watermark = self.data_watermark()
+            if watermark is None:
+                raise ValueError("Aucune donnée de consommation disponible")
+
+            key = ModelKey(backend, int(period_days), granularity, watermark)
+            store = None if force_refit else self.model_store
+            stored = store.get(key) if store is not None else None
+            training_mode, new_points = "reused", 0
+
+            if stored is None:
+                stored, training_mode, new_points = self._fit_or_update(key, config, store)
+                if self.model_store is not None:
+                    self.model_store.put(stored)
+
+            self.model = stored.model
+            self.backend = backend
+            self.granularity = granularity
+            self.training_data = stored.training_data
             self.is_trained = True
-            
-            # Statistiques d'entraînement
+
+            # Statistiques d'entraînement (en kWh/jour)
+            training_data = stored.training_data
+            daily_y = self._daily(training_data)['y']
+            unit = "jours" if granularity == "daily" else "pas de 2h"
+            action = {
+                "fitted": "entraîné",
+                "updated": f"mis à jour (+{new_points} points)",
+                "reused": "réutilisé"
+            }[training_mode]
             stats = {
                 'status': 'success',
-                'message': f'Modèle entraîné sur {len(training_data)} jours',
+                'message': f'Modèle {backend} {action} sur {len(training_data)} {unit}',
+                'backend': backend,
+                'granularity': granularity,
+                'training_mode': training_mode,
                 'period_days': period_days,
                 'data_points': len(training_data),
-                'start_date': start_date.strftime('%Y-%m-%d'),
-                'end_date': end_date.strftime('%Y-%m-%d'),
-                'mean_consumption': training_data['y'].mean(),
-                'max_consumption': training_data['y'].max(),
-                'min_consumption': training_data['y'].min()
+                'start_date': training_data['ds'].iloc[0].strftime('%Y-%m-%d'),
+                'end_date': training_data['ds'].iloc[-1].strftime('%Y-%m-%d'),
+                'data_watermark': str(watermark),
+                'mean_consumption': daily_y.mean(),
+                'max_consumption': daily_y.max(),
+                'min_consumption': daily_y.min(),
+                'fit_ms': round(stored.fit_ms, 2) if training_mode != "reused" else 0.0
             }
-            
-            logger.info(f"Modèle entraîné avec succès : {stats['message']}")
+
+            logger.info(f"Modèle prêt : {stats['message']} ({stats['fit_ms']} ms)")
             return stats
-            
+
         except Exception as e:
             logger.error(f"Erreur lors de l'entraînement : {e}")
             return {
                 'status': 'error',
                 'message': f'Erreur d\'entraînement : {str(e)}'
             }
-    
-    def generate_forecast(self, horizon_days: int = 30) -> Dict[str, Any]:
+
+    def load_model(self, period_days: int, granularity: str, watermark, backend: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Charge un modèle stocké, en lecture seule (aucun ajustement)
+
+        Args:
+            period_days: Période d'entraînement en jours
+            granularity: "daily" ou "2h"
+            watermark: Dernier timestamp des données du modèle (ex: watermark de forecast_data)
+            backend: Moteur (défaut: celui de l'outil)
+
+        Returns:
+            status, backend, granularity, data_watermark
+        """
+        try:
+            backend = backend or self.backend
+            key = ModelKey(backend, int(period_days), granularity, pd.Timestamp(watermark))
+            stored = self.model_store.get(key) if self.model_store is not None else None
+            if stored is None:
+                return {
+                    'status': 'error',
+                    'message': f'Aucun modèle {backend} stocké pour les données jusqu\'au {key.watermark}'
+                }
+
+            self.model = stored.model
+            self.backend = backend
+            self.granularity = granularity
+            self.training_data = stored.training_data
+            self.is_trained = True
+            return {
+                'status': 'success',
+                'backend': backend,
+                'granularity': granularity,
+                'data_watermark': str(key.watermark)
+            }
+
+        except Exception as e:
+            logger.error(f"Erreur de chargement du modèle : {e}")
+            return {
+                'status': 'error',
+                'message': f'Erreur de chargement : {str(e)}'
+            }
+
+    def _fit_or_update(self, key: ModelKey, config: Dict[str, Any],
+                       store: Optional[ForecastModelStore]) -> Tuple[StoredModel, str, int]:
+        """Mise à jour incrémentale de la version précédente si possible, sinon ajustement complet"""
+        training_data = self.load_series(key.period_days, key.granularity)
+        if training_data.empty:
+            raise ValueError("Aucune donnée de consommation disponible")
+        ds = pd.DatetimeIndex(training_data['ds'])
+        y = training_data['y'].to_numpy()
+
+        previous = store.latest(key) if store is not None else None
+        new_points = 0
+        if previous is not None:
+            new_points = int((ds > previous.training_data['ds'].iloc[-1]).sum())
+
+        started = time.perf_counter()
+        if previous is not None and new_points == 0:
+            # Nouvelles lignes sans nouveau point complet (ex: journée en cours)
+            model, training_mode, training_data = previous.model, "reused", previous.training_data
+        elif previous is not None and new_points < len(training_data) * REFIT_FRACTION:
+            model = copy.deepcopy(previous.model)  # La version stockée reste intacte
+            model.update(ds, y, new_points)
+            training_mode = "updated"
+        else:
+            model = create_backend(key.backend, season_length=config["season_length"])
+            model.fit(ds, y)
+            training_mode = "fitted"
+        fit_ms = (time.perf_counter() - started) * 1000
+
+        stored = StoredModel(key, model, training_data, pd.Timestamp.now(), fit_ms)
+        return stored, training_mode, new_points
+
+    def generate_forecast(self, horizon_days: int = 30, n_paths: Optional[int] = None) -> Dict[str, Any]:
         """
         Génère des prévisions
-        
+
         Args:
             horizon_days: Horizon de prévision en jours
-            
+            n_paths: Trajectoires bootstrap (défaut: FORECAST_BOOTSTRAP_PATHS ou 2000)
+
         Returns:
-            Dictionnaire avec les prévisions
+            Dictionnaire avec les prévisions (forecast_data et quantile_forecast)
         """
         try:
             if not self.is_trained:
@@ -101,74 +294,100 @@ class ProphetForecastTool:
                     'status': 'error',
                     'message': 'Modèle non entraîné. Entraînez d\'abord le modèle.'
                 }
-            
-            # Génération de dates futures
-            end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            future_dates = pd.date_range(
-                start=end_date + timedelta(days=1),
-                periods=horizon_days,
-                freq='D'
+
+            config = GRANULARITIES[self.granularity]
+            steps = int(horizon_days) * config["steps_per_day"]
+            yhat, lower, upper = self.model.predict(steps)
+            n_paths = int(n_paths or os.getenv('FORECAST_BOOTSTRAP_PATHS', 2000))
+
+            # Quantiles des trajectoires bootstrap (pas de valeurs négatives)
+            try:
+                paths = np.maximum(bootstrap_paths(self.model, steps, n_paths), 0)
+                quantile_values = np.quantile(paths, DEFAULT_QUANTILES, axis=0)
+                total_lower, total_upper = cumulative_quantiles(paths, (DEFAULT_QUANTILES[0], DEFAULT_QUANTILES[-1]))
+                interval_width = DEFAULT_QUANTILES[-1] - DEFAULT_QUANTILES[0]
+            except ValueError as e:
+                # Modèle sans résidus : intervalles paramétriques, P50 = prévision ponctuelle
+                logger.warning(f"Bootstrap indisponible ({e}), intervalles paramétriques")
+                quantile_values = np.maximum(np.vstack([lower, yhat, upper]), 0)
+                # Cumul : erreurs supposées indépendantes, les demi-largeurs s'ajoutent en quadrature
+                total = np.cumsum(np.maximum(yhat, 0))
+                half_width = np.sqrt(np.cumsum(((upper - lower) / 2) ** 2))
+                total_lower, total_upper = np.maximum(total - half_width, 0), total + half_width
+                interval_width, n_paths = self.model.interval_width, 0
+
+            # Dates futures à la suite des données d'entraînement
+            last_date = self.training_data['ds'].iloc[-1]
+            future_dates = pd.date_range(start=last_date, periods=steps + 1, freq=config["freq"])[1:]
+
+            quantile_forecast = QuantileForecast(
+                ds=future_dates.to_numpy(),
+                quantiles=DEFAULT_QUANTILES,
+                values=quantile_values,
+                mean=np.maximum(yhat, 0),
+                n_paths=n_paths
             )
-            
-            # Simulation de prévisions (moyenne + bruit)
-            if self.training_data is not None:
-                base_consumption = self.training_data['y'].mean()
-                seasonal_factor = np.sin(np.arange(horizon_days) * 2 * np.pi / 7) * 0.1
-                noise = np.random.normal(0, 0.05, horizon_days)
-                
-                forecast_values = base_consumption * (1 + seasonal_factor + noise)
-                forecast_values = np.maximum(forecast_values, 0)  # Pas de valeurs négatives
-                
-                # Création du DataFrame de prévisions
-                forecast_df = pd.DataFrame({
-                    'ds': future_dates,
-                    'yhat': forecast_values,
-                    'yhat_lower': forecast_values * 0.9,
-                    'yhat_upper': forecast_values * 1.1
-                })
-                
-                # Calcul des métriques
-                total_forecast = forecast_df['yhat'].sum()
-                avg_daily = forecast_df['yhat'].mean()
-                max_day = forecast_df.loc[forecast_df['yhat'].idxmax()]
-                
-                result = {
-                    'status': 'success',
-                    'message': f'Prévisions générées pour {horizon_days} jours',
-                    'forecast_data': forecast_df,
-                    'metrics': {
-                        'total_consumption': total_forecast,
-                        'avg_daily': avg_daily,
-                        'max_consumption': max_day['yhat'],
-                        'max_date': max_day['ds'].strftime('%Y-%m-%d'),
-                        'horizon_days': horizon_days
-                    },
-                    'confidence_intervals': {
-                        'lower': forecast_df['yhat_lower'].tolist(),
-                        'upper': forecast_df['yhat_upper'].tolist()
-                    }
-                }
-                
-                logger.info(f"Prévisions générées : {result['message']}")
-                return result
-                
-            else:
-                return {
-                    'status': 'error',
-                    'message': 'Données d\'entraînement non disponibles'
+
+            # Création du DataFrame de prévisions
+            forecast_df = pd.DataFrame({
+                'ds': future_dates,
+                'yhat': quantile_forecast.mean,
+                'yhat_lower': quantile_values[0],
+                'yhat_upper': quantile_values[-1],
+                'p50': quantile_forecast[0.5],
+                # Intervalle du total prévu depuis le premier pas jusqu'à ds
+                'total_lower': total_lower,
+                'total_upper': total_upper
+            })
+
+            # Calcul des métriques (kWh/jour)
+            daily = self._daily(forecast_df.rename(columns={'yhat': 'y'}))
+            total_forecast = forecast_df['yhat'].sum()
+            max_day = daily.loc[daily['y'].idxmax()]
+
+            result = {
+                'status': 'success',
+                'message': f'Prévisions générées pour {horizon_days} jours',
+                'backend': self.backend,
+                'granularity': self.granularity,
+                'forecast_data': forecast_df,
+                'quantile_forecast': quantile_forecast,
+                'metrics': {
+                    'total_consumption': total_forecast,
+                    'avg_daily': total_forecast / int(horizon_days),
+                    'max_consumption': max_day['y'],
+                    'max_date': max_day['ds'].strftime('%Y-%m-%d'),
+                    'horizon_days': horizon_days
+                },
+                'confidence_intervals': {
+                    'lower': forecast_df['yhat_lower'].tolist(),
+                    'upper': forecast_df['yhat_upper'].tolist(),
+                    'width': interval_width,
+                    'bootstrap_paths': n_paths
                 }
-                
+            }
+
+            logger.info(f"Prévisions générées : {result['message']}")
+            return result
+
         except Exception as e:
             logger.error(f"Erreur lors de la génération des prévisions : {e}")
             return {
                 'status': 'error',
                 'message': f'Erreur de prévision : {str(e)}'
             }
-    
+
+    def _daily(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Série (ds, y) ramenée en kWh/jour"""
+        if self.granularity == "daily":
+            return df[['ds', 'y']].reset_index(drop=True)
+        daily = df.groupby(pd.to_datetime(df['ds']).dt.floor('D'))['y'].sum()
+        return pd.DataFrame({'ds': daily.index, 'y': daily.to_numpy()})
+
     def get_model_components(self) -> Dict[str, Any]:
         """
         Retourne les composantes du modèle
-        
+
         Returns:
             Dictionnaire avec les composantes
         """
@@ -178,71 +397,86 @@ class ProphetForecastTool:
                     'status': 'error',
                     'message': 'Modèle non entraîné'
                 }
-            
-            # Simulation des composantes Prophet
+
+            estimated = self.model.components()
+            steps_per_day = GRANULARITIES[self.granularity]["steps_per_day"]
+            mean_daily = self._daily(self.training_data)['y'].mean()
+
+            # Tendance en kWh/jour par jour
+            slope = estimated["trend_per_step"] * steps_per_day * steps_per_day
+            relative_slope = slope / mean_daily if mean_daily else 0.0
+            direction = 'stable' if abs(relative_slope) < 0.001 else ('increasing' if slope > 0 else 'decreasing')
+
+            # Profil hebdomadaire (kWh/jour) par jour de la semaine
+            # Phase 0 de la saison = premier point vu par le modèle (avant les mises à jour)
+            season = np.asarray(estimated["season"], dtype=np.float64)
+            step = GRANULARITIES[self.granularity]["step"]
+            origin = self.training_data['ds'].iloc[-1] - (self.model.n_obs - 1) * step
+            first_date = origin.floor('D')
+            if steps_per_day > 1:
+                season = np.roll(season, int((origin - first_date) / step)).reshape(-1, steps_per_day).sum(axis=1)
+            weekday_effect = {
+                WEEKDAYS[(first_date.weekday() + i) % 7]: float(v) for i, v in enumerate(season)
+            }
+            peak_day = max(weekday_effect, key=weekday_effect.get)
+            amplitude = (max(weekday_effect.values()) - min(weekday_effect.values())) / 2
+
             components = {
                 'status': 'success',
+                'backend': self.backend,
                 'trend': {
-                    'direction': 'stable',
-                    'slope': 0.001,
-                    'confidence': 0.95
+                    'direction': direction,
+                    'slope': slope,
+                    'relative_slope': relative_slope
                 },
                 'seasonality': {
                     'weekly': {
-                        'amplitude': 0.15,
-                        'peak_day': 'sunday'
-                    },
-                    'yearly': {
-                        'amplitude': 0.25,
-                        'peak_month': 'january'
+                        'amplitude': amplitude / mean_daily if mean_daily else 0.0,
+                        'peak_day': peak_day,
+                        'by_weekday': weekday_effect
                     }
                 },
-                'holidays': {
-                    'effect': 'minimal',
-                    'impact': 0.05
-                },
-                'changepoints': {
-                    'count': 3,
-                    'dates': ['2024-01-15', '2024-06-01', '2024-12-01']
-                }
+                'params': estimated["params"]
             }
-            
+
             return components
-            
+
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des composantes : {e}")
             return {
                 'status': 'error',
                 'message': f'Erreur : {str(e)}'
             }
-    
+
     def get_training_status(self) -> Dict[str, Any]:
         """
         Retourne le statut d'entraînement
-        
+
         Returns:
             Dictionnaire avec le statut
         """
         return {
             'is_trained': self.is_trained,
             'has_data': self.training_data is not None,
-            'data_points': len(self.training_data) if self.training_data is not None else 0
+            'data_points': len(self.training_data) if self.training_data is not None else 0,
+            'backend': self.backend,
+            'granularity': self.granularity,
+            'available_backends': available_backends()
         }
 
 # Fonction de factory pour l'intégration MCP
-def get_prophet_tool(db_path: str = None) -> ProphetForecastTool:
+def get_prophet_tool(db_path: str = None, backend: Optional[str] = None) -> ProphetForecastTool:
     """
     Factory function pour créer une instance ProphetForecastTool
-    
+
     Args:
         db_path: Chemin vers la base de données
-        
+        backend: Moteur de prévision
+
     Returns:
         Instance de ProphetForecastTool
     """
-    return ProphetForecastTool(db_path)
+    return ProphetForecastTool(db_path, backend)
 
 # Instance globale pour l'intégration
 prophet_tool = ProphetForecastTool()
-
-
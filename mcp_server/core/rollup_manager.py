@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+🧮 TABLES DE PRÉ-AGRÉGATION (ROLLUPS) - BLOC 3
+==============================================
+
+Tables DuckDB persistées par granularité (heure, jour, semaine, mois).
+Maintenues de façon incrémentale à chaque ajout de données.
+
+Critères d'acceptation :
+- Une table par granularité, une colonne sum/min/max par compteur
+- Mise à jour incrémentale (seuls les buckets touchés sont recalculés)
+- Lecture par les constructeurs de requêtes au lieu des lignes brutes 2h
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Granularités de la plus fine à la plus grossière → unité DATE_TRUNC
+ROLLUP_GRANULARITIES: Dict[str, str] = {
+    "hourly": "hour",
+    "daily": "day",
+    "weekly": "week",
+    "monthly": "month"
+}
+
+# Colonnes pré-agrégées (énergie totale, sous-compteurs, puissance)
+ROLLUP_COLUMNS: List[str] = [
+    "energy_total_kwh",
+    "sub_metering_1_kwh",
+    "sub_metering_2_kwh",
+    "sub_metering_3_kwh",
+    "global_active_power_kw"
+]
+
+def rollup_table_name(granularity: str) -> str:
+    """Nom de la table de rollup pour une granularité"""
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Granularité de rollup inconnue: {granularity}")
+    return f"energy_rollup_{granularity}"
+
+class RollupManager:
+    """Construction et maintenance incrémentale des rollups DuckDB"""
+
+    def __init__(self, connection):
+        """
+        Args:
+            connection: Connexion DuckDB en écriture
+        """
+        self.connection = connection
+        self.logger = logging.getLogger(__name__)
+
+    def _aggregate_select(self, unit: str) -> str:
+        """Liste SELECT d'agrégation pour une unité DATE_TRUNC"""
+        metrics = []
+        for column in ROLLUP_COLUMNS:
+            metrics.extend([
+                f"SUM({column}) AS {column}_sum",
+                f"MIN({column}) AS {column}_min",
+                f"MAX({column}) AS {column}_max"
+            ])
+
+        return f"""
+            DATE_TRUNC('{unit}', timestamp) AS bucket_start,
+            COUNT(*) AS record_count,
+            MIN(timestamp) AS first_timestamp,
+            MAX(timestamp) AS last_timestamp,
+            {', '.join(metrics)}
+        """
+
+    def existing_granularities(self) -> List[str]:
+        """Granularités dont la table de rollup existe"""
+        tables = {row[0] for row in self.connection.execute("SHOW TABLES").fetchall()}
+        return [g for g in ROLLUP_GRANULARITIES if rollup_table_name(g) in tables]
+
+    def rebuild(self, granularity: Optional[str] = None):
+        """Reconstruit entièrement un rollup (ou tous)"""
+        granularities = [granularity] if granularity else list(ROLLUP_GRANULARITIES)
+
+        for g in granularities:
+            table = rollup_table_name(g)
+            unit = ROLLUP_GRANULARITIES[g]
+            self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.execute(f"""
+                CREATE TABLE {table} AS
+                SELECT {self._aggregate_select(unit)}
+                FROM energy_data
+                GROUP BY 1
+                ORDER BY 1
+            """)
+
+        self.logger.info(f"Rollups reconstruits: {granularities}")
+
+    def refresh_range(self, start: datetime, end: datetime):
+        """
+        Recalcule uniquement les buckets touchés par des lignes insérées
+
+        Args:
+            start: Premier timestamp inséré
+            end: Dernier timestamp inséré
+        """
+        existing = self.existing_granularities()
+
+        self.connection.execute("BEGIN TRANSACTION")
+        try:
+            for g in existing:
+                table = rollup_table_name(g)
+                unit = ROLLUP_GRANULARITIES[g]
+                self.connection.execute(f"""
+                    DELETE FROM {table}
+                    WHERE bucket_start >= DATE_TRUNC('{unit}', ?::TIMESTAMP)
+                      AND bucket_start <= DATE_TRUNC('{unit}', ?::TIMESTAMP)
+                """, [start, end])
+                self.connection.execute(f"""
+                    INSERT INTO {table}
+                    SELECT {self._aggregate_select(unit)}
+                    FROM energy_data
+                    WHERE timestamp >= DATE_TRUNC('{unit}', ?::TIMESTAMP)
+                      AND timestamp < DATE_TRUNC('{unit}', ?::TIMESTAMP) + INTERVAL 1 {unit}
+                    GROUP BY 1
+                """, [start, end])
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        self.logger.info(f"Rollups mis à jour pour {start} → {end}")
+
+    def ensure_rollups(self):
+        """Crée les rollups manquants et rattrape ceux en retard sur energy_data"""
+        existing = self.existing_granularities()
+        for g in ROLLUP_GRANULARITIES:
+            if g not in existing:
+                self.rebuild(g)
+
+        # Rattrapage : lignes ajoutées sans passer par refresh_range
+        data_max = self.connection.execute("SELECT MAX(timestamp) FROM energy_data").fetchone()[0]
+        rollup_max = self.connection.execute(
+            f"SELECT MAX(last_timestamp) FROM {rollup_table_name('hourly')}"
+        ).fetchone()[0]
+
+        if data_max is None:
+            return
+        if rollup_max is None:
+            self.rebuild()
+        elif rollup_max < data_max:
+            self.refresh_range(rollup_max + timedelta(seconds=1), data_max)
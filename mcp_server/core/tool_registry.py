@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+🗂️ REGISTRE D'OUTILS MCP - BLOC 3
+=================================
+
+Table nom d'outil → fonction, avec schéma de paramètres déclaré,
+mémoïsation des résultats et hooks de mesure.
+
+Critères d'acceptation :
+- Dispatch O(1) par nom d'outil
+- Paramètres validés / complétés selon le schéma déclaré
+- Résultats mémoïsés par (outil, paramètres, version des données, jour) avec TTL
+- Hooks appelés après chaque appel (durée, cache, erreur)
+"""
+
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+from observability.tracer import get_tracer
+from .database_manager import get_database_manager
+from .period_resolver import get_period_resolver
+
+_REQUIRED = object()
+
+@dataclass(frozen=True)
+class ToolParameter:
+    """Paramètre déclaré d'un outil"""
+    name: str
+    type: type = str
+    default: Any = _REQUIRED
+    description: str = ""
+
+    @property
+    def required(self) -> bool:
+        return self.default is _REQUIRED
+
+    def coerce(self, value: Any) -> Any:
+        """Conversion vers le type déclaré (None → valeur par défaut)"""
+        if value is None:
+            if self.required:
+                raise ValueError(f"Paramètre requis: {self.name}")
+            return self.default
+        if isinstance(value, self.type):
+            return value
+        try:
+            return self.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Paramètre {self.name}: {value!r} n'est pas de type {self.type.__name__}")
+
+@dataclass
+class ToolSpec:
+    """Outil enregistré"""
+    name: str
+    func: Callable[..., Any]
+    parameters: List[ToolParameter] = field(default_factory=list)
+    label: Optional[str] = None  # Catégorie exposée dans execution_result["tool_used"]
+    memoize: bool = True
+    ttl: Optional[float] = None  # Défaut du registre si None
+    description: str = ""
+
+    def bind(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Paramètres déclarés uniquement, convertis et complétés"""
+        return {param.name: param.coerce(arguments.get(param.name)) for param in self.parameters}
+
+class ToolRegistry:
+    """Registre des outils avec mémoïsation par version des données"""
+
+    def __init__(self, cache_size: Optional[int] = None, ttl: Optional[float] = None,
+                 version_check_interval: Optional[float] = None,
+                 version_provider: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            cache_size: Résultats mémoïsés (défaut: TOOL_CACHE_SIZE ou 256, 0 = désactivé)
+            ttl: Durée de vie en secondes (défaut: TOOL_CACHE_TTL ou 300)
+            version_check_interval: Relecture de la version des données en secondes
+                                    (défaut: TOOL_VERSION_CHECK_INTERVAL ou 5)
+            version_provider: Jeton de version (défaut: DatabaseManager.get_data_version)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv('TOOL_CACHE_SIZE', 256))
+        self.ttl = ttl if ttl is not None else float(os.getenv('TOOL_CACHE_TTL', 300))
+        self.version_check_interval = (version_check_interval if version_check_interval is not None
+                                       else float(os.getenv('TOOL_VERSION_CHECK_INTERVAL', 5)))
+
+        if version_provider is None:
+            db_manager = get_database_manager()
+            version_provider = db_manager.get_data_version
+            # Ajout dans ce processus → version relue au prochain appel
+            db_manager.register_append_listener(self._on_data_appended)
+        self._version_provider = version_provider
+        self.period_resolver = get_period_resolver()
+
+        self._tools: Dict[str, ToolSpec] = {}
+        self._hooks: List[Callable[[Dict[str, Any]], None]] = []
+        self._cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._version_checked_at = 0.0
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # ---- Enregistrement ----
+
+    def register(self, name: str, func: Callable[..., Any], parameters: Optional[List[ToolParameter]] = None,
+                 label: Optional[str] = None, memoize: bool = True, ttl: Optional[float] = None,
+                 description: str = "") -> ToolSpec:
+        """Enregistre (ou remplace) un outil"""
+        spec = ToolSpec(name, func, list(parameters or []), label or name, memoize, ttl, description)
+        self._tools[name] = spec
+        return spec
+
+    def tool(self, name: str, **options) -> Callable:
+        """Décorateur d'enregistrement"""
+        def decorator(func: Callable) -> Callable:
+            self.register(name, func, **options)
+            return func
+        return decorator
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """Hook appelé après chaque appel : tool, parameters, duration_ms, cache_hit, error"""
+        self._hooks.append(hook)
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._tools.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    @property
+    def tool_names(self) -> List[str]:
+        return list(self._tools)
+
+    # ---- Exécution ----
+
+    def call(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Appelle un outil (résultat mémoïsé si disponible)
+
+        Args:
+            name: Nom de l'outil
+            arguments: Paramètres (les clés non déclarées sont ignorées)
+
+        Raises:
+            KeyError: Outil inconnu
+            ValueError: Paramètre invalide
+        """
+        spec = self._tools.get(name)
+        if spec is None:
+            raise KeyError(f"Outil inconnu: {name}")
+
+        parameters = spec.bind(arguments or {})
+        started = time.perf_counter()
+        cache_hit = False
+        error = None
+
+        with get_tracer().span(f"tool.{name}") as span:
+            try:
+                key = self._make_key(name, parameters) if spec.memoize and self.cache_size > 0 else None
+                result = self._cache_get(key, spec) if key else None
+                cache_hit = result is not None
+                if not cache_hit:
+                    result = spec.func(**parameters)
+                    if key and not self._is_error(result):
+                        self._cache_put(key, result)
+                return result
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000
+                if span is not None:
+                    span.set_attribute("cache_hit", cache_hit)
+                self._record(name, parameters, duration_ms, cache_hit, error)
+
+    @staticmethod
+    def _is_error(result: Any) -> bool:
+        return isinstance(result, dict) and (result.get("status") == "error" or "error" in result)
+
+    def data_version(self) -> str:
+        """Version des données (relue au plus toutes les version_check_interval secondes)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._version_checked_at < self.version_check_interval:
+                return self._version
+        version = self._version_provider()
+        with self._lock:
+            self._version, self._version_checked_at = version, now
+        return version
+
+    def _on_data_appended(self, start, end):
+        with self._lock:
+            self._version = None
+
+    def _make_key(self, name: str, parameters: Dict[str, Any]) -> str:
+        # Jour courant : les périodes relatives (7d, last_month...) changent à minuit
+        today = self.period_resolver.today_provider().isoformat()
+        return json.dumps([name, parameters, self.data_version(), today], sort_keys=True, default=str)
+
+    def _cache_get(self, key: str, spec: ToolSpec) -> Optional[Any]:
+        ttl = spec.ttl if spec.ttl is not None else self.ttl
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            result, stored_at = entry
+            if time.monotonic() - stored_at > ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        # Copie : les appelants enrichissent parfois le résultat
+        return copy.deepcopy(result)
+
+    def _cache_put(self, key: str, result: Any):
+        with self._lock:
+            self._cache[key] = (copy.deepcopy(result), time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _record(self, name: str, parameters: Dict[str, Any], duration_ms: float, cache_hit: bool, error: Optional[str]):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "cache_hits": 0, "errors": 0, "total_ms": 0.0})
+            stats["calls"] += 1
+            stats["cache_hits"] += int(cache_hit)
+            stats["errors"] += int(error is not None)
+            stats["total_ms"] += duration_ms
+
+        event = {
+            "tool": name,
+            "parameters": parameters,
+            "duration_ms": round(duration_ms, 3),
+            "cache_hit": cache_hit,
+            "error": error
+        }
+        for hook in list(self._hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                self.logger.warning(f"Hook d'outil en échec: {e}")
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Appels, hits et durée moyenne par outil"""
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.cache_size,
+                "ttl_s": self.ttl,
+                "data_version": self._version,
+                "tools": {
+                    name: {**stats, "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0}
+                    for name, stats in self._stats.items()
+                }
+            }
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+⏱️ OBSERVABILITY - TRACES DE LATENCE
+===================================
+
+Spans chronométrés (workflow, Gemini, DuckDB) exportés en JSONL OTLP.
+"""
+
+from .tracer import Span, Tracer, JsonlSpanExporter, get_tracer, current_span
+
+__all__ = [
+    'Span',
+    'Tracer',
+    'JsonlSpanExporter',
+    'get_tracer',
+    'current_span'
+]
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+⏱️ TRACEUR DE LATENCE - OBSERVABILITÉ
+====================================
+
+Spans chronométrés avec relations parent/enfant, propagés par contextvars
+(les nœuds LangGraph exécutés dans des threads héritent du contexte).
+
+Critères d'acceptation :
+- Nœuds du workflow, appels Gemini et requêtes DuckDB tracés
+- Export JSONL local au format OTLP/JSON (OpenTelemetry), sur activation,
+  fichier plafonné (rotation vers un seul fichier .1)
+- Arbre des spans attachable à la réponse
+"""
+
+import os
+import json
+import time
+import secrets
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("energy_current_span", default=None)
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Valeur d'attribut au format OTLP/JSON"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Span:
+    """Intervalle chronométré d'une opération"""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.children: List["Span"] = []
+        self.status = "OK"
+        self.status_message: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._start_perf = time.perf_counter()
+        self._duration: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return self._duration * 1000 if self._duration is not None else None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.end_ns is None:
+            self._duration = time.perf_counter() - self._start_perf
+            self.end_ns = self.start_ns + int(self._duration * 1e9)
+
+    def _add_child(self, child: "Span"):
+        with self._lock:
+            self.children.append(child)
+
+    def iter_spans(self):
+        """Ce span puis tous ses descendants"""
+        yield self
+        for child in list(self.children):
+            yield from child.iter_spans()
+
+    def to_tree(self) -> Dict[str, Any]:
+        """Arbre imbriqué (pour les métadonnées de réponse)"""
+        tree = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+            "children": [child.to_tree() for child in sorted(self.children, key=lambda c: c.start_ns)]
+        }
+        if self.status_message:
+            tree["status_message"] = self.status_message
+        return tree
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span au format OTLP/JSON"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else "",
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": "STATUS_CODE_ERROR" if self.status == "ERROR" else "STATUS_CODE_OK"}
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+class JsonlSpanExporter:
+    """Export des traces terminées, un span OTLP par ligne"""
+
+    def __init__(self, path: Optional[str] = None, service_name: str = "energy-agent",
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: Fichier JSONL (défaut: TRACE_EXPORT_PATH, vide = export désactivé)
+            service_name: Attribut service.name de la ressource
+            max_bytes: Taille au-delà de laquelle le fichier est renommé en .1
+                       (défaut: TRACE_EXPORT_MAX_BYTES ou 10 Mo)
+        """
+        configured = os.getenv('TRACE_EXPORT_PATH', '') if path is None else path
+        self.path = Path(configured) if configured else None
+        self.max_bytes = max_bytes or int(os.getenv('TRACE_EXPORT_MAX_BYTES', 10 * 1024 * 1024))
+        self.service_name = service_name
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def export(self, root: Span):
+        if self.path is None:
+            return
+        resource = {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]}
+        lines = [
+            json.dumps({"resource": resource, "span": span.to_otlp()}, ensure_ascii=False, default=str)
+            for span in root.iter_spans()
+        ]
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                    # Un seul fichier conservé : disque borné à environ 2 × max_bytes
+                    self.path.replace(self.path.with_name(self.path.name + ".1"))
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            self.logger.warning(f"Export des traces impossible: {e}")
+
+class Tracer:
+    """Création des spans et export des traces racines"""
+
+    def __init__(self, exporter: Optional[JsonlSpanExporter] = None):
+        self.exporter = exporter or JsonlSpanExporter()
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, **attributes):
+        """
+        Span enfant du span courant
+
+        Hors trace active, ne crée rien (yield None) sauf si root=True :
+        les requêtes du tableau de bord ne produisent pas de traces isolées.
+        """
+        parent = _current_span.get()
+        if parent is None and not root:
+            yield None
+            return
+
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        span = Span(name, trace_id, parent, attributes)
+        if parent is not None:
+            parent._add_child(span)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+            if parent is None:
+                self.exporter.export(span)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Décorateur : exécute la fonction dans un span"""
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+def current_span() -> Optional[Span]:
+    """Span actif dans le contexte courant"""
+    return _current_span.get()
+
+# Instance globale
+_tracer: Optional[Tracer] = None
+
+def get_tracer() -> Tracer:
+    """Retourne l'instance globale du traceur"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
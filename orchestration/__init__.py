@@ -11,12 +11,21 @@ Composants :
 - error_handler.py: Agent de gestion d'erreurs  
 - result_formatter.py: Agent de formatage
 - energy_business_logic.py: Agent de logique métier
+- plan_executor.py: Exécution DAG des plans multi-étapes
+- answer_cache.py: Cache des réponses complètes
 - config/: Configuration centralisée
 """
 
 from .energy_langgraph_workflow import EnergyLangGraphWorkflow, get_energy_workflow
+from .plan_executor import PlanExecutor, get_plan_executor, topological_order
+from .answer_cache import AnswerCache, normalize_question
 
 __all__ = [
     'EnergyLangGraphWorkflow',
-    'get_energy_workflow'
+    'get_energy_workflow',
+    'PlanExecutor',
+    'get_plan_executor',
+    'topological_order',
+    'AnswerCache',
+    'normalize_question'
 ]
\ No newline at end of file
@@ -8,6 +8,7 @@ Agents spécialisés pour l'architecture énergétique.
 
 from .energy_business_rules import EnergyBusinessRules, QuestionIntent, ExecutionStrategy
 from .standard_response import StandardResponse, ResponseBuilder, ResponseType, ResponseStatus
+from .fast_path_resolver import FastPathResolver, FastPathResult, map_period_code
 
 __all__ = [
     'EnergyBusinessRules',
@@ -16,7 +17,10 @@ __all__ = [
     'StandardResponse',
     'ResponseBuilder',
     'ResponseType',
-    'ResponseStatus'
+    'ResponseStatus',
+    'FastPathResolver',
+    'FastPathResult',
+    'map_period_code'
 ]
 
 
@@ -319,15 +319,9 @@ class EnergyBusinessRules:
         
         # 🆕 PRIORITÉ: Utiliser la période validée par LangChain si disponible
         if validated_period:
-            # Mapper les jours nommés vers des périodes utilisables
-            if validated_period in ['saturday', 'sunday']:
-                period = '1d'  # Utiliser 1 jour pour les jours spécifiques
-            elif validated_period == 'weekend':
-                period = '2d'  # Weekend = 2 jours (samedi + dimanche)
-                # 🔧 Logique spéciale pour weekend : chercher les derniers samedi + dimanche
-                # Pour l'instant, utiliser 2d comme approximation
-            else:
-                period = validated_period
+            # Jours nommés (saturday, sunday, weekend) résolus en dates absolues
+            # par le PeriodResolver : derniers samedi / dimanche écoulés
+            period = validated_period
             # self.logger.info(f"🔍 Utilisation période validée: {period}")  # Logger pas toujours disponible
         # Sinon, déterminer la période selon le temporal (logique existante)
         elif intent.temporal == 'hier':
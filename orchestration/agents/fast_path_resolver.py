@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+⚡ FAST PATH RESOLVER
+====================
+
+Résolution déterministe (grammaire de règles) du code de période d'une
+question, sans appel LLM.
+
+Les règles reproduisent les codes de période du prompt LLM (CURRENT_MONTH,
+YESTERDAY, HOURLY, WEEKEND, ...). Quand une seule famille de règles
+correspond, qu'aucun détail temporel ne reste hors des règles (mois, date,
+jour férié, exclusion...) et que l'intention n'exige pas le plan LLM, le
+workflow passe directement de intent_analyzer à strategy_builder.
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+from .energy_business_rules import QuestionIntent
+
+# Codes de période du LLM → codes de période du système
+PERIOD_CODE_MAPPING: Dict[str, str] = {
+    # Périodes temporelles
+    'CURRENT_MONTH': 'current_month',
+    'LAST_MONTH': 'last_month',
+    'LAST_30_DAYS': '30d',
+    'LAST_3_DAYS': '3d',
+    'CURRENT_WEEK': 'current_week',
+    'LAST_7_DAYS': '7d',
+    'YESTERDAY': '1d',
+    'DAY_BEFORE_YESTERDAY': '1d_avant_hier',
+    'CURRENT_YEAR': 'current_year',
+    'LAST_YEAR': 'last_year',
+    # Granularités
+    'HOURLY': 'hourly',
+    'DAILY': 'daily',
+    'WEEKLY': 'weekly',
+    'MONTHLY': 'monthly',
+    'YEARLY': 'yearly',
+    # Jours nommés
+    'SATURDAY': 'saturday',
+    'SUNDAY': 'sunday',
+    'WEEKEND': 'weekend'
+}
+
+# Grammaire : (code, motif) — mêmes expressions que PlanGeneratorPrompt.PERIOD_CODE_GUIDE
+PERIOD_RULES: List[Tuple[str, str]] = [
+    ('DAY_BEFORE_YESTERDAY', r"\bavant[- ]hier\b|\bil y a (2|deux) jours\b"),
+    ('YESTERDAY', r"(?<!avant-)(?<!avant )\bhier\b"),
+    ('LAST_3_DAYS', r"\b(3|trois) derniers jours\b"),
+    ('LAST_7_DAYS', r"\b(7|sept) derniers jours\b"),
+    ('LAST_30_DAYS', r"\b(30|trente) derniers jours\b|\bces 30 jours\b"),
+    ('CURRENT_MONTH', r"\bce mois(-ci)?\b"),
+    ('LAST_MONTH', r"\bmois (dernier|passé)\b|\bdernier mois\b"),
+    ('CURRENT_WEEK', r"\bcette semaine\b"),
+    ('CURRENT_YEAR', r"\bcette année\b"),
+    ('LAST_YEAR', r"\bannée (dernière|passée)\b"),
+    ('HOURLY', r"\bpar heure\b|\bhoraire\b|\bà l'heure\b"),
+    ('DAILY', r"\bpar jour\b|\bquotidien(ne)?\b|\bjournali[eè]re?\b"),
+    ('WEEKLY', r"\bpar semaine\b|\bhebdomadaire\b"),
+    ('MONTHLY', r"\bpar mois\b|\bmensuel(le)?\b"),
+    ('YEARLY', r"\bpar an(née)?\b|\bannuel(le)?\b"),
+    ('WEEKEND', r"\bweek-?end\b|\bfin de semaine\b"),
+    ('SATURDAY', r"\bsamedi\b"),
+    ('SUNDAY', r"\bdimanche\b")
+]
+
+# Détails temporels qu'aucune règle ne couvre : la question relève du LLM
+UNCOVERED_TEMPORAL_RULES: List[Tuple[str, str]] = [
+    ('mois nommé', r"\b(janvier|f[ée]vrier|mars|avril|mai|juin|juillet|ao[uû]t|septembre|octobre|novembre|d[ée]cembre)\b"),
+    ('jour de semaine', r"\b(lundi|mardi|mercredi|jeudi|vendredi)\b"),
+    ('date explicite', r"\b\d{1,2}[/.-]\d{1,2}([/.-]\d{2,4})?\b|\b(19|20)\d{2}\b|\b(le|du|au) (1er|[0-3]?\d)\b|\b1er\b"),
+    ('jour férié', r"\bp[aâ]ques\b|\bno[eë]l\b|\btoussaint\b|\bnouvel an\b|\bpentec[oô]te\b|\bascension\b"
+                   r"|\bf[ée]ri[ée]s?\b|\bvacances\b|\bréveillon\b|\b(14|quatorze) juillet\b"),
+    ('exclusion', r"\bsans\b|\bsauf\b|\bhors\b|\bexcept[ée]\b|\bà part\b|\ben dehors\b|\bexclu"),
+    ('borne', r"\bdepuis\b|\bentre\b|\bjusqu'|\bà partir d"),
+    ('moment de la journée', r"\bmatin(ée)?\b|\bsoir(ée)?\b|\bnuit\b|\bapr[eè]s-midi\b|\b\d{1,2} ?h(\d{2})?\b")
+]
+
+# Intentions dont la stratégie dépend du contenu du plan LLM
+LLM_DEPENDENT_INTENTS = {'comparaison', 'coût', 'prévision'}
+
+# Formulations comparatives mal classées par l'analyse d'intention locale
+COMPARISON_MARKERS = [
+    'est-elle', 'plus élevée', 'plus faible', 'différente', 'compare', 'versus', ' vs ',
+    'augmenté', 'diminué', 'évolution', 'tendance'
+]
+
+def map_period_code(period_code: str, question: str) -> Tuple[str, bool]:
+    """
+    Traduit un code de période LLM en période du système
+
+    Args:
+        period_code: Code (ex: "LAST_7_DAYS")
+        question: Question d'origine (règles spéciales horaires / annuelles)
+
+    Returns:
+        (période validée, code reconnu)
+    """
+    question_lower = question.lower()
+
+    # 🔧 Fallback intelligent selon le contexte
+    if 'jour' in period_code.lower():
+        fallback_period = '1d'
+    elif 'semaine' in period_code.lower():
+        fallback_period = '7d'
+    elif 'mois' in period_code.lower():
+        fallback_period = '30d'
+    else:
+        fallback_period = '7d'
+
+    # 🔧 Mapping spécial pour les moyennes horaires avec période spécifique
+    if period_code == 'LAST_7_DAYS' and 'horaire' in question_lower:
+        validated_period = '7d'  # Forcer 7d pour les moyennes horaires de la semaine
+    elif period_code == 'CURRENT_YEAR' and 'moyenne' in question_lower:
+        validated_period = 'yearly'  # Traiter comme granularité YEARLY
+    elif 'horaire' in question_lower and 'semaine' in question_lower:
+        validated_period = '7d'  # 🔧 Forcer 7d pour toutes les moyennes horaires de semaine
+    elif 'horaire' in question_lower and 'dernière' in question_lower:
+        validated_period = '7d'  # 🔧 Forcer 7d pour toutes les moyennes horaires de semaine dernière
+    elif 'horaire' in question_lower and 'moyenne' in question_lower:
+        validated_period = '7d'  # 🔧 CORRECTION : Forcer 7d pour toutes les moyennes horaires
+    else:
+        validated_period = PERIOD_CODE_MAPPING.get(period_code, fallback_period)
+
+    return validated_period, period_code in PERIOD_CODE_MAPPING
+
+@dataclass
+class FastPathResult:
+    """Résolution déterministe d'une question"""
+    period_code: Optional[str]
+    validated_period: Optional[str]
+    confidence: float
+    matched_codes: List[str]
+    reason: str
+
+    def semantic_validation(self, question: str) -> Dict[str, Any]:
+        """Même forme que la validation produite par le nœud llm_agent"""
+        return {
+            "original_question": question,
+            "detected_period_code": self.period_code,
+            "validated_period": self.validated_period,
+            "confidence": "high",
+            "source": "fast_path"
+        }
+
+    def raw_plan(self, question: str, intent: QuestionIntent) -> Dict[str, Any]:
+        """Plan équivalent à celui du LLM pour les stratégies qui le consultent"""
+        return {
+            "question_context": question,
+            "steps": [{
+                "tool_name": "aggregate",
+                "parameters": {
+                    "period": self.validated_period,
+                    "aggregation": intent.aggregation
+                },
+                "description": "Plan déterministe (fast path)"
+            }],
+            "source": "fast_path"
+        }
+
+class FastPathResolver:
+    """Résolveur à base de règles pour les questions fréquentes"""
+
+    def __init__(self, threshold: Optional[float] = None):
+        """
+        Args:
+            threshold: Confiance minimale pour court-circuiter les LLM
+                       (défaut: FAST_PATH_THRESHOLD ou 0.9)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.threshold = threshold if threshold is not None else float(os.getenv('FAST_PATH_THRESHOLD', 0.9))
+        self.rules = [(code, re.compile(pattern)) for code, pattern in PERIOD_RULES]
+        self.uncovered_rules = [(label, re.compile(pattern)) for label, pattern in UNCOVERED_TEMPORAL_RULES]
+
+    def match_codes(self, question: str) -> List[str]:
+        """Codes de période dont au moins une règle correspond"""
+        question_lower = question.lower()
+        return [code for code, pattern in self.rules if pattern.search(question_lower)]
+
+    def uncovered_details(self, question: str) -> List[str]:
+        """Détails temporels présents dans la question mais non couverts par les règles"""
+        question_lower = question.lower()
+        return [label for label, pattern in self.uncovered_rules if pattern.search(question_lower)]
+
+    def resolve(self, question: str, intent: QuestionIntent) -> FastPathResult:
+        """
+        Résout la période d'une question et estime la confiance
+
+        Args:
+            question: Question utilisateur
+            intent: Intention détectée par EnergyBusinessRules
+
+        Returns:
+            FastPathResult (confidence = 0 si le chemin LLM est requis)
+        """
+        codes = self.match_codes(question)
+
+        if intent.intent_type in LLM_DEPENDENT_INTENTS:
+            return FastPathResult(None, None, 0.0, codes, f"intention {intent.intent_type} → plan LLM requis")
+        if any(marker in question.lower() for marker in COMPARISON_MARKERS):
+            return FastPathResult(None, None, 0.5, codes, "formulation comparative")
+        if not codes:
+            return FastPathResult(None, None, 0.0, codes, "aucune règle de période")
+        uncovered = self.uncovered_details(question)
+        if uncovered:
+            # La règle ne capture qu'une partie de la période demandée
+            return FastPathResult(None, None, 0.5, codes, f"détails temporels non couverts: {', '.join(uncovered)}")
+        if len(codes) > 1:
+            return FastPathResult(None, None, 0.5, codes, "règles concurrentes")
+
+        period_code = codes[0]
+        validated_period, _ = map_period_code(period_code, question)
+        return FastPathResult(period_code, validated_period, 0.95, codes, "règle unique")
+
+    def should_shortcut(self, result: FastPathResult) -> bool:
+        """La confiance dépasse-t-elle le seuil ?"""
+        return result.validated_period is not None and result.confidence >= self.threshold
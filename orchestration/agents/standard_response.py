@@ -12,6 +12,25 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 
+# Libellés des périodes validées (validation sémantique / paramètres de plan)
+PERIOD_LABELS = {
+    'current_month': 'ce mois-ci',
+    'last_month': 'le mois dernier', 
+    'current_year': 'cette année',
+    'last_year': 'l\'année dernière',
+    'current_week': 'cette semaine',
+    '30d': 'ces 30 derniers jours',
+    '7d': 'ces 7 derniers jours',
+    '1d': 'hier',
+    '1d_avant_hier': 'avant-hier'  # 🔧 CORRECTION : Ajouter avant-hier
+}
+
+ZONE_NAMES = {
+    'cuisine': 'la cuisine',
+    'buanderie': 'la buanderie', 
+    'chauffage': 'le chauffage'
+}
+
 class ResponseStatus(Enum):
     SUCCESS = "success"
     ERROR = "error"
@@ -270,18 +289,7 @@ class ResponseBuilder:
         # 🆕 PRIORITÉ: Utiliser la validation sémantique si disponible
         if semantic_validation and semantic_validation.get('validated_period'):
             validated_period = semantic_validation['validated_period']
-            period_mapping = {
-                'current_month': 'ce mois-ci',
-                'last_month': 'le mois dernier', 
-                'current_year': 'cette année',
-                'last_year': 'l\'année dernière',
-                'current_week': 'cette semaine',
-                '30d': 'ces 30 derniers jours',
-                '7d': 'ces 7 derniers jours',
-                '1d': 'hier',
-                '1d_avant_hier': 'avant-hier'  # 🔧 CORRECTION : Ajouter avant-hier
-            }
-            period_text = period_mapping.get(validated_period, f'sur la période demandée')
+            period_text = PERIOD_LABELS.get(validated_period, f'sur la période demandée')
         else:
             # Fallback: formatage intelligent basé sur la QUESTION
             question_lower = question.lower()
@@ -403,13 +411,7 @@ class ResponseBuilder:
             max_zone = max(zones.items(), key=lambda x: x[1])
             zone_name, zone_value = max_zone
             
-            zone_names = {
-                'cuisine': 'la cuisine',
-                'buanderie': 'la buanderie', 
-                'chauffage': 'le chauffage'
-            }
-            
-            response.answer = f"🏠 {zone_names.get(zone_name, zone_name)} consomme le plus avec {zone_value:.1f} kWh. Total: {response.value:.1f} kWh."
+            response.answer = f"🏠 {ZONE_NAMES.get(zone_name, zone_name)} consomme le plus avec {zone_value:.1f} kWh. Total: {response.value:.1f} kWh."
         else:
             response.answer = "Aucune donnée de zones disponible."
         
@@ -516,3 +518,74 @@ class ResponseBuilder:
         # 🌟 Ajouter de l'empathie et de la chaleur
         response.answer = self._add_warmth_and_empathy(response.answer, question)
         return response
+    
+    def build_plan_response(self, question: str, mcp_result: Dict[str, Any]) -> StandardResponse:
+        """🧩 Construit une réponse à partir des sorties de chaque étape d'un plan multi-étapes"""
+        plan_execution = mcp_result['plan_execution']
+        steps = plan_execution['steps']
+        
+        sentences = []
+        primary = None
+        for step_id in sorted(steps):
+            step = steps[step_id]
+            tool_name = step['tool_name']
+            result = step['result'] or {}
+            
+            if step['status'] != 'success':
+                sentences.append(f"⚠️ Étape {step_id} ({tool_name}) : {step.get('message') or step.get('reason')}.")
+                continue
+            
+            period = step['parameters'].get('period') or result.get('period')
+            period_text = PERIOD_LABELS.get(period, 'sur la période demandée')
+            
+            if tool_name == 'aggregate':
+                value = StandardResponse._extract_value({'data': result})
+                entry = (value, 'kWh', ResponseType.CONSUMPTION, period)
+                sentences.append(f"⚡ Vous avez consommé {value:.1f} kWh {period_text}.")
+            elif tool_name == 'cost':
+                value = float(result.get('cost', 0))
+                entry = (value, '€', ResponseType.COST, period)
+                sentence = f"💰 Le coût est de {value:.2f}€ pour {result.get('consumption_kwh', 0):.1f} kWh {period_text}."
+                if result.get('advice'):
+                    sentence += f" 💡 {result['advice']}."
+                sentences.append(sentence)
+            elif tool_name == 'zone_comparison':
+                zones = result.get('zones') or {}
+                value = float(result.get('total', sum(zones.values())))
+                entry = (value, 'kWh', ResponseType.ZONES, period)
+                if zones:
+                    zone_name, zone_value = max(zones.items(), key=lambda x: x[1])
+                    sentences.append(f"🏠 {ZONE_NAMES.get(zone_name, zone_name)} consomme le plus {period_text} "
+                                     f"avec {zone_value:.1f} kWh. Total: {value:.1f} kWh.")
+            elif tool_name == 'forecast':
+                value = float(result.get('forecast_value', 0))
+                entry = (value, 'kWh', ResponseType.FORECAST, result.get('horizon'))
+                sentence = f"🔮 Prévision sur {result.get('horizon')} : {value:.1f} kWh"
+                interval = result.get('confidence_interval')
+                if interval:
+                    sentence += f" (entre {interval[0]:.1f} et {interval[1]:.1f} kWh)"
+                sentences.append(sentence + ".")
+            else:
+                # plot : spécification de graphique transmise via les métadonnées
+                continue
+            
+            if primary is None:
+                primary = entry
+        
+        value, unit, response_type, period = primary or (0.0, 'kWh', ResponseType.CONSUMPTION, None)
+        answer = " ".join(sentences) or "Aucun résultat exploitable pour ce plan."
+        
+        return StandardResponse(
+            value=value,
+            unit=unit,
+            status=ResponseStatus.SUCCESS if mcp_result.get('status') == 'success' else ResponseStatus.ERROR,
+            response_type=response_type,
+            question=question,
+            period=period or 'unknown',
+            aggregation='plan',
+            metadata={"plan_steps": steps, "levels": plan_execution['levels']},
+            # 🌟 Ajouter de l'empathie et de la chaleur
+            answer=self._add_warmth_and_empathy(answer, question),
+            source=mcp_result.get('source', 'langgraph_plan'),
+            agent_chain=['plan_executor']
+        )
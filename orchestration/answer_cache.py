@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+⚡ CACHE DES RÉPONSES COMPLÈTES - BLOC 3
+=======================================
+
+Cache de premier niveau de process_question : une question déjà posée
+aujourd'hui, sur les mêmes données, ne traverse plus le graphe.
+
+Critères d'acceptation :
+- Clé = question normalisée (casse, accents, espaces) + date du jour
+  (périodes relatives) + watermark MAX(timestamp) des données
+- Invalidation automatique au changement de jour ou à l'arrivée de données
+- Taille bornée (LRU) et TTL configurables
+"""
+
+import os
+import re
+import copy
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    from mcp_server.core.database_manager import get_database_manager
+    from mcp_server.core.period_resolver import get_period_resolver
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from mcp_server.core.database_manager import get_database_manager
+    from mcp_server.core.period_resolver import get_period_resolver
+
+def normalize_question(question: str) -> str:
+    """Minuscules, sans accents, espaces compactés"""
+    decomposed = unicodedata.normalize("NFKD", question.casefold())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", without_accents).strip()
+
+class AnswerCache:
+    """Cache LRU des réponses finales du workflow"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Args:
+            max_entries: Réponses conservées (défaut: ANSWER_CACHE_SIZE ou 512, 0 = désactivé)
+            ttl: Durée de vie en secondes (défaut: ANSWER_CACHE_TTL ou 3600)
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('ANSWER_CACHE_SIZE', 512))
+        self.ttl = ttl if ttl is not None else float(os.getenv('ANSWER_CACHE_TTL', 3600))
+        self.db_manager = get_database_manager()
+        self.period_resolver = get_period_resolver()
+
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._stamp: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def watermark(self) -> str:
+        """Dernier timestamp des données (change à chaque ajout)"""
+        latest = self.db_manager.execute_query(
+            "SELECT MAX(timestamp) AS latest FROM energy_data", use_cache=False
+        ).iloc[0]["latest"]
+        return str(latest)
+
+    def make_key(self, question: str) -> Tuple[str, str, str]:
+        """(question normalisée, date du jour, watermark)"""
+        today = self.period_resolver.today_provider().isoformat()
+        return normalize_question(question), today, self.watermark()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Réponse en cache (copie) ou None"""
+        with self._lock:
+            self._roll(key)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return copy.deepcopy(entry[0])
+
+    @staticmethod
+    def is_cacheable(response: Dict[str, Any]) -> bool:
+        """
+        Réponse fiable : ni erreur système, ni erreur de nœud, ni période de repli
+
+        Un échec du LLM produit une réponse "success" sur la période par défaut :
+        elle ne doit pas être resservie une fois le LLM rétabli.
+        """
+        if response.get("status") == "error" or response.get("errors"):
+            return False
+        validation = response.get("semantic_validation") or {}
+        return "error" not in validation and validation.get("confidence") != "low"
+
+    def put(self, key: Tuple[str, str, str], response: Dict[str, Any]):
+        """Mémorise une réponse (erreurs et réponses de repli non conservées)"""
+        if not self.enabled or not self.is_cacheable(response):
+            return
+        with self._lock:
+            self._roll(key)
+            self._entries[key] = (copy.deepcopy(response), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _roll(self, key: Tuple[str, str, str]):
+        """Nouveau jour ou nouvelles données → entrées précédentes purgées"""
+        stamp = key[1:]
+        if stamp != self._stamp:
+            self._entries.clear()
+            self._stamp = stamp
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
@@ -7,16 +7,19 @@ Workflow LangGraph propre avec agents spécialisés.
 Architecture claire : Orchestration + Agents Métier + Agents Techniques.
 
 Workflow :
-Question → Validation → Intent Analysis → LLM Agent → Strategy → MCP Agent → Response Builder → Réponse
+Question → Validation → Intent Analysis → [Fast Path | LLM Agent (période + plan)] → Strategy → MCP Agent → Response Builder → Réponse
 """
 
 import logging
 import sys
 import os
-from typing import Dict, Any, TypedDict, Optional
+import copy
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, TypedDict, Optional, Annotated, Iterable, Iterator, AsyncIterator, List
 from langgraph.graph import StateGraph, END
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import RunnableLambda
 
 # Ajouter les chemins pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -25,6 +28,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from llm_planner.core.gemini_client import GeminiClient
     from mcp_server.core.energy_mcp_tools import get_energy_capabilities
+    from mcp_server.core.database_manager import get_database_manager
+    from mcp_server.core.tool_registry import ToolRegistry, ToolParameter
+    from observability.tracer import get_tracer
 except ImportError as e:
     logging.error(f"Erreur d'import des agents techniques: {e}")
     raise
@@ -33,12 +39,19 @@ except ImportError as e:
 try:
     from .agents import (
         EnergyBusinessRules, QuestionIntent, ExecutionStrategy,
-        StandardResponse, ResponseBuilder, ResponseType
+        StandardResponse, ResponseBuilder, ResponseType,
+        FastPathResolver, map_period_code
     )
+    from .plan_executor import get_plan_executor
+    from .answer_cache import AnswerCache, normalize_question
 except ImportError as e:
     logging.error(f"Erreur d'import des agents métier: {e}")
     raise
 
+def merge_metadata(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Réducteur des métadonnées : fusion des mises à jour des branches parallèles"""
+    return {**(left or {}), **(right or {})}
+
 class EnergyState(TypedDict):
     """État partagé du workflow énergétique refactorisé"""
     # Input
@@ -56,8 +69,8 @@ class EnergyState(TypedDict):
     execution_result: Dict[str, Any]
     final_response: Dict[str, Any]
     
-    # Métadonnées
-    metadata: Dict[str, Any]
+    # Métadonnées (fusionnées si plusieurs nœuds écrivent dans la même étape)
+    metadata: Annotated[Dict[str, Any], merge_metadata]
     errors: list[str]
 
 class EnergyLangGraphWorkflow:
@@ -69,71 +82,20 @@ class EnergyLangGraphWorkflow:
         # 🧠 Agents métier (nouveaux)
         self.business_rules = EnergyBusinessRules()
         self.response_builder = ResponseBuilder()
+        self.fast_path_resolver = FastPathResolver()
         
         # 🔧 Agents techniques (existants)
         self.llm_agent = GeminiClient()
-        
-        # 🆕 Validateur sémantique LangChain (après llm_agent)
-        self._setup_semantic_validator()
         self.capabilities_agent = get_energy_capabilities()
+        self.plan_executor = get_plan_executor()  # Plans multi-étapes (depends_on)
+        self.tool_registry = self._create_tool_registry()
+        self.answer_cache = AnswerCache()  # Réponses complètes (jour + watermark)
         
         # Créer le workflow LangGraph (structure conservée)
         self.workflow = self._create_workflow()
         
         self.logger.info("✅ LangGraph Workflow refactorisé initialisé")
     
-    def _setup_semantic_validator(self):
-        """🆕 Configure le validateur sémantique LangChain"""
-        validation_prompt = PromptTemplate(
-            input_variables=["question"],
-            template="""
-Analysez cette question énergétique et déterminez la période OU la granularité EXACTE demandée.
-
-Question: "{question}"
-
-Répondez UNIQUEMENT par l'un de ces codes selon le sens précis :
-
-PÉRIODES TEMPORELLES:
-CURRENT_MONTH : "ce mois-ci", "ce mois" → mois calendaire en cours (1er du mois → aujourd'hui)
-LAST_MONTH : "mois dernier", "le mois passé" → mois calendaire précédent complet
-LAST_30_DAYS : "30 derniers jours", "ces 30 jours" → période glissante de 30 jours
-CURRENT_WEEK : "cette semaine" → semaine calendaire en cours  
-LAST_7_DAYS : "7 derniers jours" → période glissante de 7 jours
-LAST_3_DAYS : "3 derniers jours", "ces 3 derniers jours", "trois derniers jours" → période glissante de 3 jours
-YESTERDAY : "hier" → jour précédent seulement
-DAY_BEFORE_YESTERDAY : "avant-hier", "avant hier", "il y a 2 jours" → jour spécifique avant hier (1 jour seulement)
-CURRENT_YEAR : "cette année" → année calendaire en cours
-LAST_YEAR : "année dernière" → année calendaire précédente
-
-GRANULARITÉS:
-HOURLY : "par heure", "consommation horaire", "à l'heure" → granularité horaire
-DAILY : "par jour", "quotidienne", "journalière" → granularité quotidienne
-WEEKLY : "par semaine", "hebdomadaire" → granularité hebdomadaire  
-MONTHLY : "par mois", "mensuelle" → granularité mensuelle
-YEARLY : "par an", "par année", "annuelle", "annuel", "moyenne par an", "consommation moyenne par an" → granularité annuelle
-
-JOURS NOMMÉS:
-SATURDAY : "samedi", "samedi dernier" → samedi le plus récent
-SUNDAY : "dimanche", "dimanche dernier" → dimanche le plus récent
-WEEKEND : "weekend", "weekend dernier", "fin de semaine" → samedi + dimanche récents
-
-Réponse:
-            """
-        )
-        
-        # Créer un LLM compatible LangChain pour la validation
-        import os
-        langchain_gemini = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            google_api_key=os.getenv('GEMINI_API_KEY'),
-            temperature=0  # Pour validation précise
-        )
-        
-        # Validateur sémantique LangChain (compatible v0.1.0+)
-        # Stocker le LLM et le prompt séparément pour utilisation directe
-        self.semantic_validator_llm = langchain_gemini
-        self.semantic_validator_prompt = validation_prompt
-    
     def _create_workflow(self):
         """Crée le workflow LangGraph refactorisé"""
         
@@ -141,14 +103,13 @@ Réponse:
         workflow = StateGraph(EnergyState)
         
         # 🆕 Ajouter les nouveaux nœuds avec agents métier
-        workflow.add_node("validator", self._validation_node)
-        workflow.add_node("intent_analyzer", self._intent_analysis_node)  # 🆕 Nouveau
-        workflow.add_node("semantic_validator", self._semantic_validation_node)  # 🆕 Validateur LangChain
-        workflow.add_node("llm_agent", self._llm_planning_node)
-        workflow.add_node("strategy_builder", self._strategy_building_node)  # 🆕 Nouveau
-        workflow.add_node("mcp_agent", self._mcp_execution_node)
-        workflow.add_node("response_builder", self._response_building_node)  # 🆕 Nouveau
-        workflow.add_node("error_handler", self._error_handling_node)
+        workflow.add_node("validator", self._traced_node("validator", self._validation_node))
+        workflow.add_node("intent_analyzer", self._traced_node("intent_analyzer", self._intent_analysis_node))  # 🆕 Nouveau
+        workflow.add_node("llm_agent", self._traced_node("llm_agent", self._llm_planning_node, self._allm_planning_node))  # Période + plan en un appel
+        workflow.add_node("strategy_builder", self._traced_node("strategy_builder", self._strategy_building_node))  # 🆕 Nouveau
+        workflow.add_node("mcp_agent", self._traced_node("mcp_agent", self._mcp_execution_node, self._amcp_execution_node))
+        workflow.add_node("response_builder", self._traced_node("response_builder", self._response_building_node))  # 🆕 Nouveau
+        workflow.add_node("error_handler", self._traced_node("error_handler", self._error_handling_node))
         
         # 🆕 Nouveau workflow avec validation hors circuit
         workflow.set_entry_point("validator")  # 🆕 Retour au point d'entrée original
@@ -163,9 +124,16 @@ Réponse:
             }
         )
         
-        # Flow normal
-        workflow.add_edge("intent_analyzer", "semantic_validator")
-        workflow.add_edge("semantic_validator", "llm_agent")
+        # Flow normal : fast path déterministe si la confiance le permet,
+        # sinon un seul appel Gemini (code de période + plan)
+        workflow.add_conditional_edges(
+            "intent_analyzer",
+            self._route_after_intent,
+            {
+                "fast_path": "strategy_builder",
+                "llm_agent": "llm_agent"
+            }
+        )
         workflow.add_edge("llm_agent", "strategy_builder")
         workflow.add_edge("strategy_builder", "mcp_agent")
         workflow.add_edge("mcp_agent", "response_builder")
@@ -176,6 +144,84 @@ Réponse:
         
         return workflow.compile()
     
+    def _create_tool_registry(self) -> ToolRegistry:
+        """Outils des stratégies d'exécution (nom → fonction, schéma, catégorie)"""
+        registry = ToolRegistry()
+        capabilities = self.capabilities_agent
+        period = ToolParameter('period', str, '7d')
+        aggregation = ToolParameter('aggregation', str, 'sum')
+        
+        def temporal_aggregation(period: str, aggregation: str) -> Dict[str, Any]:
+            return capabilities.execute_temporal_aggregation(
+                metric='consumption', period=period, aggregation=aggregation
+            )
+        
+        registry.register(
+            'aggregate_moyenne', self._calculate_moyenne_consumption,
+            [period, ToolParameter('granularity', str, 'day')], label='moyenne'
+        )
+        registry.register('aggregate_temporal', temporal_aggregation, [period, aggregation], label='temporal')
+        registry.register(
+            'aggregate_granularity', self._aggregate_granularity,
+            [ToolParameter('granularity', str, 'hourly'), ToolParameter('analysis_period', str, '7d')],
+            label='granularity'
+        )
+        # Pour l'instant, zone_comparison sur 1 an pour la comparaison saisonnière
+        registry.register(
+            'seasonal_comparison', lambda: capabilities.execute_zone_comparison(period='365d'), label='comparison'
+        )
+        registry.register('temporal_comparison', self._temporal_comparison, label='comparison')
+        # Simulation comparaison weekend/semaine
+        registry.register(
+            'weekday_comparison', lambda: capabilities.execute_zone_comparison(period='7d'), label='comparison'
+        )
+        registry.register('zone_comparison', capabilities.execute_zone_comparison, [period])
+        registry.register(
+            'cost', capabilities.execute_cost_calculation,
+            [period, ToolParameter('target_savings', float, None)]
+        )
+        registry.register('aggregate', temporal_aggregation, [period, aggregation])  # Outil par défaut
+        return registry
+    
+    def _aggregate_granularity(self, granularity: str, analysis_period: str) -> Dict[str, Any]:
+        """Moyenne par granularité (horaire via la logique moyenne existante)"""
+        if granularity == 'hourly':
+            # Pour les heures, utiliser la méthode moyenne existante avec granularité 'heure'
+            result = self._calculate_moyenne_consumption(
+                period=analysis_period,
+                granularity='heure'  # Utiliser la logique moyenne existante
+            )
+        else:
+            # Pour les autres granularités, utiliser l'agrégation temporelle
+            result = self.capabilities_agent.execute_temporal_aggregation(
+                metric='consumption',
+                period=analysis_period,
+                aggregation='avg'  # Moyenne directe
+            )
+        
+        # Structurer le résultat pour la granularité
+        if isinstance(result, dict) and 'data' in result:
+            if isinstance(result['data'], dict):
+                result['data']['granularity'] = granularity
+            else:
+                result['data'] = {
+                    'summary': {'total': result.get('data', 0)},
+                    'granularity': granularity
+                }
+        return result
+    
+    def _temporal_comparison(self) -> Dict[str, Any]:
+        """Comparaison entre 2 périodes"""
+        current_result = self.capabilities_agent.execute_temporal_aggregation(
+            metric='consumption', period='30d', aggregation='sum'
+        )
+        # Simulation d'une comparaison (à améliorer plus tard)
+        return {
+            "current_period": current_result.get('summary', {}).get('total', 0),
+            "previous_period": current_result.get('summary', {}).get('total', 0) * 0.9,  # Simulation
+            "comparison": "higher"
+        }
+    
     def _validation_node(self, state: EnergyState) -> Dict[str, Any]:
         """🔍 Nœud de validation de la question (conservé)"""
         question = state["question"]
@@ -183,13 +229,14 @@ Réponse:
         self.logger.info(f"🔍 Validation: {question}")
         
         # Validation rapide et intelligente (logique conservée)
+        start = time.perf_counter()
         validation_result = self._validate_question(question)
         
         return {
             "validation_result": validation_result,
             "metadata": {
                 **state.get("metadata", {}),
-                "validation_time": 0.01
+                "validation_time": time.perf_counter() - start
             }
         }
     
@@ -208,7 +255,11 @@ Réponse:
         
         self.logger.info(f"✅ Intention détectée: {intent.intent_type} (confiance: {intent.confidence:.2f})")
         
-        return {
+        # ⚡ Résolution déterministe de la période (sans LLM)
+        fast_path = self.fast_path_resolver.resolve(question, intent)
+        use_fast_path = self.fast_path_resolver.should_shortcut(fast_path)
+        
+        update = {
             "question_intent": {
                 "intent_type": intent.intent_type,
                 "temporal": intent.temporal,
@@ -219,36 +270,91 @@ Réponse:
             "metadata": {
                 **state.get("metadata", {}),
                 "intent_analyzed": True,
-                "intent_confidence": intent.confidence
+                "intent_confidence": intent.confidence,
+                "fast_path": use_fast_path,
+                "fast_path_confidence": fast_path.confidence,
+                "fast_path_reason": fast_path.reason
             }
         }
+        
+        if use_fast_path:
+            self.logger.info(f"⚡ Fast path: {fast_path.period_code} → {fast_path.validated_period} (LLM ignorés)")
+            update["semantic_validation"] = fast_path.semantic_validation(question)
+            update["raw_plan"] = fast_path.raw_plan(question, intent)
+        
+        return update
+    
+    def _route_after_intent(self, state: EnergyState) -> str:
+        """Fast path → strategy_builder, sinon appel LLM combiné"""
+        if state.get("metadata", {}).get("fast_path"):
+            return "fast_path"
+        return "llm_agent"
     
     def _llm_planning_node(self, state: EnergyState) -> Dict[str, Any]:
-        """🤖 Nœud LLM Agent - Génération de plan autonome (conservé)"""
+        """🤖 Nœud LLM Agent - Code de période + plan en un seul appel Gemini"""
         question = state["question"]
         
-        self.logger.info(f"🤖 LLM Agent: Génération plan pour '{question}'")
+        self.logger.info(f"🤖 LLM Agent: Génération période + plan pour '{question}'")
         
         try:
-            # L'agent LLM est autonome (logique conservée)
-            raw_plan = self.llm_agent.generate_plan(question)
-            
-            self.logger.info(f"✅ Plan généré: {raw_plan.get('steps', [{}])[0].get('tool_name', 'unknown')}")
-            
-            return {
-                "raw_plan": raw_plan,
-                "metadata": {
-                    **state.get("metadata", {}),
-                    "llm_plan_generated": True
-                }
-            }
-            
+            # Réponse unique validée contre CombinedLLMPlan
+            raw_plan = self.llm_agent.generate_combined_plan(question)
         except Exception as e:
-            self.logger.error(f"❌ Erreur LLM Agent: {e}")
-            return {
-                "raw_plan": {},
-                "errors": state.get("errors", []) + [f"LLM Error: {str(e)}"]
+            return self._planning_error(state, e)
+        return self._planning_update(state, raw_plan)
+    
+    async def _allm_planning_node(self, state: EnergyState) -> Dict[str, Any]:
+        """🤖 Variante asynchrone du nœud LLM Agent (appel Gemini non bloquant)"""
+        question = state["question"]
+        
+        self.logger.info(f"🤖 LLM Agent (async): Génération période + plan pour '{question}'")
+        
+        try:
+            raw_plan = await self.llm_agent.agenerate_combined_plan(question)
+        except Exception as e:
+            return self._planning_error(state, e)
+        return self._planning_update(state, raw_plan)
+    
+    def _planning_update(self, state: EnergyState, raw_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Plan combiné → raw_plan + validation sémantique"""
+        question = state["question"]
+        
+        # Mapping vers les codes utilisés par le système (partagé avec le fast path)
+        period_code = raw_plan.get("period_code", "UNKNOWN")
+        validated_period, known_code = map_period_code(period_code, question)
+        
+        self.logger.info(f"✅ Validation: {period_code} → {validated_period}")
+        self.logger.info(f"✅ Plan généré: {raw_plan.get('steps', [{}])[0].get('tool_name', 'unknown')}")
+        
+        return {
+            "raw_plan": raw_plan,
+            "semantic_validation": {
+                "original_question": question,
+                "detected_period_code": period_code,
+                "validated_period": validated_period,
+                "confidence": "high" if known_code else "low",
+                "source": "llm"
+            },
+            "metadata": {
+                **state.get("metadata", {}),
+                "llm_plan_generated": True
             }
+        }
+    
+    def _planning_error(self, state: EnergyState, e: Exception) -> Dict[str, Any]:
+        """Échec de l'appel LLM → période de repli"""
+        self.logger.error(f"❌ Erreur LLM Agent: {e}")
+        return {
+            "raw_plan": {},
+            "semantic_validation": {
+                "original_question": state["question"],
+                "detected_period_code": "UNKNOWN",
+                "validated_period": "7d",  # Fallback sécurisé
+                "confidence": "low",
+                "error": str(e)
+            },
+            "errors": state.get("errors", []) + [f"LLM Error: {str(e)}"]
+        }
     
     def _strategy_building_node(self, state: EnergyState) -> Dict[str, Any]:
         """📊 Nouveau nœud de construction de stratégie"""
@@ -305,141 +411,27 @@ Réponse:
         self.logger.info(f"🔧 MCP Agent: Exécution {execution_strategy.get('tool_name', 'unknown')}")
         
         try:
+            # Plan LLM multi-étapes : exécuté à la place de l'outil unique de la stratégie
+            # (étapes indépendantes en parallèle, la réponse est construite à partir de chaque étape)
+            plan_steps = state.get("raw_plan", {}).get("steps") or []
+            if len(plan_steps) > 1:
+                plan_update = self._plan_execution(state)
+                if plan_update is not None:
+                    return plan_update
+            
             # 🆕 Exécution basée sur la stratégie au lieu de logique complexe
             tool_name = execution_strategy["tool_name"]
             parameters = execution_strategy["parameters"]
             
-            # Exécution directe selon le tool
-            if tool_name == 'aggregate_moyenne':
-                result = self._calculate_moyenne_consumption(
-                    parameters.get('period', '7d'),
-                    parameters.get('granularity', 'day')
-                )
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "moyenne",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'aggregate_temporal':  # 🆕 Nouveau
-                result = self.capabilities_agent.execute_temporal_aggregation(
-                    metric='consumption',
-                    period=parameters.get('period', '7d'),
-                    aggregation=parameters.get('aggregation', 'sum')
-                )
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "temporal",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'aggregate_granularity':  # 🆕 Nouveau pour granularités
-                # Pour les granularités, utiliser directement la moyenne des MCP capabilities
-                granularity = parameters.get('granularity', 'hourly')
-                analysis_period = parameters.get('analysis_period', '7d')
-                
-                if granularity == 'hourly':
-                    # Pour les heures, utiliser la méthode moyenne existante avec granularité 'heure'
-                    result = self._calculate_moyenne_consumption(
-                        period=analysis_period,
-                        granularity='heure'  # Utiliser la logique moyenne existante
-                    )
-                else:
-                    # Pour les autres granularités, utiliser l'agrégation temporelle
-                    result = self.capabilities_agent.execute_temporal_aggregation(
-                        metric='consumption',
-                        period=analysis_period,
-                        aggregation='avg'  # Moyenne directe
-                    )
-                
-                # Structurer le résultat pour la granularité
-                if isinstance(result, dict) and 'data' in result:
-                    if isinstance(result['data'], dict):
-                        result['data']['granularity'] = granularity
-                    else:
-                        result['data'] = {
-                            'summary': {'total': result.get('data', 0)},
-                            'granularity': granularity
-                        }
-                
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "granularity",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'seasonal_comparison':  # 🆕 Nouveau
-                # Pour l'instant, utiliser zone_comparison avec adaptation
-                result = self.capabilities_agent.execute_zone_comparison(
-                    period='365d'  # Données sur 1 an pour comparaison saisonnière
-                )
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "comparison",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'temporal_comparison':  # 🆕 Nouveau
-                # Comparaison entre 2 périodes
-                current_result = self.capabilities_agent.execute_temporal_aggregation(
-                    metric='consumption', period='30d', aggregation='sum'
-                )
-                # Simulation d'une comparaison (à améliorer plus tard)
-                result = {
-                    "current_period": current_result.get('summary', {}).get('total', 0),
-                    "previous_period": current_result.get('summary', {}).get('total', 0) * 0.9,  # Simulation
-                    "comparison": "higher"
-                }
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "comparison",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'weekday_comparison':  # 🆕 Nouveau
-                # Simulation comparaison weekend/semaine
-                result = self.capabilities_agent.execute_zone_comparison(
-                    period='7d'
-                )
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "comparison",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'zone_comparison':
-                result = self.capabilities_agent.execute_zone_comparison(
-                    period=parameters.get('period', '7d')
-                )
-                execution_result = {
-                    "status": "success", 
-                    "data": result,
-                    "tool_used": "zone_comparison",
-                    "source": "langgraph_mcp"
-                }
-            elif tool_name == 'cost':
-                result = self.capabilities_agent.execute_cost_calculation(
-                    period=parameters.get('period', '7d'),
-                    target_savings=parameters.get('target_savings')
-                )
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "cost",
-                    "source": "langgraph_mcp"
-                }
-            else:  # aggregate par défaut
-                result = self.capabilities_agent.execute_temporal_aggregation(
-                    metric='consumption',
-                    period=parameters.get('period', '7d'),
-                    aggregation=parameters.get('aggregation', 'sum')
-                )
-                execution_result = {
-                    "status": "success",
-                    "data": result,
-                    "tool_used": "aggregate",
-                    "source": "langgraph_mcp"
-                }
+            # Dispatch O(1) via le registre (aggregate par défaut), résultats mémoïsés
+            spec = self.tool_registry.get(tool_name) or self.tool_registry.get('aggregate')
+            result = self.tool_registry.call(spec.name, parameters)
+            execution_result = {
+                "status": "success",
+                "data": result,
+                "tool_used": spec.label,
+                "source": "langgraph_mcp"
+            }
             
             self.logger.info(f"✅ Exécution réussie: {execution_result.get('tool_used', 'unknown')}")
             
@@ -458,6 +450,40 @@ Réponse:
                 "errors": state.get("errors", []) + [f"MCP Error: {str(e)}"]
             }
     
+    def _plan_execution(self, state: EnergyState) -> Optional[Dict[str, Any]]:
+        """Exécution DAG du plan LLM (None si le plan est invalide → outil de la stratégie)"""
+        plan_execution = self.plan_executor.execute(state["raw_plan"])
+        if plan_execution["status"] == "error":
+            self.logger.warning(f"⚠️ Plan non exécutable ({plan_execution['message']}), repli sur la stratégie")
+            return None
+        
+        steps = plan_execution["steps"]
+        failed = [f"Plan Step {sid} ({step['tool_name']}): {step.get('message') or step.get('reason')}"
+                  for sid, step in steps.items() if step["status"] != "success"]
+        succeeded = len(failed) < len(steps)
+        self.logger.info(f"✅ Plan exécuté: {len(steps) - len(failed)}/{len(steps)} étapes en {plan_execution['duration_ms']} ms")
+        
+        update = {
+            "execution_result": {
+                "status": "success" if succeeded else "error",
+                "plan_execution": plan_execution,
+                "tool_used": "plan_executor",
+                "source": "langgraph_plan"
+            },
+            "metadata": {
+                **state.get("metadata", {}),
+                "mcp_execution_success": succeeded,
+                "plan_steps": len(steps)
+            }
+        }
+        if failed:
+            update["errors"] = state.get("errors", []) + failed
+        return update
+    
+    async def _amcp_execution_node(self, state: EnergyState) -> Dict[str, Any]:
+        """🔧 Variante asynchrone : exécution déportée dans l'exécuteur DuckDB borné"""
+        return await get_database_manager().arun(self._mcp_execution_node, state)
+    
     def _response_building_node(self, state: EnergyState) -> Dict[str, Any]:
         """📝 Nouveau nœud de construction de réponse"""
         question = state["question"]
@@ -471,7 +497,9 @@ Réponse:
             expected_format = execution_strategy.get("expected_format", "consumption")
             semantic_validation = state.get("semantic_validation", {})
             
-            if expected_format == "moyenne":
+            if "plan_execution" in execution_result:
+                response = self.response_builder.build_plan_response(question, execution_result)
+            elif expected_format == "moyenne":
                 response = self.response_builder.build_moyenne_response(question, execution_result)
             elif expected_format == "granularity":  # 🆕 Nouveau pour granularités
                 response = self.response_builder.build_granularity_response(question, execution_result, semantic_validation)
@@ -720,28 +748,45 @@ Réponse:
         """🆕 Calcule la moyenne de consommation selon la granularité"""
         try:
             from mcp_server.core.database_manager import get_database_manager
+            from mcp_server.core.period_resolver import get_period_resolver
             
             db_manager = get_database_manager()
             
-            # Conversion période en jours
-            period_days = period.replace('d', '')
+            # Période → bornes absolues [début, fin) (minuit : alignées sur le rollup quotidien)
+            resolved = get_period_resolver().resolve(period)
+            params = [resolved.start, resolved.end]
+            
+            # 🆕 Série quotidienne : rollup pré-agrégé si disponible, sinon lignes brutes 2h
+            rollup_table = db_manager.get_rollup_table('daily')
+            if rollup_table:
+                daily_series = f"""
+                    SELECT 
+                        bucket_start as day,
+                        energy_total_kwh_sum as consumption,
+                        record_count
+                    FROM {rollup_table}
+                    WHERE bucket_start >= ? AND bucket_start < ?
+                """
+            else:
+                daily_series = f"""
+                    SELECT 
+                        DATE_TRUNC('day', timestamp) as day,
+                        SUM(energy_total_kwh) as consumption,
+                        COUNT(*) as record_count
+                    FROM energy_data 
+                    WHERE timestamp >= ? AND timestamp < ?
+                    GROUP BY 1
+                """
             
             if granularity in ['day', 'jour']:  # 🔧 Correction: Support 'jour' et 'day'
                 # 🔧 Moyenne par jour avec syntaxe DuckDB correcte
                 # Note: Nos données sont en intervalles de 2h, donc 12 mesures par jour
                 query = f"""
                 SELECT 
-                    AVG(daily_consumption) as moyenne_jour,
+                    AVG(consumption) as moyenne_jour,
                     COUNT(*) as nb_jours,
-                    SUM(daily_consumption) as total
-                FROM (
-                    SELECT 
-                        DATE(timestamp) as date,
-                        SUM(energy_total_kwh) as daily_consumption
-                    FROM energy_data 
-                    WHERE timestamp >= CURRENT_DATE - INTERVAL {period_days} DAY
-                    GROUP BY DATE(timestamp)
-                ) daily_stats
+                    SUM(consumption) as total
+                FROM ({daily_series}) daily_stats
                 """
             elif granularity in ['week', 'semaine']:
                 # 🔧 Moyenne par semaine (7 jours)
@@ -752,11 +797,10 @@ Réponse:
                     SUM(weekly_consumption) as total
                 FROM (
                     SELECT 
-                        YEARWEEK(timestamp) as week_num,
-                        SUM(energy_total_kwh) as weekly_consumption
-                    FROM energy_data 
-                    WHERE timestamp >= CURRENT_DATE - INTERVAL {period_days} DAY
-                    GROUP BY YEARWEEK(timestamp)
+                        DATE_TRUNC('week', day) as week_num,
+                        SUM(consumption) as weekly_consumption
+                    FROM ({daily_series}) daily_stats
+                    GROUP BY 1
                 ) weekly_stats
                 """
             elif granularity in ['month', 'mois']:
@@ -768,11 +812,10 @@ Réponse:
                     SUM(monthly_consumption) as total
                 FROM (
                     SELECT 
-                        YEAR(timestamp) * 100 + MONTH(timestamp) as month_num,
-                        SUM(energy_total_kwh) as monthly_consumption
-                    FROM energy_data 
-                    WHERE timestamp >= CURRENT_DATE - INTERVAL {period_days} DAY
-                    GROUP BY YEAR(timestamp), MONTH(timestamp)
+                        DATE_TRUNC('month', day) as month_num,
+                        SUM(consumption) as monthly_consumption
+                    FROM ({daily_series}) daily_stats
+                    GROUP BY 1
                 ) monthly_stats
                 """
             elif granularity in ['year', 'année']:
@@ -784,49 +827,36 @@ Réponse:
                     SUM(yearly_consumption) as total
                 FROM (
                     SELECT 
-                        YEAR(timestamp) as year_num,
-                        SUM(energy_total_kwh) as yearly_consumption
-                    FROM energy_data 
-                    WHERE timestamp >= CURRENT_DATE - INTERVAL {period_days} DAY
-                    GROUP BY YEAR(timestamp)
+                        DATE_TRUNC('year', day) as year_num,
+                        SUM(consumption) as yearly_consumption
+                    FROM ({daily_series}) daily_stats
+                    GROUP BY 1
                 ) yearly_stats
                 """
-            elif granularity in ['hour', 'heure']:
+            elif granularity in ['hour', 'heure'] and period == '7d':
                 # 🔧 Moyenne par heure (données déjà en intervalles de 2h)
                 # Si la période est 7d, calculer la moyenne horaire sur 7 jours
-                if period_days == '7':
-                    query = f"""
-                    SELECT 
-                        AVG(energy_total_kwh) / 2 as moyenne_heure,
-                        COUNT(*) as nb_mesures,
-                        SUM(energy_total_kwh) as total
-                    FROM energy_data 
-                    WHERE timestamp >= CURRENT_DATE - INTERVAL 7 DAY
-                    """
-                else:
-                    query = f"""
-                    SELECT 
-                        AVG(energy_total_kwh) as moyenne_heure,
-                        COUNT(*) as nb_mesures,
-                        SUM(energy_total_kwh) as total
-                    FROM energy_data 
-                    WHERE timestamp >= CURRENT_DATE - INTERVAL {period_days} DAY
-                    """
+                query = f"""
+                SELECT 
+                    SUM(consumption) / SUM(record_count) / 2 as moyenne_heure,
+                    SUM(record_count) as nb_mesures,
+                    SUM(consumption) as total
+                FROM ({daily_series}) daily_stats
+                """
             else:
-                # Fallback: moyenne par mesure (comme avant)
+                # Fallback: moyenne par mesure 2h (comme avant)
                 query = f"""
                 SELECT 
-                    AVG(energy_total_kwh) as moyenne,
-                    COUNT(*) as nb_mesures,
-                    SUM(energy_total_kwh) as total
-                FROM energy_data 
-                WHERE timestamp >= CURRENT_DATE - INTERVAL {period_days} DAY
+                    SUM(consumption) / SUM(record_count) as moyenne,
+                    SUM(record_count) as nb_mesures,
+                    SUM(consumption) as total
+                FROM ({daily_series}) daily_stats
                 """
             
             # 🔧 Ajout de logs de debug
             self.logger.info(f"🔍 Requête SQL moyenne: {query}")
             
-            result = db_manager.execute_query(query)
+            result = db_manager.execute_query(query, params)
             self.logger.info(f"🔍 Résultat brut SQL: {result}")
             
             if result is not None and not result.empty:
@@ -1036,9 +1066,182 @@ Réponse:
         }
     
     def process_question(self, question: str) -> Dict[str, Any]:
-        """Point d'entrée principal du workflow LangGraph refactorisé"""
+        """Point d'entrée principal du workflow LangGraph refactorisé (tracé)"""
+        with get_tracer().span("workflow.process_question", root=True, question=question) as root_span:
+            key = self.answer_cache.make_key(question) if self.answer_cache.enabled else None
+            response = self._cached_answer(key, root_span)
+            if response is None:
+                response = self._process_question(question)
+                if key is not None:
+                    self.answer_cache.put(key, response)
+            root_span.set_attribute("response.status", str(response.get("status", "success")))
+        
+        return self._attach_trace(response, root_span)
+    
+    async def aprocess_question(self, question: str) -> Dict[str, Any]:
+        """
+        Point d'entrée asynchrone (LangGraph ainvoke)
+        
+        L'appel Gemini est non bloquant et les accès DuckDB passent par
+        l'exécuteur borné du DatabaseManager : un seul processus peut traiter
+        de nombreuses questions simultanément.
+        """
+        with get_tracer().span("workflow.process_question", root=True, question=question, **{"async": True}) as root_span:
+            key = None
+            if self.answer_cache.enabled:
+                key = await get_database_manager().arun(self.answer_cache.make_key, question)
+            response = self._cached_answer(key, root_span)
+            if response is None:
+                response = await self._aprocess_question(question)
+                if key is not None:
+                    self.answer_cache.put(key, response)
+            root_span.set_attribute("response.status", str(response.get("status", "success")))
+        
+        return self._attach_trace(response, root_span)
+    
+    def process_questions(self, questions: Iterable[str], max_concurrency: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Traitement par lot (évaluation, pré-chauffage des caches)
+        
+        Les questions identiques après normalisation ne sont traitées qu'une
+        fois ; les autres s'exécutent dans un pool de threads borné. Les
+        résultats sont produits au fil de l'eau, dans l'ordre d'achèvement.
+        
+        Args:
+            questions: Questions à traiter
+            max_concurrency: Questions simultanées (défaut: BATCH_MAX_CONCURRENCY ou 8)
+            
+        Yields:
+            Un résultat par question d'entrée (voir _batch_results)
+        """
+        questions = list(questions)
+        groups = self._group_questions(questions)
+        batch_start = time.perf_counter()
+        
+        def run(question: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            response = self.process_question(question)
+            return {"response": response, "started": started, "finished": time.perf_counter()}
+        
+        with ThreadPoolExecutor(max_workers=self._batch_concurrency(max_concurrency), thread_name_prefix="batch") as executor:
+            futures = {executor.submit(run, questions[indices[0]]): indices for indices in groups.values()}
+            for future in as_completed(futures):
+                yield from self._batch_results(questions, futures[future], future.result(), batch_start)
+    
+    async def aprocess_questions(self, questions: Iterable[str], max_concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Variante asynchrone de process_questions (aprocess_question sous sémaphore)"""
+        questions = list(questions)
+        groups = self._group_questions(questions)
+        semaphore = asyncio.Semaphore(self._batch_concurrency(max_concurrency))
+        batch_start = time.perf_counter()
+        
+        async def run(indices: List[int]) -> Any:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await self.aprocess_question(questions[indices[0]])
+                return indices, {"response": response, "started": started, "finished": time.perf_counter()}
+        
+        for next_done in asyncio.as_completed([run(indices) for indices in groups.values()]):
+            indices, outcome = await next_done
+            for result in self._batch_results(questions, indices, outcome, batch_start):
+                yield result
+    
+    def _group_questions(self, questions: List[str]) -> Dict[str, List[int]]:
+        """Indices des questions regroupés par question normalisée (ordre d'apparition)"""
+        groups: Dict[str, List[int]] = {}
+        for index, question in enumerate(questions):
+            groups.setdefault(normalize_question(question), []).append(index)
+        return groups
+    
+    @staticmethod
+    def _batch_concurrency(max_concurrency: Optional[int]) -> int:
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('BATCH_MAX_CONCURRENCY', 8))
+        return max(1, max_concurrency)
+    
+    def _batch_results(self, questions: List[str], indices: List[int], outcome: Dict[str, Any], batch_start: float):
+        """
+        Un résultat par question d'entrée du groupe :
+        index, question, response, queued_ms, elapsed_ms, duplicate_of
+        """
+        first = indices[0]
+        for index in indices:
+            yield {
+                "index": index,
+                "question": questions[index],
+                "response": outcome["response"] if index == first else copy.deepcopy(outcome["response"]),
+                "queued_ms": round((outcome["started"] - batch_start) * 1000, 3),
+                "elapsed_ms": round((outcome["finished"] - outcome["started"]) * 1000, 3),
+                "duplicate_of": None if index == first else first
+            }
+    
+    def _cached_answer(self, key, root_span) -> Optional[Dict[str, Any]]:
+        """Réponse complète en cache (marquée answer_cache_hit) ou None"""
+        response = self.answer_cache.get(key) if key is not None else None
+        root_span.set_attribute("answer_cache_hit", response is not None)
+        if response is not None:
+            self.logger.info("⚡ Réponse servie depuis le cache des réponses")
+            if "langgraph_metadata" in response:
+                response["langgraph_metadata"]["answer_cache_hit"] = True
+        return response
+    
+    def _attach_trace(self, response: Dict[str, Any], root_span) -> Dict[str, Any]:
+        """Arbre des spans (nœuds, Gemini, DuckDB) attaché aux métadonnées"""
+        if "langgraph_metadata" in response:
+            response["langgraph_metadata"]["trace"] = root_span.to_tree()
+        return response
+    
+    def _traced_node(self, name: str, node, anode=None):
+        """
+        Nœud LangGraph exécuté dans un span 'node.<nom>'
+        
+        Avec une variante asynchrone (anode), retourne un Runnable utilisant
+        node avec invoke et anode avec ainvoke.
+        """
+        def run(state: EnergyState) -> Dict[str, Any]:
+            with get_tracer().span(f"node.{name}"):
+                return node(state)
+        
+        if anode is None:
+            return run
+        
+        async def arun(state: EnergyState) -> Dict[str, Any]:
+            with get_tracer().span(f"node.{name}", **{"async": True}):
+                return await anode(state)
+        
+        return RunnableLambda(run, afunc=arun, name=name)
+    
+    def _process_question(self, question: str) -> Dict[str, Any]:
+        """Validation préliminaire puis exécution du graphe"""
         self.logger.info(f"🎼 LangGraph Workflow refactorisé: {question}")
         
+        out_of_scope = self._out_of_scope_response(question)
+        if out_of_scope is not None:
+            return out_of_scope
+        
+        try:
+            # Exécuter le workflow LangGraph refactorisé
+            final_state = self.workflow.invoke(self._initial_state(question))
+            return self._build_final_response(final_state)
+        except Exception as e:
+            return self._workflow_error_response(question, e)
+    
+    async def _aprocess_question(self, question: str) -> Dict[str, Any]:
+        """Variante asynchrone de _process_question"""
+        self.logger.info(f"🎼 LangGraph Workflow refactorisé (async): {question}")
+        
+        out_of_scope = self._out_of_scope_response(question)
+        if out_of_scope is not None:
+            return out_of_scope
+        
+        try:
+            final_state = await self.workflow.ainvoke(self._initial_state(question))
+            return self._build_final_response(final_state)
+        except Exception as e:
+            return self._workflow_error_response(question, e)
+    
+    def _out_of_scope_response(self, question: str) -> Optional[Dict[str, Any]]:
+        """Réponse contextuelle si la question est hors périmètre, sinon None"""
         # 🆕 Validation préliminaire pour détecter les questions de coût
         validation_result = self._validate_question(question)
         
@@ -1078,153 +1281,49 @@ Réponse:
         
         # Question de consommation valide - continuer avec le workflow normal
         self.logger.info("✅ Question de consommation valide - continuation avec workflow normal")
-        
-        try:
-            # 🆕 État initial avec nouveaux champs
-            initial_state = {
-                "question": question,
-                "question_intent": {},  # 🆕 Nouveau
-                "semantic_validation": {},  # 🆕 Nouveau
-                "execution_strategy": {},  # 🆕 Nouveau
-                "validation_result": {},
-                "raw_plan": {},
-                "enhanced_plan": {},  # Conservé pour compatibilité
-                "execution_result": {},
-                "final_response": {},
-                "metadata": {"workflow_start": True, "refactored": True},
-                "errors": []
-            }
-            
-            # Exécuter le workflow LangGraph refactorisé
-            final_state = self.workflow.invoke(initial_state)
-            
-            # Retourner la réponse finale avec métadonnées
-            response = final_state.get("final_response", {})
-            response["langgraph_metadata"] = final_state.get("metadata", {})
-            
-            # 🔧 AJOUTER LES MÉTADONNÉES INTERMÉDIAIRES POUR DEBUG
-            response["semantic_validation"] = final_state.get("semantic_validation", {})
-            response["question_intent"] = final_state.get("question_intent", {})
-            response["execution_strategy"] = final_state.get("execution_strategy", {})
-            
-            self.logger.info(f"✅ LangGraph Workflow refactorisé terminé: {response.get('type', 'unknown')}")
-            
-            return response
-            
-        except Exception as e:
-            self.logger.error(f"❌ Erreur LangGraph Workflow refactorisé: {e}")
-            return {
-                "question": question,
-                "answer": f"❌ Erreur système: {e}",
-                "status": "error",
-                "source": "langgraph_error"
-            }
+        return None
     
-    def _semantic_validation_node(self, state: EnergyState) -> Dict[str, Any]:
-        """🆕 Nœud de validation sémantique avec LangChain"""
-        question = state["question"]
+    def _initial_state(self, question: str) -> Dict[str, Any]:
+        """🆕 État initial avec nouveaux champs"""
+        return {
+            "question": question,
+            "question_intent": {},  # 🆕 Nouveau
+            "semantic_validation": {},  # 🆕 Nouveau
+            "execution_strategy": {},  # 🆕 Nouveau
+            "validation_result": {},
+            "raw_plan": {},
+            "enhanced_plan": {},  # Conservé pour compatibilité
+            "execution_result": {},
+            "final_response": {},
+            "metadata": {"workflow_start": True, "refactored": True},
+            "errors": []
+        }
+    
+    def _build_final_response(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Réponse finale + métadonnées intermédiaires"""
+        # Retourner la réponse finale avec métadonnées
+        response = final_state.get("final_response", {})
+        response["langgraph_metadata"] = final_state.get("metadata", {})
         
-        self.logger.info(f"🔍 Validation sémantique: {question}")
+        # 🔧 AJOUTER LES MÉTADONNÉES INTERMÉDIAIRES POUR DEBUG
+        response["semantic_validation"] = final_state.get("semantic_validation", {})
+        response["question_intent"] = final_state.get("question_intent", {})
+        response["execution_strategy"] = final_state.get("execution_strategy", {})
+        response["errors"] = final_state.get("errors", [])
         
-        try:
-            # Appeler le validateur LangChain (compatible v0.1.0+)
-            # Utiliser directement le LLM avec le prompt formaté
-            from langchain_core.messages import HumanMessage
-            
-            # Formater le prompt et créer un message
-            formatted_prompt_text = self.semantic_validator_prompt.format(question=question)
-            message = HumanMessage(content=formatted_prompt_text)
-            response = self.semantic_validator_llm.invoke([message])
-            
-            # Extraire le contenu de la réponse
-            if hasattr(response, 'content'):
-                validation_result = response.content
-            elif isinstance(response, str):
-                validation_result = response
-            else:
-                validation_result = str(response)
-            
-            # Nettoyer la réponse (supprimer espaces, etc.)
-            period_code = validation_result.strip().upper()
-            
-            # 🔧 Nettoyer le résultat du validateur (peut contenir plusieurs lignes)
-            period_code = period_code.split('\n')[0].strip().upper()
-            
-            # 🔧 Nettoyer le résultat du validateur (peut contenir plusieurs lignes)
-            if '\n' in period_code:
-                period_code = period_code.split('\n')[0].strip()
-            
-            # Mapping vers les codes utilisés par le système
-            period_mapping = {
-                # Périodes temporelles
-                'CURRENT_MONTH': 'current_month',  # 🔧 CORRECTION : Utiliser current_month au lieu de 30d
-                'LAST_MONTH': 'last_month', 
-                'LAST_30_DAYS': '30d',
-                'LAST_3_DAYS': '3d',  # 🔧 Ajout manquant
-                'CURRENT_WEEK': 'current_week',
-                'LAST_7_DAYS': '7d',
-                'YESTERDAY': '1d',
-                'DAY_BEFORE_YESTERDAY': '1d_avant_hier',  # 🔧 CORRECTION : Utiliser 1d_avant_hier pour le jour avant hier
-                'CURRENT_YEAR': 'current_year',
-                'LAST_YEAR': 'last_year',
-                # Granularités
-                'HOURLY': 'hourly',
-                'DAILY': 'daily',
-                'WEEKLY': 'weekly', 
-                'MONTHLY': 'monthly',
-                'YEARLY': 'yearly',
-                # Jours nommés
-                'SATURDAY': 'saturday',
-                'SUNDAY': 'sunday',
-                'WEEKEND': 'weekend'
-            }
-            
-            # 🔧 Fallback intelligent selon le contexte
-            if 'jour' in period_code.lower():
-                fallback_period = '1d'
-            elif 'semaine' in period_code.lower():
-                fallback_period = '7d'
-            elif 'mois' in period_code.lower():
-                fallback_period = '30d'
-            else:
-                fallback_period = '7d'
-                
-            # 🔧 Mapping spécial pour les moyennes horaires avec période spécifique
-            if period_code == 'LAST_7_DAYS' and 'horaire' in question.lower():
-                validated_period = '7d'  # Forcer 7d pour les moyennes horaires de la semaine
-            elif period_code == 'CURRENT_YEAR' and 'moyenne' in question.lower():
-                validated_period = 'yearly'  # Traiter comme granularité YEARLY
-            elif 'horaire' in question.lower() and 'semaine' in question.lower():
-                validated_period = '7d'  # 🔧 Forcer 7d pour toutes les moyennes horaires de semaine
-            elif 'horaire' in question.lower() and 'dernière' in question.lower():
-                validated_period = '7d'  # 🔧 Forcer 7d pour toutes les moyennes horaires de semaine dernière
-            elif 'horaire' in question.lower() and 'moyenne' in question.lower():
-                validated_period = '7d'  # 🔧 CORRECTION : Forcer 7d pour toutes les moyennes horaires
-            else:
-                validated_period = period_mapping.get(period_code, fallback_period)
-            
-            self.logger.info(f"✅ Validation: {period_code} → {validated_period}")
-            
-            return {
-                "semantic_validation": {
-                    "original_question": question,
-                    "detected_period_code": period_code,
-                    "validated_period": validated_period,
-                    "confidence": "high" if period_code in period_mapping else "low"
-                }
-            }
-            
-        except Exception as e:
-            self.logger.error(f"❌ Erreur validation sémantique: {e}")
-            return {
-                "semantic_validation": {
-                    "original_question": question,
-                    "detected_period_code": "UNKNOWN",
-                    "validated_period": "7d",  # Fallback sécurisé
-                    "confidence": "low",
-                    "error": str(e)
-                }
-            }
+        self.logger.info(f"✅ LangGraph Workflow refactorisé terminé: {response.get('type', 'unknown')}")
+        
+        return response
+    
+    def _workflow_error_response(self, question: str, e: Exception) -> Dict[str, Any]:
+        """Réponse d'erreur système"""
+        self.logger.error(f"❌ Erreur LangGraph Workflow refactorisé: {e}")
+        return {
+            "question": question,
+            "answer": f"❌ Erreur système: {e}",
+            "status": "error",
+            "source": "langgraph_error"
+        }
 
 # Instance globale
 _energy_workflow: Optional[EnergyLangGraphWorkflow] = None
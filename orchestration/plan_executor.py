@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+🧩 EXÉCUTEUR DE PLANS MULTI-ÉTAPES - BLOC 3
+==========================================
+
+Exécute les étapes d'un plan LLM (ToolStep) comme un graphe de
+dépendances (depends_on).
+
+Critères d'acceptation :
+- Ordre topologique des étapes (dépendances inconnues / cycles rejetés)
+- Étapes indépendantes exécutées en parallèle (pool de threads)
+- Résultats amont transmis aux étapes aval
+- Sortie de chaque étape en cache par (outil, paramètres, version des données, jour)
+"""
+
+import os
+import copy
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Callable
+
+try:
+    from mcp_server.core.energy_mcp_tools import get_energy_capabilities
+    from mcp_server.core.period_resolver import get_period_resolver
+    from observability.tracer import get_tracer
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from mcp_server.core.energy_mcp_tools import get_energy_capabilities
+    from mcp_server.core.period_resolver import get_period_resolver
+    from observability.tracer import get_tracer
+
+# Outil d'étape : (paramètres, résultats amont par step_id) → résultat
+ToolHandler = Callable[[Dict[str, Any], Dict[int, Any]], Any]
+
+def topological_order(steps: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Niveaux topologiques des étapes (chaque niveau ne dépend que des précédents)
+
+    Args:
+        steps: Étapes du plan (step_id, depends_on)
+
+    Returns:
+        Liste de niveaux de step_id
+
+    Raises:
+        ValueError: Dépendance inconnue ou cycle
+    """
+    dependencies = {step["step_id"]: set(step.get("depends_on") or []) for step in steps}
+
+    for step_id, deps in dependencies.items():
+        unknown = deps - dependencies.keys()
+        if unknown:
+            raise ValueError(f"Étape {step_id}: dépendances inconnues {sorted(unknown)}")
+
+    levels = []
+    done = set()
+    while len(done) < len(dependencies):
+        level = sorted(sid for sid, deps in dependencies.items() if sid not in done and deps <= done)
+        if not level:
+            raise ValueError(f"Cycle de dépendances entre les étapes {sorted(dependencies.keys() - done)}")
+        levels.append(level)
+        done.update(level)
+    return levels
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and (result.get("status") == "error" or "error" in result)
+
+class PlanExecutor:
+    """Exécution DAG des plans LLM avec cache par étape"""
+
+    def __init__(self, handlers: Optional[Dict[str, ToolHandler]] = None,
+                 max_workers: Optional[int] = None, cache_size: Optional[int] = None):
+        """
+        Args:
+            handlers: Outils par nom (défaut: outils MCP, voir _default_handlers)
+            max_workers: Étapes simultanées (défaut: PLAN_MAX_WORKERS ou 4)
+            cache_size: Sorties d'étapes en cache (défaut: PLAN_STEP_CACHE_SIZE ou 128, 0 = désactivé)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.capabilities = get_energy_capabilities()
+        self.period_resolver = get_period_resolver()
+        self.handlers = handlers if handlers is not None else self._default_handlers()
+        self.max_workers = max_workers or int(os.getenv('PLAN_MAX_WORKERS', 4))
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv('PLAN_STEP_CACHE_SIZE', 128))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="plan")
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _default_handlers(self) -> Dict[str, ToolHandler]:
+        """Outils du prompt (PlanGeneratorPrompt.AVAILABLE_TOOLS) → capacités MCP"""
+        capabilities = self.capabilities
+        tools = capabilities.energy_tools
+
+        def plot(parameters: Dict[str, Any], upstream: Dict[int, Any]) -> Dict[str, Any]:
+            # Spécification de graphique : le rendu est fait par l'interface
+            return {
+                "status": "success",
+                "chart_type": parameters.get("chart_type", "line"),
+                "period": parameters.get("period"),
+                "series": upstream
+            }
+
+        return {
+            "aggregate": lambda p, up: capabilities.execute_temporal_aggregation(
+                metric=p.get("metric", "consumption"),
+                period=p.get("period", "7d"),
+                aggregation=p.get("aggregation", "sum")
+            ),
+            "cost": lambda p, up: capabilities.execute_cost_calculation(
+                period=p.get("period", "7d"),
+                target_savings=p.get("target_savings")
+            ),
+            "zone_comparison": lambda p, up: capabilities.execute_zone_comparison(
+                period=p.get("period", "7d")
+            ),
+            "forecast": lambda p, up: tools.generate_forecast(
+                horizon=p.get("horizon", "7d"),
+                model=p.get("model", "simple")
+            ),
+            "plot": plot
+        }
+
+    @staticmethod
+    def make_key(tool_name: str, parameters: Dict[str, Any], data_version: str, today: str, upstream_keys: List[str]) -> str:
+        """Clé de cache : outil + paramètres canoniques + version des données + jour (+ clés amont)
+
+        Le jour courant invalide les périodes relatives (7d, last_month...) au changement de date.
+        """
+        return json.dumps([tool_name, parameters, data_version, today, upstream_keys], sort_keys=True, default=str)
+
+    def execute(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Exécute toutes les étapes d'un plan
+
+        Args:
+            plan: Plan LLM (steps: step_id, tool_name, parameters, depends_on)
+
+        Returns:
+            status, levels, steps (outil, paramètres, résultat, durée, cache_hit, statut par step_id), duration_ms
+        """
+        steps = {step["step_id"]: step for step in plan.get("steps", [])}
+        try:
+            levels = topological_order(list(steps.values()))
+        except ValueError as e:
+            self.logger.error(f"❌ Plan invalide: {e}")
+            return {"status": "error", "message": str(e)}
+
+        start = time.perf_counter()
+        data_version = self.capabilities.db_manager.get_data_version()
+        today = self.period_resolver.today_provider().isoformat()
+        outcomes: Dict[int, Dict[str, Any]] = {}
+        keys: Dict[int, str] = {}
+        pending = dict(steps)
+        running = {}
+
+        with get_tracer().span("plan.execute", steps=len(steps), levels=len(levels)):
+            while pending or running:
+                # Soumettre toutes les étapes dont les dépendances sont terminées
+                for step_id in [sid for sid, step in pending.items()
+                                if all(dep in outcomes for dep in step.get("depends_on") or [])]:
+                    step = pending.pop(step_id)
+                    deps = step.get("depends_on") or []
+                    failed = [dep for dep in deps if outcomes[dep]["status"] != "success"]
+                    if failed:
+                        outcomes[step_id] = {"status": "skipped", "result": None, "reason": f"dépendances en échec {failed}"}
+                        continue
+
+                    upstream = {dep: outcomes[dep]["result"] for dep in deps}
+                    keys[step_id] = self.make_key(step["tool_name"], step.get("parameters") or {},
+                                                  data_version, today, [keys[dep] for dep in deps])
+                    context = contextvars.copy_context()
+                    future = self._executor.submit(context.run, self._run_step, step, upstream, keys[step_id])
+                    running[future] = step_id
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[running.pop(future)] = future.result()
+
+        success = all(outcome["status"] == "success" for outcome in outcomes.values())
+        return {
+            "status": "success" if success else "partial",
+            "levels": levels,
+            "steps": {
+                sid: {**outcomes[sid], "tool_name": steps[sid]["tool_name"], "parameters": steps[sid].get("parameters") or {}}
+                for sid in steps
+            },
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def _run_step(self, step: Dict[str, Any], upstream: Dict[int, Any], key: str) -> Dict[str, Any]:
+        """Exécute une étape (ou lit sa sortie en cache)"""
+        tool_name = step["tool_name"]
+        started = time.perf_counter()
+
+        with get_tracer().span("plan.step", step_id=step["step_id"], tool=tool_name) as span:
+            cached = self._cache_get(key)
+            if span is not None:
+                span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                return self._outcome("success", cached, started, cache_hit=True)
+
+            handler = self.handlers.get(tool_name)
+            if handler is None:
+                return self._outcome("error", None, started, message=f"Outil inconnu: {tool_name}")
+
+            try:
+                result = handler(step.get("parameters") or {}, upstream)
+            except Exception as e:
+                self.logger.error(f"❌ Étape {step['step_id']} ({tool_name}): {e}")
+                return self._outcome("error", None, started, message=str(e))
+
+            if _is_error(result):
+                return self._outcome("error", result, started, message=str(result.get("message") or result.get("error")))
+
+            self._cache_put(key, result)
+            return self._outcome("success", result, started)
+
+    @staticmethod
+    def _outcome(status: str, result: Any, started: float, cache_hit: bool = False, message: Optional[str] = None) -> Dict[str, Any]:
+        outcome = {
+            "status": status,
+            "result": result,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "cache_hit": cache_hit
+        }
+        if message:
+            outcome["message"] = message
+        return outcome
+
+    def _cache_get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                # Copie : les étapes aval et la réponse enrichissent parfois le résultat
+                return copy.deepcopy(self._cache[key])
+            self._misses += 1
+            return None
+
+    def _cache_put(self, key: str, result: Any):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = copy.deepcopy(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache des étapes"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.cache_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+# Instance globale
+_plan_executor: Optional[PlanExecutor] = None
+
+def get_plan_executor() -> PlanExecutor:
+    """Retourne l'instance globale de l'exécuteur de plans"""
+    global _plan_executor
+    if _plan_executor is None:
+        _plan_executor = PlanExecutor()
+    return _plan_executor